@@ -0,0 +1,60 @@
+"""Compare two results written by 'benchmarks.run'"""
+import argparse
+import json
+import pathlib
+import sys
+import typing
+
+
+def compare(
+    base: typing.Dict[str, typing.Any],
+    head: typing.Dict[str, typing.Any],
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    rows = []
+    for name, head_result in head['results'].items():
+        base_result = base['results'].get(name)
+        if base_result is None:
+            continue
+        base_rss, head_rss = base_result['peak_rss_kib'], head_result['peak_rss_kib']
+        rows.append({
+            'name': name,
+            'base_wall_time': base_result['wall_time_median'],
+            'head_wall_time': head_result['wall_time_median'],
+            'wall_time_ratio': head_result['wall_time_median'] / base_result['wall_time_median'],
+            'base_peak_rss_kib': base_rss,
+            'head_peak_rss_kib': head_rss,
+            'peak_rss_ratio': head_rss / base_rss if base_rss and head_rss else None,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('base', type=str, help='results of the base commit')
+    parser.add_argument('head', type=str, help='results of the commit to compare')
+    parser.add_argument(
+        '--threshold', type=float, default=None,
+        help='exit with 1 if a wall time ratio exceeds 1 + threshold',
+    )
+    args = parser.parse_args()
+
+    base = json.loads(pathlib.Path(args.base).read_text(encoding='utf-8'))
+    head = json.loads(pathlib.Path(args.head).read_text(encoding='utf-8'))
+    if base['parameters'] != head['parameters']:
+        print('warning: the results were measured with different parameters', file=sys.stderr)
+
+    print(f"base: {base.get('commit')}  head: {head.get('commit')}")
+    print(f"{'name':<24}{'base [s]':>10}{'head [s]':>10}{'ratio':>8}{'rss ratio':>11}")
+    regressed = False
+    for row in compare(base, head):
+        rss_ratio = f"{row['peak_rss_ratio']:.2f}" if row['peak_rss_ratio'] is not None else '-'
+        print(
+            f"{row['name']:<24}{row['base_wall_time']:>10.3f}{row['head_wall_time']:>10.3f}"
+            f"{row['wall_time_ratio']:>8.2f}{rss_ratio:>11}")
+        if args.threshold is not None and row['wall_time_ratio'] > 1 + args.threshold:
+            regressed = True
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Measure stripping decorators from long class methods (inspect_utils.remove_decorators)"""
+import argparse
+import re
+import statistics
+import timeit
+import typing
+
+from qmonus_plugin_builder.libs import inspect_utils
+
+
+def generate_method(lines: int, decorators: int, is_coroutine: bool = False) -> str:
+    """Return the source code of an instance method like inspect.getsource() after outdent"""
+    code = ''
+    for i in range(decorators):
+        code += (
+            f"@comp.instance_method(\n"
+            f"    description='decorator {i}',\n"
+            f"    timeout={i},\n"
+            f")\n"
+        )
+    code += f"{'async ' if is_coroutine else ''}def method(self, value: int = 0):\n"
+    for i in range(lines):
+        code += f"    value = value + {i}  # line {i} @ def\n"
+    code += "    return value\n"
+    return code
+
+
+def _remove_decorator_with_regex(code: str, is_coroutine: bool) -> str:
+    # Former implementation, kept for comparison
+    if is_coroutine:
+        return re.sub(r"@(.|\n)+?\n(?=async)", "", code, 1)
+    return re.sub(r"@(.|\n)+?\n(?=def)", "", code, 1)
+
+
+def measure(func: typing.Callable[[], typing.Any], repeat: int) -> float:
+    """Return the median wall time of a call in seconds"""
+    number = 10 if repeat > 1 else 1
+    return statistics.median(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def run(lines: int, decorators: typing.List[int], repeat: int) -> typing.List[typing.Dict[str, typing.Any]]:
+    results = []
+    for count in decorators:
+        for is_coroutine in (False, True):
+            code = generate_method(lines=lines, decorators=count, is_coroutine=is_coroutine)
+            results.append({
+                'decorators': count,
+                'coroutine': is_coroutine,
+                'tokenize': measure(lambda: inspect_utils.remove_decorators(code), repeat),
+                'regex': measure(lambda: _remove_decorator_with_regex(code, is_coroutine), repeat),
+            })
+    return results
+
+
+def run_worst_case(lines: int) -> float:
+    """Return the time of the regex when no line starts with 'def' (e.g. iscoroutinefunction() is wrong)
+
+    Every '@' in the method is tried as a start of the match, so this takes quadratic time.
+    """
+    code = generate_method(lines=lines, decorators=1, is_coroutine=False)
+    return measure(lambda: _remove_decorator_with_regex(code, is_coroutine=True), repeat=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=5000, help='number of lines of the method body')
+    parser.add_argument(
+        '--decorators', type=int, nargs='+', default=[1, 4, 16], help='numbers of stacked decorators')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='number of runs')
+    parser.add_argument(
+        '--worst-case-lines', type=int, default=500,
+        help='number of lines of the method body for the worst case of the regex (0 to skip)')
+    args = parser.parse_args()
+
+    print(f"{'decorators':>10}{'coroutine':>10}{'tokenize [ms]':>16}{'regex [ms]':>14}")
+    for result in run(lines=args.lines, decorators=args.decorators, repeat=args.repeat):
+        print(f"{result['decorators']:>10}{str(result['coroutine']):>10}"
+              f"{result['tokenize'] * 1e3:>16.3f}{result['regex'] * 1e3:>14.3f}")
+    if args.worst_case_lines > 0:
+        worst_case = run_worst_case(lines=args.worst_case_lines)
+        print(f"regex without a 'def' line ({args.worst_case_lines} lines): {worst_case * 1e3:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
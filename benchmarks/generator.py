@@ -0,0 +1,274 @@
+"""Generate synthetic 'qmonus_sdk_plugins' trees for benchmarks"""
+import argparse
+import json
+import pathlib
+import typing
+
+HEADER = '''from __future__ import annotations
+from qmonus_plugin_builder.{kind}_libs import component as comp
+from qmonus_sdk_plugins.libs.{kind}_globals import *
+'''
+
+
+class ProjectParameters(object):
+    def __init__(
+        self,
+        workspaces: int = 2,
+        classes: int = 20,
+        inheritance_depth: int = 2,
+        local_fields: int = 10,
+        ref_fields: int = 2,
+        scenarios: int = 50,
+        commands: int = 4,
+        body_properties: int = 20,
+        daemons: int = 10,
+        modules: int = 10,
+    ) -> None:
+        """Numbers of classes, scenarios, daemons and modules are per workspace"""
+        self.workspaces = workspaces
+        self.classes = classes
+        self.inheritance_depth = inheritance_depth
+        self.local_fields = local_fields
+        self.ref_fields = ref_fields
+        self.scenarios = scenarios
+        self.commands = commands
+        self.body_properties = body_properties
+        self.daemons = daemons
+        self.modules = modules
+
+    def to_dict(self) -> typing.Dict[str, int]:
+        return dict(vars(self))
+
+
+def generate(project_path: pathlib.Path, parameters: ProjectParameters, slots: bool = False) -> None:
+    """Add synthetic plugins to a project created by 'init'
+
+    If 'slots' is True, the classes declare empty __slots__ so that they have no __dict__
+    if libs/classes.py is updated with '--slots'.
+    """
+    plugins_path = project_path.joinpath('qmonus_sdk_plugins/plugins')
+    if not plugins_path.is_dir():
+        raise ValueError(f"'{str(plugins_path)}' does not exist. Run 'init' first.")
+
+    for w in range(parameters.workspaces):
+        workspace = f'bench{w}'
+        workspace_path = plugins_path.joinpath(workspace)
+        for i in range(parameters.classes):
+            _write(workspace_path, 'classes', _class_name(w, i), _class_code(w, i, parameters, slots))
+        for i in range(parameters.scenarios):
+            _write(workspace_path, 'scenarios', f'Bench{w}Scenario{i}', _scenario_code(w, i, parameters))
+        for i in range(parameters.daemons):
+            _write(workspace_path, 'daemons', f'Bench{w}Daemon{i}', _daemon_code(w, i, parameters))
+        for i in range(parameters.modules):
+            _write(workspace_path, 'modules', f'bench{w}_module{i}', _module_code(w, i, parameters))
+
+
+def _write(workspace_path: pathlib.Path, kind: str, name: str, code: str) -> None:
+    # 'bench' category under each kind
+    dir_path = workspace_path.joinpath(kind, 'bench')
+    if not dir_path.is_dir():
+        dir_path.mkdir(parents=True)
+        workspace_path.joinpath('__init__.py').touch()
+        workspace_path.joinpath(kind, '__init__.py').touch()
+        dir_path.joinpath('__init__.py').touch()
+    dir_path.joinpath(f'{name}.py').write_text(code, encoding='utf-8')
+
+
+def _class_name(w: int, i: int) -> str:
+    return f'Bench{w}Class{i}'
+
+
+def _class_code(w: int, i: int, parameters: ProjectParameters, slots: bool = False) -> str:
+    name = _class_name(w, i)
+    # Classes form chains of 'inheritance_depth' + 1 classes
+    position = i % (parameters.inheritance_depth + 1)
+    root = i - position
+
+    setting_lines = []
+    if position == 0:
+        setting_lines.append("identifier=comp.Identifier(name='id', type=comp.STRING(), immutable=True),")
+    else:
+        setting_lines.append(f"extends=[atom.{_class_name(w, i - 1)}],")
+    setting_lines.append("local_fields=[")
+    for f in range(parameters.local_fields):
+        setting_lines.append(
+            f"    comp.LocalField(name='field{i}_{f}', type=comp.STRING(), nullable=True, "
+            f"metadata={{'index': {f}, 'label': 'Field {f} of {name}'}}),")
+    setting_lines.append("],")
+    setting_lines.append("ref_fields=[")
+    # Refer to the roots of other chains
+    roots = [r for r in range(0, parameters.classes, parameters.inheritance_depth + 1) if r != root]
+    for f in range(min(parameters.ref_fields, len(roots))):
+        ref_name = _class_name(w, roots[f])
+        setting_lines.append(
+            f"    comp.RefField(name='ref{i}_{f}', type=comp.STRING(), "
+            f"ref_class=atom.{ref_name}, ref_class_field='id'),")
+    setting_lines.append("],")
+    setting = '\n'.join(' ' * 12 + line for line in setting_lines)
+    slots_code = '    __slots__ = ()\n\n' if slots else ''
+
+    return HEADER.format(kind='class') + f'''from qmonus_sdk_plugins.libs import classes
+
+
+class {name}(classes.{name}):
+{slots_code}    def __setting__(self):
+        return comp.Setting(
+{setting}
+        )
+
+    @classmethod
+    async def count_{i}(cls, conn=None):
+        # Count instances
+        instances = await cls.retrieve(conn=conn)
+        return len(instances)
+
+    @comp.instance_method(timeout=30)
+    async def describe_{i}(self, prefix: str = ''):
+        """Describe the instance"""
+        values = []
+        for name in self.fieldnames():
+            values.append(f"{{prefix}}{{name}}={{getattr(self, name, None)}}")
+        return ', '.join(values)
+
+    @comp.instance_method()
+    def label_{i}(self):
+        return '{name}'
+'''
+
+
+def _schema(properties: int) -> str:
+    schema = {
+        "type": "object",
+        "required": [f"property{p}" for p in range(0, properties, 2)],
+        "properties": {
+            f"property{p}": {"type": "string", "description": f"Property {p}", "maxLength": 64}
+            for p in range(properties)
+        },
+    }
+    return json.dumps(schema, indent=4).replace('\n', '\n        ')
+
+
+def _scenario_code(w: int, i: int, parameters: ProjectParameters) -> str:
+    commands = [f'''class Command0(comp.RequestValidation):
+    def __setting__(self):
+        return comp.RequestValidationSetting()
+
+    def body(self):
+        """body schema"""
+        return {_schema(parameters.body_properties)}
+
+    async def post_process(self):
+        global req
+
+        req = json.loads(context.session.request.body)
+''']
+    for c in range(1, parameters.commands):
+        commands.append(f'''class Command{c}(comp.Script):
+    def __setting__(self):
+        return comp.ScriptSetting(label='Step {c}')
+
+    async def code(self):
+        global result
+
+        # Step {c}
+        values = []
+        for key, value in req.items():
+            if value is not None:
+                values.append(f"{{key}}:{{value}}")
+        result = {{"step": {c}, "values": values}}
+        logger.info(result)
+
+    async def cancel_code(self):
+        logger.info('cancel step {c}')
+''')
+    if parameters.commands > 1:
+        commands[-1] = commands[-1].replace("        logger.info(result)\n", "        context.session.finish(result)\n")
+
+    return HEADER.format(kind='scenario') + f'''
+
+class ScenarioHeader(comp.BaseHeader):
+    def __setting__(self):
+        return comp.Setting(
+            method="POST",
+            uri="/v1/bench{w}/scenarios/{i}",
+            transaction=comp.Transaction(enable=True, lock_keys=['req']),
+        )
+
+
+req: dict = comp.global_variable()
+result: dict = comp.global_variable(description='result')
+
+
+''' + '\n\n'.join(commands)
+
+
+def _daemon_code(w: int, i: int, parameters: ProjectParameters) -> str:
+    return HEADER.format(kind='daemon') + f'''
+
+class DaemonHeader(comp.BaseHeader):
+    def __setting__(self):
+        return comp.Setting(status='active', interval={60 + i})
+
+
+count: int = comp.global_variable(initial=0)
+
+
+class Command0(comp.Script):
+    def __setting__(self):
+        return comp.ScriptSetting(label='count')
+
+    async def code(self):
+        global count
+        count += 1
+        logger.info(f'daemon {w}-{i}: {{count}}')
+
+
+class Command1(comp.Script):
+    def __setting__(self):
+        return comp.ScriptSetting(label='log')
+
+    async def code(self):
+        logger.info('executed')
+'''
+
+
+def _module_code(w: int, i: int, parameters: ProjectParameters) -> str:
+    functions = '\n\n'.join(f'''def function{f}(value):
+    """Function {f}"""
+    return f"{{value}}-{i}-{f}"
+''' for f in range(10))
+    return HEADER.format(kind='module') + f'''
+
+class ModuleHeader(comp.BaseHeader):
+    def __setting__(self):
+        return comp.Setting()
+
+
+"""Write code below"""
+
+VALUE = {i}
+
+
+{functions}'''
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = ProjectParameters()
+    for name, value in defaults.to_dict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+
+
+def parse_parameters(args: argparse.Namespace) -> ProjectParameters:
+    return ProjectParameters(**{name: getattr(args, name) for name in ProjectParameters().to_dict()})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('project_path', type=str, help="project directory created by 'init'")
+    add_arguments(parser)
+    args = parser.parse_args()
+    generate(pathlib.Path(args.project_path), parse_parameters(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Measure wall time and peak RSS of init, update and dump on a synthetic project"""
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+from . import generator
+
+RESULTS_VERSION = 1
+
+
+class Measurement(object):
+    def __init__(self, wall_time: float, peak_rss_kib: typing.Optional[int]) -> None:
+        self.wall_time = wall_time
+        self.peak_rss_kib = peak_rss_kib
+
+
+def measure(args: typing.List[str]) -> Measurement:
+    """Run 'python -m qmonus_plugin_builder {args}' and measure it"""
+    command = [sys.executable, '-m', 'qmonus_plugin_builder', '--log-level', 'error'] + args
+    started_at = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    peak_rss_kib: typing.Optional[int] = None
+    if hasattr(os, 'wait4'):
+        _, status, rusage = os.wait4(process.pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        process.returncode = returncode
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        peak_rss_kib = rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+    else:
+        returncode = process.wait()
+    wall_time = time.perf_counter() - started_at
+    if returncode != 0:
+        raise RuntimeError(f"'{' '.join(command)}' failed with exit code {returncode}")
+    return Measurement(wall_time=wall_time, peak_rss_kib=peak_rss_kib)
+
+
+def run_once(work_path: pathlib.Path, parameters: generator.ProjectParameters) -> typing.Dict[str, Measurement]:
+    project_path = work_path.joinpath('project')
+    project_path.mkdir()
+    measurements: typing.Dict[str, Measurement] = {}
+
+    measurements['init'] = measure(['init', str(project_path)])
+    generator.generate(project_path, parameters)
+    measurements['update'] = measure(['update', str(project_path)])
+    measurements['dump'] = measure(['dump', str(project_path), str(work_path.joinpath('yaml'))])
+    measurements['dump_static'] = measure(
+        ['dump', '--static', str(project_path), str(work_path.joinpath('yaml_static'))])
+    incremental_yaml_path = str(work_path.joinpath('yaml_incremental'))
+    measure(['dump', '--incremental', str(project_path), incremental_yaml_path])
+    measurements['dump_incremental_noop'] = measure(
+        ['dump', '--incremental', str(project_path), incremental_yaml_path])
+    return measurements
+
+
+def run(parameters: generator.ProjectParameters, repeat: int) -> typing.Dict[str, typing.Any]:
+    measurements_per_name: typing.Dict[str, typing.List[Measurement]] = {}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix='qmonus_plugin_builder_bench_') as work_dir:
+            for name, measurement in run_once(pathlib.Path(work_dir), parameters).items():
+                measurements_per_name.setdefault(name, []).append(measurement)
+
+    results: typing.Dict[str, typing.Any] = {}
+    for name, measurements in measurements_per_name.items():
+        wall_times = [measurement.wall_time for measurement in measurements]
+        rss_values = [m.peak_rss_kib for m in measurements if m.peak_rss_kib is not None]
+        results[name] = {
+            'wall_time': wall_times,
+            'wall_time_median': statistics.median(wall_times),
+            'peak_rss_kib': max(rss_values) if len(rss_values) > 0 else None,
+        }
+
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': _get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'parameters': parameters.to_dict(),
+        'results': results,
+    }
+
+
+def _get_commit() -> typing.Optional[str]:
+    try:
+        process = subprocess.run(
+            ['git', 'describe', '--always', '--dirty'],
+            cwd=str(pathlib.Path(__file__).parent), capture_output=True, text=True)
+    except OSError:
+        return None
+    return process.stdout.strip() if process.returncode == 0 else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-o', '--output', type=str, default=None, help='write results to this JSON file')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='number of runs')
+    generator.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = run(parameters=generator.parse_parameters(args), repeat=args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.output is not None:
+        pathlib.Path(args.output).write_text(text + '\n', encoding='utf-8')
+
+    for name, result in results['results'].items():
+        rss = result['peak_rss_kib']
+        rss_text = f"{rss / 1024:.1f} MiB" if rss is not None else '-'
+        print(f"{name:<24}{result['wall_time_median']:>10.3f} s{rss_text:>14}", file=sys.stderr)
+    if args.output is None:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
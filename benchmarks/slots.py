@@ -0,0 +1,101 @@
+"""Measure the memory of atoms created from libs/_classes updated with and without '--slots'"""
+import argparse
+import json
+import pathlib
+import subprocess
+import sys
+import tempfile
+import typing
+
+from . import generator
+
+# Run in the project directory. Classes are imported without 'update' like plugins importing atom.
+_MEASURE_SCRIPT = '''
+import json
+import sys
+import tracemalloc
+
+from qmonus_sdk_plugins.libs import atom
+
+instances = int(sys.argv[1])
+# Classes are imported on first access
+atom_classes = [getattr(atom, name) for name in atom.__all__ if name.startswith('Bench')]
+# Build the arguments and the field layouts before measuring
+arguments = [{name: f'{name}-value' for name in atom_class.fieldnames()} for atom_class in atom_classes]
+for atom_class, kwargs in zip(atom_classes, arguments):
+    atom_class(**kwargs)
+
+atoms = []
+tracemalloc.start()
+before = tracemalloc.get_traced_memory()[0]
+for atom_class, kwargs in zip(atom_classes, arguments):
+    for _ in range(instances):
+        atoms.append(atom_class(**kwargs))
+size = tracemalloc.get_traced_memory()[0] - before
+tracemalloc.stop()
+print(json.dumps({
+    'atoms': len(atoms),
+    'bytes_per_atom': size / len(atoms),
+    'has_dict': hasattr(atoms[0], '__dict__'),
+}))
+'''
+
+
+def measure(
+    work_path: pathlib.Path,
+    parameters: generator.ProjectParameters,
+    instances: int,
+    slots: bool,
+) -> typing.Dict[str, typing.Any]:
+    project_path = work_path.joinpath('slots' if slots else 'dict')
+    project_path.mkdir()
+    _run([sys.executable, '-m', 'qmonus_plugin_builder', '--log-level', 'error', 'init', str(project_path)])
+    generator.generate(project_path, parameters, slots=True)
+    _run([sys.executable, '-m', 'qmonus_plugin_builder', '--log-level', 'error', 'update', str(project_path)]
+         + (['--slots'] if slots else []))
+    output = _run([sys.executable, '-c', _MEASURE_SCRIPT, str(instances)], cwd=project_path)
+    result: typing.Dict[str, typing.Any] = json.loads(output)
+    return result
+
+
+def run(parameters: generator.ProjectParameters, instances: int) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """Return the results of each mode"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='qmonus_plugin_builder_bench_') as work_dir:
+        for slots in (False, True):
+            results['slots' if slots else 'dict'] = measure(
+                pathlib.Path(work_dir), parameters, instances=instances, slots=slots)
+    return results
+
+
+def _run(command: typing.List[str], cwd: typing.Optional[pathlib.Path] = None) -> str:
+    process = subprocess.run(
+        command, cwd=str(cwd) if cwd is not None else None, stdout=subprocess.PIPE, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"'{' '.join(command)}' failed with exit code {process.returncode}")
+    return process.stdout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--instances', type=int, default=10000, help='number of atoms per class')
+    parser.add_argument('--workspaces', type=int, default=1)
+    parser.add_argument('--classes', type=int, default=10)
+    parser.add_argument('--inheritance-depth', type=int, default=0)
+    parser.add_argument('--local-fields', type=int, default=10)
+    parser.add_argument('--ref-fields', type=int, default=2)
+    args = parser.parse_args()
+
+    parameters = generator.ProjectParameters(
+        workspaces=args.workspaces, classes=args.classes, inheritance_depth=args.inheritance_depth, local_fields=args.local_fields,
+        ref_fields=args.ref_fields, scenarios=0, daemons=0, modules=0)
+    results = run(parameters, instances=args.instances)
+    print(f"{'mode':<8}{'atoms':>10}{'bytes/atom':>14}{'__dict__':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<8}{result['atoms']:>10}{result['bytes_per_atom']:>14.1f}{str(result['has_dict']):>10}")
+    ratio = results['slots']['bytes_per_atom'] / results['dict']['bytes_per_atom']
+    print(f"slots / dict: {ratio:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,17 @@
 __version__ = '1.5.0'
 
+import collections
+import concurrent.futures
 import importlib
+import importlib.util
 import json
 import logging
 import pathlib
+import re
 import shutil
+import signal
 import sys
+import time
 import typing
 
 from . import templates
@@ -13,10 +19,15 @@ from .class_libs import component as class_component
 from .class_libs import converter as class_converter
 from .class_libs import parser as class_parser
 from .daemon_libs import converter as daemon_converter
-from .libs import file_utils, str_utils
+from .daemon_libs import parser as daemon_parser
+from .libs import (
+    bundle_utils, file_utils, manifest, process_utils, profile_utils, project_index, reload_utils, server_utils, str_utils,
+    watch_utils,
+)
 from .module_libs import converter as module_converter
 from .module_libs import parser as module_parser
 from .scenario_libs import converter as scenario_converter
+from .scenario_libs import parser as scenario_parser
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +48,46 @@ def init(project_path: str) -> None:
     )
 
 
-def update(project_path: str) -> None:
+# Files generated in 'qmonus_sdk_plugins/libs' by update()
+_LIBS_FILE_NAMES = (
+    '__init__.py',
+    'module.py',
+    'model.py',
+    'scenario_context.py',
+    'daemon_context.py',
+    'class_context.py',
+    'module_context.py',
+    'scenario_globals.py',
+    'daemon_globals.py',
+    'class_globals.py',
+    'module_globals.py',
+    'atom.py',
+    'classes.py',
+    '_classes',
+    'options.json',
+)
+
+# Classes referred to by generated modules of classes
+_ATOM_REFERENCE = re.compile(r'\batom\.(\w+)')
+
+# Options of the previous update, kept by later updates which do not specify them
+_LIBS_OPTIONS_FILE_NAME = 'options.json'
+
+# Package of the modules generated for each class, re-exported by libs/classes.py
+_CLASS_MODULES_DIR_NAME = '_classes'
+
+
+def update(
+    project_path: str,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+    static: bool = False,
+    slots: typing.Optional[bool] = None,
+) -> None:
+    """Update libs
+
+    If 'slots' is True, the classes of libs/_classes declare their fields in __slots__.
+    If it is None, the value of the previous update is used.
+    """
     qmonus_sdk_plugins_path = pathlib.Path(project_path).joinpath('qmonus_sdk_plugins').resolve()
     if not qmonus_sdk_plugins_path.exists():
         raise ValueError(f"'{str(qmonus_sdk_plugins_path)}' does not exist")
@@ -45,24 +95,40 @@ def update(project_path: str) -> None:
         raise ValueError(f"'{str(qmonus_sdk_plugins_path)}' is not a directory")
 
     # add path
-    sys.path.append(str(qmonus_sdk_plugins_path.parent))
+    if str(qmonus_sdk_plugins_path.parent) not in sys.path:
+        sys.path.append(str(qmonus_sdk_plugins_path.parent))
 
+    if index is None:
+        index = project_index.ProjectIndex(qmonus_sdk_plugins_path, static=static)
+
+    # Unchanged files are not rewritten, so only files which are no longer generated are deleted
+    stats = file_utils.WriteStats()
     libs_path = qmonus_sdk_plugins_path.joinpath('libs')
-    file_utils.delete_files_in_directory(dir_path=libs_path)
+    file_utils.delete_files_in_directory(dir_path=libs_path, excludes=_LIBS_FILE_NAMES, stats=stats)
+
+    options_path = libs_path.joinpath(_LIBS_OPTIONS_FILE_NAME)
+    if slots is None:
+        slots = bool(_load_libs_options(options_path).get('slots', False))
+    file_utils.create_file(
+        file_path=options_path,
+        data=json.dumps({'slots': slots}, indent=2) + '\n',
+        stats=stats)
 
-    atom_import_stmts = []
+    atom_members = []
+    classes_members = []
     class_names = []
-    class_paths = class_parser.get_files(qmonus_sdk_plugins_path)
+    class_paths = class_parser.get_files(qmonus_sdk_plugins_path, index=index)
     for classes_path in class_paths:
-        module_name = '..' + str(classes_path.relative_to(qmonus_sdk_plugins_path)
-                                 .with_suffix('').as_posix()).replace('/', '.')
+        module_name = str(classes_path.relative_to(qmonus_sdk_plugins_path)
+                          .with_suffix('').as_posix()).replace('/', '.')
         class_name = classes_path.stem
-        import_stmt = f'from {module_name} import {class_name}'
-        atom_import_stmts.append(import_stmt)
+        atom_members.append(_get_lazy_member(name=class_name, module_name=module_name, level=2))
+        classes_members.append(
+            _get_lazy_member(name=class_name, module_name=f'{_CLASS_MODULES_DIR_NAME}.{class_name}', level=1))
         class_names.append(classes_path.stem)
 
     module_import_stmts = []
-    paths = module_parser.get_files(qmonus_sdk_plugins_path)
+    paths = module_parser.get_files(qmonus_sdk_plugins_path, index=index)
     for path in paths:
         parent_name = '..' + str(path.parent.relative_to(qmonus_sdk_plugins_path)
                                  .with_suffix('').as_posix()).replace('/', '.')
@@ -76,7 +142,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=init_path,
         data=str_utils.render(template=templates.INIT_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.module.py"""
     _path = libs_path.joinpath('module.py')
@@ -84,18 +151,21 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=_path,
         data=str_utils.render(template=templates.MODULE_TEMPLATE,
-                              variables={"import_stmts": module_import_stmts}))
+                              variables={"import_stmts": module_import_stmts}),
+        stats=stats)
 
     """Create libs.model.py"""
-    # Create temporal model.py
+    # Create temporal model.py. An existing one does not import classes and is recreated below.
     model_path = libs_path.joinpath('model.py')
-    logger.info(f"Creating '{str(model_path)}")
-    file_utils.create_file(
-        file_path=model_path,
-        data=str_utils.render(
-            template=templates.MODEL_TEMPLATE,
-            variables={
-                "class_definitions": []}))
+    if not model_path.is_file():
+        logger.info(f"Creating '{str(model_path)}")
+        file_utils.create_file(
+            file_path=model_path,
+            data=str_utils.render(
+                template=templates.MODEL_TEMPLATE,
+                variables={
+                    "class_definitions": []}),
+            stats=stats)
 
     """Create libs.scenario_context.py"""
     lib_path = libs_path.joinpath('scenario_context.py')
@@ -103,7 +173,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.SCENARIO_CONTEXT_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.daemon_context.py"""
     lib_path = libs_path.joinpath('daemon_context.py')
@@ -111,7 +182,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.DAEMON_CONTEXT_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.class_context.py"""
     lib_path = libs_path.joinpath('class_context.py')
@@ -119,7 +191,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.CLASS_CONTEXT_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.module_context.py"""
     lib_path = libs_path.joinpath('module_context.py')
@@ -127,7 +200,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.MODULE_CONTEXT_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.scenario_globals.py"""
     lib_path = libs_path.joinpath('scenario_globals.py')
@@ -135,7 +209,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.SCENARIO_GLOBALS_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.daemon_globals.py"""
     lib_path = libs_path.joinpath('daemon_globals.py')
@@ -143,7 +218,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.DAEMON_GLOBALS_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.class_globals.py"""
     lib_path = libs_path.joinpath('class_globals.py')
@@ -151,7 +227,8 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.CLASS_GLOBALS_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.module_globals.py"""
     lib_path = libs_path.joinpath('module_globals.py')
@@ -159,30 +236,56 @@ def update(project_path: str) -> None:
     file_utils.create_file(
         file_path=lib_path,
         data=str_utils.render(template=templates.MODULE_GLOBALS_TEMPLATE,
-                              variables={}))
+                              variables={}),
+        stats=stats)
 
     """Create libs.atom.py"""
+    # atom.py and classes.py import the module of each class on first access
     class_path = libs_path.joinpath('atom.py')
     logger.info(f"Creating '{str(class_path)}")
     file_utils.create_file(
         file_path=class_path,
-        data=str_utils.render(template=templates.ATOM_TEMPLATE,
-                              variables={"import_stmts": atom_import_stmts}))
+        data=str_utils.render(template=templates.LAZY_MODULE_TEMPLATE,
+                              variables={"members": atom_members}),
+        stats=stats)
 
     """Create libs.classes.py"""
-    # Create temporal classes.py
     classes_path = libs_path.joinpath('classes.py')
     logger.info(f"Creating '{str(classes_path)}")
     file_utils.create_file(
         file_path=classes_path,
-        data=str_utils.render(template=templates.CLASSES_INITIAL_TEMPLATE,
-                              variables={"class_names": class_names}))
+        data=str_utils.render(template=templates.LAZY_MODULE_TEMPLATE,
+                              variables={"members": classes_members}),
+        stats=stats)
 
-    # Import atom first
-    importlib.import_module('qmonus_sdk_plugins.libs.atom')
+    """Create libs._classes"""
+    # Create temporal modules of classes
+    class_modules_path = libs_path.joinpath(_CLASS_MODULES_DIR_NAME)
+    logger.info(f"Creating '{str(class_modules_path)}'")
+    file_utils.create_file(
+        file_path=class_modules_path.joinpath('__init__.py'),
+        data=str_utils.render(template=templates.INIT_TEMPLATE,
+                              variables={}),
+        stats=stats)
+    file_utils.delete_files_in_directory(
+        dir_path=class_modules_path,
+        excludes={'__init__.py', *[f'{class_name}.py' for class_name in class_names]},
+        stats=stats)
+    class_name_set = set(class_names)
+    for class_name in class_names:
+        # Existing modules are imported as they are and recreated below only if changed
+        class_module_path = class_modules_path.joinpath(f'{class_name}.py')
+        if _is_importable_class_module(class_module_path, class_names=class_name_set):
+            continue
+        file_utils.create_file(
+            file_path=class_module_path,
+            data=str_utils.render(template=templates.CLASS_INITIAL_TEMPLATE,
+                                  variables={"class_name": class_name}),
+            stats=stats)
 
-    # Create classes.py
-    class_definitions = class_parser.get_definitions(qmonus_sdk_plugins_path)
+    # Create modules of classes
+    class_definitions = class_parser.get_definitions(qmonus_sdk_plugins_path, index=index)
+    dictionary_fields_per_class_name = _get_dictionary_fields(class_definitions)
     class_def_dicts = []
     class_def_dict_per_class_name = {}
     for class_definition in class_definitions:
@@ -257,12 +360,15 @@ def update(project_path: str) -> None:
                     "default": None,
                 })
 
-        class_def_dict = {
+        class_def_dict: typing.Dict[str, typing.Any] = {
             "extends": extends,
             "name": class_definition.name,
             "variables_without_defaults": variables_without_defaults,
             "variables_with_defaults": variables_with_defaults,
+            "dictionary_fields": dictionary_fields_per_class_name[class_definition.name],
             "extend_class_definitions": [],
+            "slots": None,
+            "referenced_class_names": _get_referenced_class_names(class_definition),
         }
         class_def_dicts.append(class_def_dict)
         class_def_dict_per_class_name[class_def_dict['name']] = class_def_dict
@@ -272,13 +378,20 @@ def update(project_path: str) -> None:
             if class_def_dict_per_class_name.get(extend.get('name')):
                 class_def_dict['extend_class_definitions'].append(class_def_dict_per_class_name[extend.get('name')])
 
-    """Recreating libs.classes.py"""
-    logger.info(f"Recreating '{str(classes_path)}")
-    file_utils.create_file(
-        file_path=classes_path,
-        data=str_utils.render(
-            template=templates.CLASSES_FULL_TEMPLATE,
-            variables={"class_definitions": class_def_dicts}))
+    if slots:
+        for class_name, slot_names in _get_slots(class_def_dicts).items():
+            if slot_names is not None:
+                class_def_dict_per_class_name[class_name]['slots'] = repr(slot_names)
+
+    """Recreating libs._classes"""
+    logger.info(f"Recreating '{str(class_modules_path)}'")
+    for class_def_dict in class_def_dicts:
+        file_utils.create_file(
+            file_path=class_modules_path.joinpath(f"{class_def_dict['name']}.py"),
+            data=str_utils.render(
+                template=templates.CLASS_FULL_TEMPLATE,
+                variables={"class_definition": class_def_dict}),
+            stats=stats)
 
     """Recreating libs.model.py"""
     model_path = libs_path.joinpath('model.py')
@@ -288,8 +401,159 @@ def update(project_path: str) -> None:
         data=str_utils.render(
             template=templates.MODEL_TEMPLATE,
             variables={"class_definitions": class_def_dicts}
-        )
+        ),
+        stats=stats,
     )
+    logger.info(f"Updated '{str(libs_path)}': {stats}")
+
+
+def _load_libs_options(path: pathlib.Path) -> typing.Dict[str, typing.Any]:
+    """Return the options of the previous update, or an empty dict if they are missing or broken"""
+    try:
+        options = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return options if isinstance(options, dict) else {}
+
+
+def _is_importable_class_module(path: pathlib.Path, class_names: typing.Collection[str]) -> bool:
+    """Return True if the generated module exists and only extends classes which still exist"""
+    try:
+        text = path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return False
+    return all(name in class_names for name in _ATOM_REFERENCE.findall(text))
+
+
+def _get_lazy_member(name: str, module_name: str, level: int) -> typing.Dict[str, typing.Any]:
+    """Return a name imported on first access from the module, relative to the package of libs by 'level'"""
+    return {
+        "name": name,
+        "module": module_name,
+        "level": level,
+        "relative_module": '.' * level + module_name,
+    }
+
+
+def _get_referenced_class_names(class_definition: class_parser.ClassDefinition) -> typing.List[str]:
+    """Return the other classes which the types of the fields refer to"""
+    setting = class_definition.setting
+    fields: typing.List[typing.Union[
+        class_component.Identifier, class_component.LocalField, class_component.RefField,
+    ]] = []
+    if setting.identifier is not None:
+        fields.append(setting.identifier)
+    fields.extend(setting.local_fields)
+    fields.extend(setting.ref_fields)
+
+    class_names: typing.Dict[str, None] = {}
+    for field in fields:
+        if isinstance(field.type, (class_component.CLASS, class_component.ARRAY_OF_CLASS)):
+            class_name = field.type.cls.__name__
+            if class_name != class_definition.name:
+                class_names[class_name] = None
+    return list(class_names)
+
+
+def _get_slots(
+    class_def_dicts: typing.List[typing.Dict[str, typing.Any]],
+) -> typing.Dict[str, typing.Optional[typing.Tuple[str, ...]]]:
+    """Return the names in __slots__ of each class, or None if the class cannot have __slots__
+
+    Only one base of a class may add slots, so the classes which a class with multiple
+    bases extends directly or indirectly keep __dict__. Fields already in the slots of
+    a base class are not repeated.
+
+    Args:
+        class_def_dicts: sorted so that base classes come first, with 'extend_class_definitions'
+    """
+    without_slots: typing.Set[str] = set()
+    stack = [
+        extend_class_def_dict['name'] for class_def_dict in class_def_dicts
+        if len(class_def_dict['extend_class_definitions']) > 1
+        for extend_class_def_dict in class_def_dict['extend_class_definitions']
+    ]
+    while len(stack) > 0:
+        class_name = stack.pop()
+        if class_name not in without_slots:
+            without_slots.add(class_name)
+            class_def_dict = next(d for d in class_def_dicts if d['name'] == class_name)
+            stack.extend(d['name'] for d in class_def_dict['extend_class_definitions'])
+
+    # Slots of each class including those of its base classes. BaseClass has 'instance', 'xid' and 'xname'.
+    all_slot_names_per_class_name: typing.Dict[str, typing.Set[str]] = {}
+    slot_names_per_class_name: typing.Dict[str, typing.Optional[typing.Tuple[str, ...]]] = {}
+    for class_def_dict in class_def_dicts:
+        inherited_slot_names = {'instance', 'xid', 'xname'}
+        for extend_class_def_dict in class_def_dict['extend_class_definitions']:
+            inherited_slot_names |= all_slot_names_per_class_name[extend_class_def_dict['name']]
+        if class_def_dict['name'] in without_slots:
+            slot_names = None
+            all_slot_names = inherited_slot_names
+        else:
+            variables = class_def_dict['variables_without_defaults'] + class_def_dict['variables_with_defaults']
+            slot_names = tuple(dict.fromkeys(
+                variable['name'] for variable in variables if variable['name'] not in inherited_slot_names
+            ))
+            all_slot_names = inherited_slot_names | set(slot_names)
+        all_slot_names_per_class_name[class_def_dict['name']] = all_slot_names
+        slot_names_per_class_name[class_def_dict['name']] = slot_names
+    return slot_names_per_class_name
+
+
+def _get_dictionary_fields(
+    class_definitions: typing.List[class_parser.ClassDefinition],
+) -> typing.Dict[str, typing.List[typing.Dict[str, str]]]:
+    """Return the fields converted by __dictionary__() of each class in the order of BaseClass.fieldnames()
+
+    Args:
+        class_definitions: definitions sorted so that base classes come first
+    """
+    # Follow the MRO of the classes with empty classes having the same bases
+    type_per_class_name: typing.Dict[str, type] = {}
+    definition_per_class_name: typing.Dict[str, class_parser.ClassDefinition] = {}
+    for class_definition in class_definitions:
+        extends = class_definition.setting.extends or []
+        bases = tuple(type_per_class_name[cls.__name__] for cls in extends if cls.__name__ in type_per_class_name)
+        type_per_class_name[class_definition.name] = type(class_definition.name, bases or (object,), {})
+        definition_per_class_name[class_definition.name] = class_definition
+
+    fields_per_class_name: typing.Dict[str, typing.List[typing.Dict[str, str]]] = {}
+    for class_name, class_type in type_per_class_name.items():
+        fields = [{"name": name, "kind": 'scalar'} for name in ('instance', 'xid', 'xname')]
+        field_names = {field['name'] for field in fields}
+        for base in reversed(class_type.__mro__[:-1]):
+            setting = definition_per_class_name[base.__name__].setting
+            setting_fields: typing.List[typing.Union[
+                class_component.Identifier, class_component.LocalField, class_component.RefField,
+            ]] = []
+            if setting.identifier is not None:
+                setting_fields.append(setting.identifier)
+            setting_fields.extend(setting.local_fields)
+            setting_fields.extend(setting.ref_fields)
+            for field in setting_fields:
+                if field.name not in field_names:
+                    field_names.add(field.name)
+                    fields.append({"name": field.name, "kind": _get_dictionary_kind(field.type)})
+        fields_per_class_name[class_name] = fields
+    return fields_per_class_name
+
+
+def _get_dictionary_kind(type: class_component.BaseType) -> str:
+    if isinstance(type, class_component.CLASS):
+        return 'class'
+    elif isinstance(type, class_component.ARRAY_OF_CLASS):
+        return 'array_of_class'
+    elif isinstance(type, (
+        class_component.STRING,
+        class_component.INTEGER,
+        class_component.NUMBER,
+        class_component.BOOLEAN,
+        class_component.DATETIME,
+    )):
+        return 'scalar'
+    # OBJECT, ARRAY, MU and ARRAY_OF_MU may have any value
+    return 'any'
 
 
 def _convert_default(default: typing.Optional[str]) -> typing.Optional[str]:
@@ -337,13 +601,541 @@ def _convert_type(
     return result
 
 
-def dump(project_path: str, yaml_path: str) -> None:
-    update(project_path=project_path)
+# (kind, get_files, to_yaml_file) in dump order
+_PLUGIN_KINDS: typing.List[typing.Tuple[
+    str,
+    typing.Callable[..., typing.List[pathlib.Path]],
+    typing.Callable[..., typing.Dict[pathlib.Path, pathlib.Path]],
+]] = [
+    ('classes', class_parser.get_files, class_converter.to_yaml_file),
+    ('scenarios', scenario_parser.get_files, scenario_converter.to_yaml_file),
+    ('modules', module_parser.get_files, module_converter.to_yaml_file),
+    ('daemons', daemon_parser.get_files, daemon_converter.to_yaml_file),
+]
+
+# iter_yaml_files per kind
+_ITER_YAML_FILES: typing.Dict[str, typing.Callable[
+    ..., typing.Iterator[typing.Tuple[pathlib.Path, pathlib.PurePosixPath, str]]
+]] = {
+    'classes': class_converter.iter_yaml_files,
+    'scenarios': scenario_converter.iter_yaml_files,
+    'modules': module_converter.iter_yaml_files,
+    'daemons': daemon_converter.iter_yaml_files,
+}
+
+# Modules imported by the forkserver before workers are forked
+_WORKER_PRELOAD = [
+    'qmonus_plugin_builder.sdk_libs.class_globals',
+    'qmonus_plugin_builder.sdk_libs.scenario_globals',
+    'qmonus_plugin_builder.sdk_libs.daemon_globals',
+    'qmonus_plugin_builder.sdk_libs.module_globals',
+]
+
+# Modules imported by each worker. Classes are imported on first access through atom.
+_WORKER_IMPORTS = [
+    'qmonus_sdk_plugins.libs.module',
+]
+
+
+def dump(
+    project_path: str,
+    yaml_path: typing.Optional[str] = None,
+    incremental: bool = False,
+    jobs: int = 1,
+    static: bool = False,
+    bundle: typing.Optional[str] = None,
+) -> None:
+    """Dump yaml files into 'yaml_path', or into the single archive 'bundle'
+
+    The format of the bundle is given by its extension: '.tar', '.tar.gz', '.tar.zst', '.zip'
+    or '.yaml' for a multi-document YAML stream.
+    """
+    if jobs < 1:
+        raise ValueError(f"jobs must be greater than 0: '{jobs}'")
+    if (yaml_path is None) == (bundle is None):
+        raise ValueError("Either yaml_path or bundle must be specified")
+
+    if incremental:
+        if yaml_path is None:
+            raise ValueError("incremental cannot be used with bundle")
+        _dump_incrementally(project_path=project_path, yaml_path=yaml_path, jobs=jobs, static=static)
+        return
 
     qmonus_sdk_plugins_path = pathlib.Path(project_path).joinpath('qmonus_sdk_plugins').resolve()
+
+    # Scan files, import modules and parse definitions only once
+    index = project_index.ProjectIndex(qmonus_sdk_plugins_path, static=static)
+    with profile_utils.span('update'):
+        update(project_path=project_path, index=index)
+
+    if bundle is not None:
+        with bundle_utils.create_writer(pathlib.Path(bundle).resolve()) as writer:
+            _dump_all(module_path=qmonus_sdk_plugins_path, yaml_path=writer.path, index=index, jobs=jobs, bundle=writer)
+    elif yaml_path is not None:
+        _dump_all(module_path=qmonus_sdk_plugins_path, yaml_path=pathlib.Path(yaml_path).resolve(), index=index, jobs=jobs)
+
+
+def _dump_all(
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    index: project_index.ProjectIndex,
+    jobs: int,
+    bundle: typing.Optional[bundle_utils.BundleWriter] = None,
+) -> None:
+    stats = file_utils.WriteStats()
+    executor = _create_executor(jobs=jobs, static=index.static)
+    try:
+        for kind, get_files, to_yaml_file in _PLUGIN_KINDS:
+            with profile_utils.span(f'dump:{kind}'):
+                _to_yaml_file(
+                    kind=kind,
+                    to_yaml_file=to_yaml_file,
+                    module_path=module_path,
+                    yaml_path=yaml_path,
+                    paths=get_files(module_path, index=index),
+                    index=index,
+                    executor=executor,
+                    jobs=jobs,
+                    stats=stats,
+                    bundle=bundle,
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    logger.info(f"Dumped to '{str(yaml_path)}': {stats}")
+
+
+def iter_dump(
+    project_path: str,
+    static: bool = False,
+    update_libs: bool = True,
+) -> typing.Iterator[typing.Tuple[str, bytes]]:
+    """Yield the path relative to the yaml directory and the content of each yaml file without writing it
+
+    Files are yielded in the same order as dump() writes them. 'libs' is updated when the
+    iteration starts unless 'update_libs' is False, in which case it must be up to date.
+    """
+    qmonus_sdk_plugins_path = pathlib.Path(project_path).joinpath('qmonus_sdk_plugins').resolve()
+    index = project_index.ProjectIndex(qmonus_sdk_plugins_path, static=static)
+    if update_libs:
+        with profile_utils.span('update'):
+            update(project_path=project_path, index=index)
+    else:
+        if not qmonus_sdk_plugins_path.joinpath('libs/classes.py').is_file():
+            raise ValueError(f"'{str(qmonus_sdk_plugins_path.joinpath('libs'))}' has not been created by update")
+        if str(qmonus_sdk_plugins_path.parent) not in sys.path:
+            sys.path.append(str(qmonus_sdk_plugins_path.parent))
+
+    for kind, get_files, _ in _PLUGIN_KINDS:
+        iter_yaml_files = _ITER_YAML_FILES[kind]
+        paths = get_files(qmonus_sdk_plugins_path, index=index)
+        for _, relative_path, data in iter_yaml_files(qmonus_sdk_plugins_path, paths=paths, index=index):
+            yield relative_path.as_posix(), data.encode('utf-8')
+
+
+def dump_to_mapping(
+    project_path: str,
+    static: bool = False,
+    update_libs: bool = True,
+) -> typing.Dict[str, bytes]:
+    """Return the content of each yaml file per path relative to the yaml directory. See iter_dump()."""
+    return dict(iter_dump(project_path=project_path, static=static, update_libs=update_libs))
+
+
+def check(project_path: str, static: bool = False) -> int:
+    """Update libs, then parse and convert every plugin without writing yaml files
+
+    Return the number of plugins. Invalid plugins raise errors like dump().
+    """
+    count = 0
+    for _ in iter_dump(project_path=project_path, static=static):
+        count += 1
+    logger.info(f"Checked {count} plugins")
+    return count
+
+
+def _create_executor(jobs: int, static: bool = False) -> typing.Optional[concurrent.futures.Executor]:
+    # Must be called after 'qmonus_sdk_plugins' is added to sys.path
+    if jobs == 1:
+        return None
+    return process_utils.create_executor(
+        max_workers=jobs,
+        preload=_WORKER_PRELOAD,
+        imports=None if static else _WORKER_IMPORTS,
+    )
+
+
+def _to_yaml_file(
+    kind: str,
+    to_yaml_file: typing.Callable[..., typing.Dict[pathlib.Path, pathlib.Path]],
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    paths: typing.List[pathlib.Path],
+    index: project_index.ProjectIndex,
+    executor: typing.Optional[concurrent.futures.Executor],
+    jobs: int,
+    stats: file_utils.WriteStats,
+    bundle: typing.Optional[bundle_utils.BundleWriter] = None,
+) -> typing.Dict[pathlib.Path, pathlib.Path]:
+    if executor is None:
+        return to_yaml_file(
+            module_path=module_path, yaml_path=yaml_path, paths=paths, index=index, stats=stats, bundle=bundle)
+
+    # Each worker parses and dumps its own shard exactly like the serial path.
+    # Workers import modules by themselves, so the index is not shared with them.
+    futures = [
+        executor.submit(
+            _to_yaml_file_in_worker,
+            to_yaml_file=to_yaml_file,
+            module_path=module_path,
+            yaml_path=yaml_path,
+            paths=shard,
+            static=index.static,
+            bundle=bundle is not None,
+        )
+        for shard in process_utils.split(paths, jobs)
+    ]
+    file_paths: typing.Dict[pathlib.Path, pathlib.Path] = {}
+    contents: typing.Dict[str, bytes] = {}
+    for future in futures:
+        shard_file_paths, shard_stats, shard_contents = future.result()
+        file_paths.update(shard_file_paths)
+        stats.add(shard_stats)
+        contents.update(shard_contents)
+
+    # Bundle the files in the order of the serial path regardless of the shards
+    if bundle is not None:
+        for path in _get_dump_order(kind=kind, module_path=module_path, paths=paths, index=index):
+            key = file_paths[path].relative_to(yaml_path).as_posix()
+            # Already counted by the worker
+            bundle.add(key, contents[key])
+    return file_paths
+
+
+def _get_dump_order(
+    kind: str,
+    module_path: pathlib.Path,
+    paths: typing.List[pathlib.Path],
+    index: project_index.ProjectIndex,
+) -> typing.List[pathlib.Path]:
+    """Return the source files in the order in which to_yaml_file() dumps them"""
+    if kind == 'classes':
+        return class_parser.sort_files(module_path, paths=paths, index=index)
+    return paths
+
+
+def _to_yaml_file_in_worker(
+    to_yaml_file: typing.Callable[..., typing.Dict[pathlib.Path, pathlib.Path]],
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    paths: typing.List[pathlib.Path],
+    static: bool,
+    bundle: bool = False,
+) -> typing.Tuple[typing.Dict[pathlib.Path, pathlib.Path], file_utils.WriteStats, typing.Dict[str, bytes]]:
+    """Dump a shard. If 'bundle' is True, the contents are returned instead of being written."""
+    stats = file_utils.WriteStats()
+    index = project_index.ProjectIndex(module_path, static=static)
+    writer = bundle_utils.MemoryBundleWriter(yaml_path) if bundle else None
+    file_paths = to_yaml_file(
+        module_path=module_path, yaml_path=yaml_path, paths=paths, index=index, stats=stats, bundle=writer)
+    return file_paths, stats, dict(writer.contents) if writer is not None else {}
+
+
+def _dump_incrementally(project_path: str, yaml_path: str, jobs: int = 1, static: bool = False) -> None:
+    qmonus_sdk_plugins_path = pathlib.Path(project_path).joinpath('qmonus_sdk_plugins').resolve()
     _yaml_path = pathlib.Path(yaml_path).resolve()
+    manifest_path = _yaml_path.joinpath(manifest.MANIFEST_PATH)
+
+    index = project_index.ProjectIndex(qmonus_sdk_plugins_path, static=static)
+    previous_manifest = manifest.Manifest.load(path=manifest_path, version=__version__)
+    current_manifest = manifest.Manifest(version=__version__)
+
+    # Hash sources
+    texts: typing.Dict[str, str] = {}
+    with profile_utils.span('hash'):
+        for kind, get_files, _ in _PLUGIN_KINDS:
+            for path in get_files(qmonus_sdk_plugins_path, index=index):
+                key = path.relative_to(qmonus_sdk_plugins_path).as_posix()
+                texts[key] = file_utils.open_file(path)
+                current_manifest.entries[key] = manifest.ManifestEntry(kind=kind, hash=manifest.hash_text(texts[key]))
+
+    # Every plugin can refer to classes and modules by name. Workspaces may have plugins with the same name.
+    keys_per_name: typing.DefaultDict[str, typing.List[str]] = collections.defaultdict(list)
+    for key, entry in current_manifest.entries.items():
+        if entry.kind in ('classes', 'modules'):
+            keys_per_name[pathlib.PurePosixPath(key).stem].append(key)
+    for key, entry in current_manifest.entries.items():
+        names = manifest.get_names(texts[key])
+        entry.dependencies = sorted(
+            dependency_key for name, dependency_keys in keys_per_name.items()
+            if names is None or name in names
+            for dependency_key in dependency_keys if dependency_key != key
+        )
+
+    # Outputs deleted by hand must be rebuilt
+    for key, entry in list(previous_manifest.entries.items()):
+        if entry.output is not None and not _yaml_path.joinpath(entry.output).is_file():
+            entry.output = None
+
+    changed_keys = current_manifest.get_changed_keys(previous_manifest)
+    dirty_keys = current_manifest.get_dirty_keys(previous_manifest)
+    logger.info(f"{len(dirty_keys)} of {len(current_manifest.entries)} plugins need to be dumped")
+
+    # libs only depend on classes and modules
+    libs_changed = False
+    for key in changed_keys:
+        entry = current_manifest.entries.get(key) or previous_manifest.entries[key]
+        if entry.kind in ('classes', 'modules'):
+            libs_changed = True
+    if libs_changed or not qmonus_sdk_plugins_path.joinpath('libs/classes.py').is_file():
+        with profile_utils.span('update'):
+            update(project_path=project_path, index=index)
+    elif str(qmonus_sdk_plugins_path.parent) not in sys.path:
+        sys.path.append(str(qmonus_sdk_plugins_path.parent))
+
+    stats = file_utils.WriteStats()
+    executor = _create_executor(jobs=jobs, static=static) if len(dirty_keys) > 0 else None
+    try:
+        for kind, _, to_yaml_file in _PLUGIN_KINDS:
+            dirty_paths = [
+                qmonus_sdk_plugins_path.joinpath(key)
+                for key, entry in sorted(current_manifest.entries.items())
+                if entry.kind == kind and key in dirty_keys
+            ]
+            if len(dirty_paths) == 0:
+                continue
+            with profile_utils.span(f'dump:{kind}'):
+                file_paths = _to_yaml_file(
+                    kind=kind,
+                    to_yaml_file=to_yaml_file,
+                    module_path=qmonus_sdk_plugins_path,
+                    yaml_path=_yaml_path,
+                    paths=dirty_paths,
+                    index=index,
+                    executor=executor,
+                    jobs=jobs,
+                    stats=stats,
+                )
+            for path, file_path in file_paths.items():
+                key = path.relative_to(qmonus_sdk_plugins_path).as_posix()
+                current_manifest.entries[key].output = file_path.relative_to(_yaml_path).as_posix()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for key, entry in current_manifest.entries.items():
+        if key not in dirty_keys:
+            entry.output = previous_manifest.entries[key].output
+
+    # Delete outputs of removed sources and stale outputs of renamed plugins
+    current_outputs = {entry.output for entry in current_manifest.entries.values()}
+    for key, entry in previous_manifest.entries.items():
+        if entry.output is not None and entry.output not in current_outputs:
+            output_path = _yaml_path.joinpath(entry.output)
+            if output_path.is_file():
+                logger.info(f"Deleting '{str(output_path)}'")
+                file_utils.delete(output_path, stats=stats)
+
+    current_manifest.save(path=manifest_path)
+    logger.info(f"Dumped to '{str(_yaml_path)}': {stats}")
+
+
+def watch(project_path: str, yaml_path: str, interval: float = 0.1, polling: bool = False) -> None:
+    """Dump continuously: keep the interpreter warm and dump only what changed on every save"""
+    qmonus_sdk_plugins_path = pathlib.Path(project_path).joinpath('qmonus_sdk_plugins').resolve()
+    graph = reload_utils.ImportGraph('qmonus_sdk_plugins')
+    graph.install()
+    try:
+        _dump_incrementally(project_path=project_path, yaml_path=yaml_path)
+        watcher = watch_utils.FileWatcher(
+            root_path=qmonus_sdk_plugins_path.joinpath('plugins'),
+            interval=interval,
+            polling=polling,
+        )
+    except BaseException:
+        graph.uninstall()
+        raise
+    logger.info(f"Watching '{str(watcher.root_path)}' ({'polling' if watcher.polling else 'inotify'})")
+    try:
+        while True:
+            changed_paths = watcher.wait()
+            started_at = time.monotonic()
+            for changed_path in sorted(changed_paths):
+                logger.info(f"Change detected: '{str(changed_path)}'")
+
+            try:
+                _reload_plugin_modules(
+                    qmonus_sdk_plugins_path=qmonus_sdk_plugins_path, graph=graph, changed_paths=changed_paths)
+                _dump_incrementally(project_path=project_path, yaml_path=yaml_path)
+            except Exception as e:
+                logger.exception(e)
+                # Modules may be partially imported
+                _unload_plugin_modules(qmonus_sdk_plugins_path=qmonus_sdk_plugins_path, changed_paths=None)
+                continue
+
+            logger.info(f"Dumped in {(time.monotonic() - started_at) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        graph.uninstall()
+
+
+def _reload_plugin_modules(
+    qmonus_sdk_plugins_path: pathlib.Path,
+    graph: reload_utils.ImportGraph,
+    changed_paths: typing.Set[pathlib.Path],
+) -> None:
+    """Import the modules of changed files and the modules which depend on them again
+
+    libs re-exports every class and module file, so if one of them is added or deleted,
+    all modules are removed instead and imported by the next dump like the first time.
+    """
+    loaded_paths = set()
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, '__file__', None)
+        if name.startswith('qmonus_sdk_plugins.') and module_file is not None:
+            loaded_paths.add(pathlib.Path(module_file).resolve())
+    for path in changed_paths:
+        parts = path.relative_to(qmonus_sdk_plugins_path).parts
+        if len(parts) > 2 and parts[2] in ('classes', 'modules') and (
+            not path.exists() or path.resolve() not in loaded_paths
+        ):
+            _unload_plugin_modules(qmonus_sdk_plugins_path=qmonus_sdk_plugins_path, changed_paths=changed_paths)
+            return
+    graph.reload_changed(changed_paths)
+
+
+def _unload_plugin_modules(
+    qmonus_sdk_plugins_path: pathlib.Path,
+    changed_paths: typing.Optional[typing.Set[pathlib.Path]],
+) -> None:
+    """Remove changed modules from sys.modules so that they are imported again
+
+    Classes and modules are re-exported by libs and imported by every plugin,
+    so all 'qmonus_sdk_plugins' modules are removed if one of them changed.
+    If 'changed_paths' is None, all of them are removed.
+    """
+    unload_all = changed_paths is None
+    if changed_paths is not None:
+        changed_paths = {path.resolve() for path in changed_paths}
+        for path in changed_paths:
+            parts = path.relative_to(qmonus_sdk_plugins_path).parts
+            if len(parts) > 2 and parts[2] in ('classes', 'modules'):
+                unload_all = True
+
+            # mtime based pyc validation may miss quick successive saves
+            try:
+                pathlib.Path(importlib.util.cache_from_source(str(path))).unlink()
+            except OSError:
+                pass
+
+    for name, module in list(sys.modules.items()):
+        if name != 'qmonus_sdk_plugins' and not name.startswith('qmonus_sdk_plugins.'):
+            continue
+        module_file = getattr(module, '__file__', None)
+        if unload_all or (
+            changed_paths is not None and module_file is not None and pathlib.Path(module_file).resolve() in changed_paths
+        ):
+            del sys.modules[name]
+
+    importlib.invalidate_caches()
+
+
+# Commands handled by serve()
+_SERVER_COMMANDS: typing.Dict[str, typing.Callable[..., typing.Any]] = {
+    'update': update,
+    'dump': dump,
+    'check': check,
+}
+
+# Log levels which the clients of serve() may request
+_SERVER_LOG_LEVELS: typing.Dict[str, int] = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'error': logging.ERROR,
+}
+
+
+def serve(
+    project_path: str,
+    port: typing.Optional[int] = None,
+    log_formatter: typing.Optional[logging.Formatter] = None,
+) -> None:
+    """Run a build server which keeps plugins imported between requests
+
+    The server listens on '{project_path}/.qmonus_build/server.sock', or on the loopback
+    interface if 'port' is given (0 for any free port), and writes how to connect to it to
+    server_utils.SERVER_INFO_PATH. 'update', 'dump' and 'check' requests are handled one by one
+    and modules of the files changed since the previous request are imported again.
+    The log of each request is returned to the client, formatted by 'log_formatter' and
+    filtered by the 'log_level' argument of the request.
+    """
+    root_path = pathlib.Path(project_path).resolve()
+    qmonus_sdk_plugins_path = root_path.joinpath('qmonus_sdk_plugins')
+    if not qmonus_sdk_plugins_path.is_dir():
+        raise ValueError(f"'{str(qmonus_sdk_plugins_path)}' is not a directory")
+    plugins_path = qmonus_sdk_plugins_path.joinpath('plugins')
+    snapshot = watch_utils.take_snapshot(plugins_path)
+
+    def handle(command: str, args: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        nonlocal snapshot
+        function = _SERVER_COMMANDS.get(command)
+        if function is None:
+            return {'ok': False, 'error': f"Unknown command '{command}'", 'log': ''}
+        if pathlib.Path(args.pop('project_path', root_path)).resolve() != root_path:
+            return {'ok': False, 'error': f"The server is serving '{str(root_path)}'", 'log': ''}
+        log_level = args.pop('log_level', None)
+        if log_level is not None and log_level not in _SERVER_LOG_LEVELS:
+            return {'ok': False, 'error': f"Invalid log-level value: '{log_level}'", 'log': ''}
+
+        current_snapshot = watch_utils.take_snapshot(plugins_path)
+        changed_paths = watch_utils.diff_snapshots(snapshot, current_snapshot)
+        snapshot = current_snapshot
+
+        started_at = time.monotonic()
+        level = logging.NOTSET if log_level is None else _SERVER_LOG_LEVELS[log_level]
+        with server_utils.LogCapture(formatter=log_formatter, level=level) as log:
+            for changed_path in sorted(changed_paths):
+                logger.info(f"Change detected: '{str(changed_path)}'")
+            try:
+                if len(changed_paths) > 0:
+                    _reload_plugin_modules(
+                        qmonus_sdk_plugins_path=qmonus_sdk_plugins_path, graph=graph, changed_paths=changed_paths)
+                function(project_path=str(root_path), **args)
+            except Exception as e:
+                logger.exception(e)
+                # Modules may be partially imported
+                _unload_plugin_modules(qmonus_sdk_plugins_path=qmonus_sdk_plugins_path, changed_paths=None)
+                return {'ok': False, 'error': f'{e.__class__.__name__}: {e}', 'log': log.getvalue()}
+            logger.info(f"'{command}' done in {(time.monotonic() - started_at) * 1000:.0f} ms")
+        return {'ok': True, 'log': log.getvalue()}
+
+    server = server_utils.Server(
+        handler=handle,
+        version=__version__,
+        socket_path=root_path.joinpath('.qmonus_build/server.sock') if port is None else None,
+        port=port,
+    )
+    info_path = root_path.joinpath(server_utils.SERVER_INFO_PATH)
+    graph = reload_utils.ImportGraph('qmonus_sdk_plugins')
+    graph.install()
+    previous_handler = signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        server.info.save(info_path)
+        logger.info(f"Serving '{str(root_path)}' on {server.address}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        graph.uninstall()
+        # Another server may have been started for the project
+        info = server_utils.ServerInfo.load(info_path)
+        if info is not None and info.token == server.info.token:
+            info_path.unlink()
+        server.close()
+
 
-    class_converter.to_yaml_file(module_path=qmonus_sdk_plugins_path, yaml_path=_yaml_path)
-    scenario_converter.to_yaml_file(module_path=qmonus_sdk_plugins_path, yaml_path=_yaml_path)
-    module_converter.to_yaml_file(module_path=qmonus_sdk_plugins_path, yaml_path=_yaml_path)
-    daemon_converter.to_yaml_file(module_path=qmonus_sdk_plugins_path, yaml_path=_yaml_path)
+def _raise_keyboard_interrupt(signum: int, frame: typing.Any) -> None:
+    raise KeyboardInterrupt()
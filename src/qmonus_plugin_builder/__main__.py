@@ -1,7 +1,16 @@
 import argparse
 import logging
+import pathlib
+import sys
+import typing
 
-from . import __version__, init, update, dump
+from . import __version__, init, update, dump, check, watch, serve
+from .libs import profile_utils, server_utils
+
+LOG_FORMATTER = logging.Formatter('[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
+
+# Commands which are forwarded to a running build server
+_FORWARDED_COMMANDS = ('update', 'dump', 'check')
 
 
 def setup_log(log_level: str) -> None:
@@ -16,9 +25,8 @@ def setup_log(log_level: str) -> None:
 
     root_logger = logging.getLogger()
     root_logger.setLevel(_log_level)
-    formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
     stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
+    stream_handler.setFormatter(LOG_FORMATTER)
     root_logger.addHandler(stream_handler)
 
 
@@ -43,6 +51,19 @@ def main() -> None:
         default='info',
         help='log level',
     )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        dest='profile',
+        default=None,
+        help='write a Chrome trace of the build phases to the file and print a summary to stderr',
+    )
+    parser.add_argument(
+        '--no-server',
+        action='store_true',
+        dest='no_server',
+        help='run update, dump and check in this process even if a build server is running for the project',
+    )
 
     sub_parser = parser.add_subparsers(dest='sub_parser')
 
@@ -69,6 +90,17 @@ def main() -> None:
         type=str,
         help='project directory path',
     )
+    update_parser.add_argument(
+        '--static',
+        action='store_true',
+        help='read definitions from source code without importing plugins where possible',
+    )
+    update_parser.add_argument(
+        '--slots',
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help='declare the fields of the classes of libs/_classes in __slots__, or keep the previous choice if omitted',
+    )
 
     # Define dump parser
     dump_parser = sub_parser.add_parser(
@@ -82,10 +114,98 @@ def main() -> None:
         help='project directory path',
     )
     dump_parser.add_argument(
+        'yaml_path',
+        type=str,
+        nargs='?',
+        default=None,
+        help='yaml directory path',
+    )
+    dump_parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='dump only plugins changed since the last incremental dump',
+    )
+    dump_parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='number of worker processes',
+    )
+    dump_parser.add_argument(
+        '--static',
+        action='store_true',
+        help='read definitions from source code without importing plugins where possible',
+    )
+    dump_parser.add_argument(
+        '--bundle',
+        type=str,
+        default=None,
+        help='write all yaml files and their index into a single .tar(.gz|.bz2|.xz|.zst), .zip or .yaml file '
+             'instead of yaml_path',
+    )
+
+    # Define check parser
+    check_parser = sub_parser.add_parser(
+        'check',
+        help='Update libs and convert python modules without writing yaml',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    check_parser.add_argument(
+        'project_path',
+        type=str,
+        help='project directory path',
+    )
+    check_parser.add_argument(
+        '--static',
+        action='store_true',
+        help='read definitions from source code without importing plugins where possible',
+    )
+
+    # Define serve parser
+    serve_parser = sub_parser.add_parser(
+        'serve',
+        help='Run a build server which keeps python modules imported',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    serve_parser.add_argument(
+        'project_path',
+        type=str,
+        help='project directory path',
+    )
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        default=None,
+        help='listen on this port of 127.0.0.1 (0 for any free port) instead of a unix socket',
+    )
+
+    # Define watch parser
+    watch_parser = sub_parser.add_parser(
+        'watch',
+        help='Watch python modules and convert changed ones to yaml',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    watch_parser.add_argument(
+        'project_path',
+        type=str,
+        help='project directory path',
+    )
+    watch_parser.add_argument(
         'yaml_path',
         type=str,
         help='yaml directory path',
     )
+    watch_parser.add_argument(
+        '--interval',
+        type=float,
+        default=0.1,
+        help='polling interval in seconds',
+    )
+    watch_parser.add_argument(
+        '--polling',
+        action='store_true',
+        help='poll files instead of using inotify',
+    )
 
     # Parse args
     args = parser.parse_args()
@@ -97,14 +217,36 @@ def main() -> None:
     setup_log(log_level=args.log_level)
     logger = logging.getLogger(__name__)
 
+    # Forward to the build server
+    if args.sub_parser in _FORWARDED_COMMANDS and args.profile is None and not args.no_server:
+        ok = forward(args)
+        if ok is not None:
+            if ok:
+                print("Succeeded.")
+            else:
+                print('\nFailed.')
+                exit(1)
+            return
+
     # Execute
+    if args.profile is not None:
+        profile_utils.start()
     try:
-        if args.sub_parser == 'init':
-            init(project_path=args.project_path)
-        elif args.sub_parser == 'update':
-            update(project_path=args.project_path)
-        elif args.sub_parser == 'dump':
-            dump(project_path=args.project_path, yaml_path=args.yaml_path)
+        with profile_utils.span(args.sub_parser):
+            if args.sub_parser == 'init':
+                init(project_path=args.project_path)
+            elif args.sub_parser == 'update':
+                update(project_path=args.project_path, static=args.static, slots=args.slots)
+            elif args.sub_parser == 'dump':
+                dump(project_path=args.project_path, yaml_path=args.yaml_path, incremental=args.incremental,
+                     jobs=args.jobs, static=args.static, bundle=args.bundle)
+            elif args.sub_parser == 'check':
+                check(project_path=args.project_path, static=args.static)
+            elif args.sub_parser == 'serve':
+                serve(project_path=args.project_path, port=args.port, log_formatter=LOG_FORMATTER)
+            elif args.sub_parser == 'watch':
+                watch(project_path=args.project_path, yaml_path=args.yaml_path, interval=args.interval,
+                      polling=args.polling)
 
         print("Succeeded.")
 
@@ -113,6 +255,56 @@ def main() -> None:
         print('\nFailed.')
         exit(1)
 
+    finally:
+        profiler = profile_utils.stop()
+        if profiler is not None:
+            profiler.write_trace(pathlib.Path(args.profile))
+            print(profiler.format_summary(), file=sys.stderr)
+
+
+def forward(args: argparse.Namespace) -> typing.Optional[bool]:
+    """Run the command on the build server of the project
+
+    Return whether the command succeeded, or None if no server is running.
+    """
+    logger = logging.getLogger(__name__)
+    info = server_utils.ServerInfo.load(pathlib.Path(args.project_path).joinpath(server_utils.SERVER_INFO_PATH))
+    if info is None:
+        return None
+    if info.version != __version__:
+        logger.info(f"Ignoring the build server of version {info.version}")
+        return None
+
+    # Paths are resolved here as the server runs in another directory
+    request_args: typing.Dict[str, typing.Any] = {
+        'project_path': str(pathlib.Path(args.project_path).resolve()),
+        'static': args.static,
+        'log_level': args.log_level,
+    }
+    if args.sub_parser == 'update':
+        request_args['slots'] = args.slots
+    if args.sub_parser == 'dump':
+        request_args['yaml_path'] = str(pathlib.Path(args.yaml_path).resolve()) if args.yaml_path is not None else None
+        request_args['bundle'] = str(pathlib.Path(args.bundle).resolve()) if args.bundle is not None else None
+        request_args['incremental'] = args.incremental
+        request_args['jobs'] = args.jobs
+
+    try:
+        response = server_utils.request(info, args.sub_parser, request_args)
+    except OSError as e:
+        logger.info(f"Build server is not available, running locally: {e}")
+        return None
+    except server_utils.ServerError as e:
+        # Running locally could run the command twice
+        logger.error(f"Build server (pid {info.pid}) failed: {e}")
+        return False
+    logger.info(f"Forwarded '{args.sub_parser}' to the build server (pid {info.pid})")
+    sys.stderr.write(response.get('log', ''))
+    if not response.get('ok'):
+        logger.error(response.get('error'))
+        return False
+    return True
+
 
 if __name__ == '__main__':
     main()
@@ -13,6 +13,50 @@ logger = logging.getLogger(__name__)
 
 instance_method_per_qualname = {}
 
+# Incremented to invalidate the field layouts cached on classes
+_field_layout_generation = 0
+
+_PRIMITIVE_TYPES = frozenset([str, int, float, bool])
+
+
+def invalidate_field_layouts() -> None:
+    """Recompute the field layouts of all classes on the next access, e.g. after classes are reloaded"""
+    global _field_layout_generation
+    _field_layout_generation += 1
+
+
+def to_dictionary_value(value: typing.Any) -> typing.Any:
+    """Convert the value of a field like BaseClass.dictionary"""
+    if type(value) in _PRIMITIVE_TYPES:
+        return value
+    elif hasattr(value, 'dictionary'):
+        return value.dictionary
+    elif isinstance(value, list):
+        l: list = value.__class__()
+        for v in value:
+            if hasattr(v, 'dictionary'):
+                l.append(v.dictionary)
+            else:
+                l.append(v)
+        return l
+    return value
+
+
+class FieldLayout(object):
+    """Fields of a class including the fields of its base classes, in the order of BaseClass.fieldnames()"""
+    def __init__(
+        self,
+        names: typing.List[str],
+        key_field: typing.Optional[str],
+        types: typing.Dict[str, BaseType],
+        generation: int,
+    ) -> None:
+        self.names = tuple(names)
+        self.key_field = key_field
+        # Types of the identifier, local and ref fields, e.g. CLASS and ARRAY_OF_CLASS with nested classes
+        self.types = types
+        self.generation = generation
+
 
 class BaseClass(abc.ABC):
     # qmonus sdk では classが保持している属性でkey_fieldというものがあります
@@ -22,6 +66,9 @@ class BaseClass(abc.ABC):
     # 各class側で適宜設定する対応を行なってください。
     key_field: typing.Optional[str] = None
 
+    # Subclasses without __slots__ have __dict__, 'update --slots' generates __slots__ for the fields
+    __slots__ = ('instance', 'xid', 'xname', '__weakref__')
+
     @classmethod
     def __create_dummy_instance__(cls):
         attributes = {}
@@ -44,42 +91,61 @@ class BaseClass(abc.ABC):
         return instance_method_per_qualname.get(__qualname__)
 
     def to_key_field(self) -> typing.Optional[str]:
-        identifier = self.__setting__().identifier
-        if identifier:
-            return identifier.name
-        return None
+        return type(self).__field_layout__().key_field
 
     @classmethod
-    def fieldnames(cls, **kwargs):
+    def __field_layout__(cls) -> FieldLayout:
+        """Return the field layout cached on the class
+
+        Each '__setting__' defined in the MRO is called once on a dummy instance of the class,
+        so base classes which cannot be instantiated are supported too.
+        """
+        layout: typing.Optional[FieldLayout] = cls.__dict__.get('__field_layout_cache__')
+        if layout is not None and layout.generation == _field_layout_generation:
+            return layout
+
         dummy_instance = cls.__create_dummy_instance__()
-        base_field_names = ['instance', 'xid', 'xname']
-
-        def get_field_names(_class, instance):
-            super_class_field_names = []
-            if BaseClass not in _class.__bases__:
-                for base_class in _class.__bases__:
-                    super_class_field_names = get_field_names(base_class, base_class.__create_dummy_instance__())
-            identifier_name = list({instance.to_key_field()} - {None})
-            setting = instance.__setting__()
-            return super_class_field_names + identifier_name + [lf.name for lf in setting.local_fields + setting.ref_fields]
-        return base_field_names + get_field_names(cls, dummy_instance)
+        names = ['instance', 'xid', 'xname']
+        types: typing.Dict[str, BaseType] = {}
+        setting: typing.Optional[Setting] = None
+        for class_ in reversed(cls.__mro__):
+            setting_method = class_.__dict__.get('__setting__')
+            if setting_method is None or getattr(setting_method, '__isabstractmethod__', False):
+                continue
+            setting = setting_method.__get__(dummy_instance, cls)()
+            fields: typing.List[typing.Union[Identifier, LocalField, RefField]] = []
+            if setting.identifier is not None:
+                fields.append(setting.identifier)
+            fields.extend(setting.local_fields)
+            fields.extend(setting.ref_fields)
+            for field in fields:
+                if field.name not in types:
+                    names.append(field.name)
+                    types[field.name] = field.type
+
+        key_field = setting.identifier.name if setting is not None and setting.identifier is not None else None
+        layout = FieldLayout(names=names, key_field=key_field, types=types, generation=_field_layout_generation)
+        setattr(cls, '__field_layout_cache__', layout)
+        return layout
+
+    @classmethod
+    def fieldnames(cls, **kwargs):
+        return list(cls.__field_layout__().names)
 
     @property
     def dictionary(self) -> dict:
+        return self.__dictionary__()
+
+    def __dictionary__(self) -> dict:
+        """Convert the fields to a dict
+
+        The classes of libs/classes.py override this with code generated from their settings.
+        """
         dictionary = {}
-        for name in self.fieldnames():
-            if getattr(self, name, None) is not None:
-                dictionary[name] = getattr(self, name)
-            if hasattr(dictionary.get(name), 'dictionary'):
-                dictionary[name] = dictionary[name].dictionary
-            elif isinstance(dictionary.get(name), list):
-                l: list = dictionary[name].__class__()
-                for v in dictionary[name]:
-                    if hasattr(v, 'dictionary'):
-                        l.append(v.dictionary)
-                    else:
-                        l.append(v)
-                dictionary[name] = l
+        for name in type(self).__field_layout__().names:
+            value = getattr(self, name, None)
+            if value is not None:
+                dictionary[name] = to_dictionary_value(value)
         return dictionary
 
     @abc.abstractmethod
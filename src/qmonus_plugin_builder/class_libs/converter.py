@@ -5,7 +5,7 @@ import pathlib
 import json
 
 from .. import exceptions
-from ..libs import yaml_utils, file_utils, data_lib
+from ..libs import bundle_utils, data_lib, file_utils, profile_utils, project_index, yaml_utils
 from ..class_libs import component as comp
 from . import parser
 
@@ -41,6 +41,12 @@ def convert_type(type: comp.BaseType) -> str:
 
 
 class ClassYAML(object):
+    __slots__ = (
+        'category', 'name', 'persistence', 'abstract', 'extends', 'api_generation', 'api_auto_response',
+        'scope', 'version', 'created_at', 'update', 'identifier', 'local_fields', 'ref_fields',
+        'class_methods', 'instance_methods',
+    )
+
     def __init__(
         self,
         category: typing.Optional[str],
@@ -59,28 +65,19 @@ class ClassYAML(object):
         self.name = name
         self.persistence = persistence
         self.abstract = abstract
-
-        if extends is not None:
-            self.extends = extends
-
+        self.extends = extends
         self.api_generation = api_generation
-
-        if api_auto_response is not None:
-            self.api_auto_response = api_auto_response
-
-        if scope is not None:
-            self.scope = scope
-
+        self.api_auto_response = api_auto_response
+        self.scope = scope
         self.version = version
+        self.created_at = created_at
+        self.update = update
 
-        if created_at is not None:
-            self.created_at = created_at
-
-        if update is not None:
-            self.update = update
-
-        self.attributes: typing.Any = {}
-        self.methods: typing.Any = {}
+        self.identifier: typing.Optional[IdentifierYAML] = None
+        self.local_fields: typing.List[LocalFieldYAML] = []
+        self.ref_fields: typing.List[RefFieldYAML] = []
+        self.class_methods: typing.List[ClassMethodYAML] = []
+        self.instance_methods: typing.List[InstanceMethodYAML] = []
 
     def set_identifier(
         self,
@@ -93,7 +90,7 @@ class ClassYAML(object):
         field_dbtype: typing.Optional[str],
         field_length: typing.Optional[int],
     ) -> None:
-        self.attributes['identifier'] = IdentifierYAML(
+        self.identifier = IdentifierYAML(
             field_name=field_name,
             field_type=field_type,
             field_persistence=field_persistence,
@@ -137,9 +134,7 @@ class ClassYAML(object):
             field_dbtype=field_dbtype,
             field_length=field_length,
         )
-        if 'local_fields' not in self.attributes:
-            self.attributes['local_fields'] = []
-        self.attributes['local_fields'].append(local_field)
+        self.local_fields.append(local_field)
 
     def add_ref_field(
         self,
@@ -164,15 +159,11 @@ class ClassYAML(object):
             field_dbtype=field_dbtype,
             field_length=field_length,
         )
-        if 'ref_fields' not in self.attributes:
-            self.attributes['ref_fields'] = []
-        self.attributes['ref_fields'].append(ref_field)
+        self.ref_fields.append(ref_field)
 
     def add_class_method(self, method_body: str) -> None:
         class_method = ClassMethodYAML(method_body=method_body)
-        if 'class_methods' not in self.methods:
-            self.methods['class_methods'] = []
-        self.methods['class_methods'].append(class_method)
+        self.class_methods.append(class_method)
 
     def add_instance_method(
         self,
@@ -193,12 +184,45 @@ class ClassYAML(object):
             field_order=field_order,
             timeout=timeout,
         )
-        if 'instance_methods' not in self.methods:
-            self.methods['instance_methods'] = []
-        self.methods['instance_methods'].append(instance_method)
+        self.instance_methods.append(instance_method)
 
     def to_dict(self) -> typing.Dict[str, typing.Any]:
-        _dict: typing.Dict[str, typing.Any] = data_lib.to_primitive(self)
+        with profile_utils.span('to_primitive'):
+            _dict: typing.Dict[str, typing.Any] = {
+                'category': self.category,
+                'name': self.name,
+                'persistence': self.persistence,
+                'abstract': self.abstract,
+            }
+            if self.extends is not None:
+                _dict['extends'] = data_lib.to_primitive(self.extends)
+            _dict['api_generation'] = self.api_generation
+            if self.api_auto_response is not None:
+                _dict['api_auto_response'] = self.api_auto_response
+            if self.scope is not None:
+                _dict['scope'] = self.scope
+            _dict['version'] = self.version
+            if self.created_at is not None:
+                _dict['created_at'] = self.created_at
+            if self.update is not None:
+                _dict['update'] = self.update
+
+            attributes: typing.Dict[str, typing.Any] = {}
+            if self.identifier is not None:
+                attributes['identifier'] = self.identifier.to_dict()
+            if len(self.local_fields) > 0:
+                attributes['local_fields'] = [local_field.to_dict() for local_field in self.local_fields]
+            if len(self.ref_fields) > 0:
+                attributes['ref_fields'] = [ref_field.to_dict() for ref_field in self.ref_fields]
+            _dict['attributes'] = attributes
+
+            methods: typing.Dict[str, typing.Any] = {}
+            if len(self.class_methods) > 0:
+                methods['class_methods'] = [class_method.to_dict() for class_method in self.class_methods]
+            if len(self.instance_methods) > 0:
+                methods['instance_methods'] = [
+                    instance_method.to_dict() for instance_method in self.instance_methods]
+            _dict['methods'] = methods
         return _dict
 
     def dump(self) -> str:
@@ -206,6 +230,11 @@ class ClassYAML(object):
 
 
 class IdentifierYAML(object):
+    __slots__ = (
+        'field_name', 'field_type', 'field_persistence', 'field_immutable', 'field_default', 'field_metadata',
+        'field_dbtype', 'field_length',
+    )
+
     def __init__(
         self,
         field_name: str,
@@ -221,21 +250,36 @@ class IdentifierYAML(object):
         self.field_type = field_type
         self.field_persistence = field_persistence
         self.field_immutable = field_immutable
+        self.field_default = field_default
+        self.field_metadata = field_metadata
+        self.field_dbtype = field_dbtype
+        self.field_length = field_length
 
-        if field_default is not None:
-            self.field_default = field_default
-
-        if field_metadata is not None:
-            self.field_metadata = field_metadata
-
-        if field_dbtype is not None:
-            self.field_dbtype = field_dbtype
-
-        if field_length is not None:
-            self.field_length = field_length
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        _dict: typing.Dict[str, typing.Any] = {
+            'field_name': self.field_name,
+            'field_type': self.field_type,
+            'field_persistence': self.field_persistence,
+            'field_immutable': self.field_immutable,
+        }
+        if self.field_default is not None:
+            _dict['field_default'] = data_lib.to_primitive(self.field_default)
+        if self.field_metadata is not None:
+            _dict['field_metadata'] = data_lib.to_primitive(self.field_metadata)
+        if self.field_dbtype is not None:
+            _dict['field_dbtype'] = self.field_dbtype
+        if self.field_length is not None:
+            _dict['field_length'] = self.field_length
+        return _dict
 
 
 class LocalFieldYAML(object):
+    __slots__ = (
+        'field_name', 'field_type', 'field_persistence', 'field_nullable', 'field_immutable', 'field_unique',
+        'field_default', 'field_enum', 'field_format', 'field_metadata', 'field_alias', 'field_fsm',
+        'field_dbtype', 'field_length',
+    )
+
     def __init__(
         self,
         field_name: str,
@@ -259,33 +303,49 @@ class LocalFieldYAML(object):
         self.field_nullable = field_nullable
         self.field_immutable = field_immutable
         self.field_unique = field_unique
+        self.field_default = field_default
+        self.field_enum = field_enum
+        self.field_format = field_format
+        self.field_metadata = field_metadata
+        self.field_alias = field_alias
+        self.field_fsm = field_fsm
+        self.field_dbtype = field_dbtype
+        self.field_length = field_length
 
-        if field_default is not None:
-            self.field_default = field_default
-
-        if field_enum is not None:
-            self.field_enum = field_enum
-
-        if field_format is not None:
-            self.field_format = field_format
-
-        if field_metadata is not None:
-            self.field_metadata = field_metadata
-
-        if field_alias is not None:
-            self.field_alias = field_alias
-
-        if field_fsm is not None:
-            self.field_fsm = field_fsm
-
-        if field_dbtype is not None:
-            self.field_dbtype = field_dbtype
-
-        if field_length is not None:
-            self.field_length = field_length
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        _dict: typing.Dict[str, typing.Any] = {
+            'field_name': self.field_name,
+            'field_type': self.field_type,
+            'field_persistence': self.field_persistence,
+            'field_nullable': self.field_nullable,
+            'field_immutable': self.field_immutable,
+            'field_unique': self.field_unique,
+        }
+        if self.field_default is not None:
+            _dict['field_default'] = data_lib.to_primitive(self.field_default)
+        if self.field_enum is not None:
+            _dict['field_enum'] = data_lib.to_primitive(self.field_enum)
+        if self.field_format is not None:
+            _dict['field_format'] = self.field_format
+        if self.field_metadata is not None:
+            _dict['field_metadata'] = data_lib.to_primitive(self.field_metadata)
+        if self.field_alias is not None:
+            _dict['field_alias'] = self.field_alias
+        if self.field_fsm is not None:
+            _dict['field_fsm'] = data_lib.to_primitive(self.field_fsm)
+        if self.field_dbtype is not None:
+            _dict['field_dbtype'] = self.field_dbtype
+        if self.field_length is not None:
+            _dict['field_length'] = self.field_length
+        return _dict
 
 
 class RefFieldYAML(object):
+    __slots__ = (
+        'field_name', 'field_type', 'field_persistence', 'field_unique', 'ref_class', 'ref_class_field',
+        'field_metadata', 'field_dbtype', 'field_length',
+    )
+
     def __init__(
         self,
         field_name: str,
@@ -304,23 +364,44 @@ class RefFieldYAML(object):
         self.field_unique = field_unique
         self.ref_class = ref_class
         self.ref_class_field = ref_class_field
+        self.field_metadata = field_metadata
+        self.field_dbtype = field_dbtype
+        self.field_length = field_length
 
-        if field_metadata is not None:
-            self.field_metadata = field_metadata
-
-        if field_dbtype is not None:
-            self.field_dbtype = field_dbtype
-
-        if field_length is not None:
-            self.field_length = field_length
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        _dict: typing.Dict[str, typing.Any] = {
+            'field_name': self.field_name,
+            'field_type': self.field_type,
+            'field_persistence': self.field_persistence,
+            'field_unique': self.field_unique,
+            'ref_class': self.ref_class,
+            'ref_class_field': self.ref_class_field,
+        }
+        if self.field_metadata is not None:
+            _dict['field_metadata'] = data_lib.to_primitive(self.field_metadata)
+        if self.field_dbtype is not None:
+            _dict['field_dbtype'] = self.field_dbtype
+        if self.field_length is not None:
+            _dict['field_length'] = self.field_length
+        return _dict
 
 
 class ClassMethodYAML(object):
+    __slots__ = ('method_body',)
+
     def __init__(self, method_body: str) -> None:
         self.method_body = method_body
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {'method_body': self.method_body}
+
 
 class InstanceMethodYAML(object):
+    __slots__ = (
+        'method_body', 'propagation_mode', 'topdown', 'auto_rollback', 'multiplexable_number', 'field_order',
+        'timeout',
+    )
+
     def __init__(
         self,
         method_body: str,
@@ -337,9 +418,20 @@ class InstanceMethodYAML(object):
         self.auto_rollback = auto_rollback
         self.multiplexable_number = multiplexable_number
         self.field_order = field_order
+        self.timeout = timeout
 
-        if timeout is not None:
-            self.timeout = timeout
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        _dict: typing.Dict[str, typing.Any] = {
+            'method_body': self.method_body,
+            'propagation_mode': self.propagation_mode,
+            'topdown': self.topdown,
+            'auto_rollback': self.auto_rollback,
+            'multiplexable_number': self.multiplexable_number,
+            'field_order': self.field_order,
+        }
+        if self.timeout is not None:
+            _dict['timeout'] = self.timeout
+        return _dict
 
 
 def to_yaml(cls_def: parser.ClassDefinition) -> ClassYAML:
@@ -451,14 +543,42 @@ def to_yaml(cls_def: parser.ClassDefinition) -> ClassYAML:
     return class_yaml
 
 
-def to_yaml_file(module_path: pathlib.Path, yaml_path: pathlib.Path) -> None:
-    definitions = parser.get_definitions(module_path)
-    for definition in definitions:
-        yaml = to_yaml(definition)
+def iter_yaml_files(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[typing.Tuple[pathlib.Path, pathlib.PurePosixPath, str]]:
+    """Yield the source file path, the yaml file path relative to the output directory and the yaml one by one"""
+    for definition in parser.iter_definitions(module_path, paths=paths, index=index):
+        with profile_utils.span('convert', kind='classes', plugin=definition.name):
+            yaml = to_yaml(definition)
         if definition.setting.workspace is None:
             raise exceptions.FatalError("workspace must not be 'None'")
-        dir_path = yaml_path.joinpath(definition.setting.workspace).joinpath('classes')
-        file_utils.create_dir(dir_path)
-        file_path = dir_path.joinpath(f"{definition.name}.yml")
-        logger.info(f"Creating '{str(file_path)}'")
-        file_utils.create_file(file_path=file_path, data=yaml.dump())
+        relative_path = pathlib.PurePosixPath(definition.setting.workspace, 'classes', f"{definition.name}.yml")
+        yield definition.path, relative_path, yaml.dump()
+
+
+def to_yaml_file(
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+    stats: typing.Optional[file_utils.WriteStats] = None,
+    bundle: typing.Optional[bundle_utils.BundleWriter] = None,
+) -> typing.Dict[pathlib.Path, pathlib.Path]:
+    """Dump yaml files and return the created file path per source file path
+
+    If 'bundle' is given, the files are added to it instead of being written under 'yaml_path'.
+    """
+    file_paths: typing.Dict[pathlib.Path, pathlib.Path] = {}
+    for path, relative_path, data in iter_yaml_files(module_path, paths=paths, index=index):
+        file_path = yaml_path.joinpath(relative_path)
+        if bundle is not None:
+            logger.info(f"Adding '{str(file_path)}'")
+            bundle.create_file(file_path=file_path, data=data, stats=stats)
+        else:
+            file_utils.create_dir(file_path.parent)
+            logger.info(f"Creating '{str(file_path)}'")
+            file_utils.create_file(file_path=file_path, data=data, stats=stats)
+        file_paths[path] = file_path
+    return file_paths
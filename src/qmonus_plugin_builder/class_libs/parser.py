@@ -1,16 +1,15 @@
 from __future__ import annotations
 
+import ast
 import collections
-import importlib
 import inspect
 import logging
 import pathlib
-import re
 import types
 import typing
 
 from .. import exceptions
-from ..libs import inspect_utils, sort_lib
+from ..libs import ast_utils, file_utils, inspect_utils, profile_utils, project_index, sort_lib
 from . import component as comp
 
 logger = logging.getLogger(__name__)
@@ -18,15 +17,17 @@ logger = logging.getLogger(__name__)
 
 def _sort_class_definitions(
     class_definitions: typing.List[ClassDefinition],
+    partial: bool = False,
 ) -> typing.List[ClassDefinition]:
     graph: typing.Dict[str, typing.List[str]] = {}
     map: typing.Dict[str, ClassDefinition] = {}
+    class_names = {class_definition.name for class_definition in class_definitions}
     for class_definition in class_definitions:
         class_name = class_definition.name
         parent_class_names = [
             cls.__name__ for cls in class_definition.setting.extends
         ] if class_definition.setting.extends is not None else []
-        graph[class_name] = parent_class_names
+        graph[class_name] = _get_sorted_parent_class_names(class_name, parent_class_names, class_names, partial)
         map[class_name] = class_definition
 
     sorted_class_names = sort_lib.topological_sort(graph)
@@ -38,16 +39,34 @@ def _sort_class_definitions(
     return sorted_class_definitions
 
 
-def get_files(module_path: pathlib.Path) -> typing.List[pathlib.Path]:
-    if not module_path.is_dir():
-        raise ValueError(f"Invalid module_path specified: '{str(module_path)}' does not exist.")
-
-    files: typing.List[pathlib.Path] = []
-    for file in module_path.glob('plugins/*/classes/**/*.py'):
-        if file.name == '__init__.py':
-            continue
+def _get_sorted_parent_class_names(
+    class_name: str,
+    parent_class_names: typing.List[str],
+    class_names: typing.Collection[str],
+    partial: bool,
+) -> typing.List[str]:
+    """Return the parents which affect the order of the classes
+
+    Parents outside of a partial list of classes (e.g. changed files) are ignored.
+    Otherwise every parent must be one of the classes.
+    """
+    if not partial:
+        for parent_class_name in parent_class_names:
+            if parent_class_name not in class_names:
+                raise exceptions.ClassError(f"Unknown class '{parent_class_name}' extended by '{class_name}'")
+    return [parent_class_name for parent_class_name in parent_class_names if parent_class_name in class_names]
+
+
+def get_files(
+    module_path: pathlib.Path,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[pathlib.Path]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+
+    files = index.get_files('classes')
+    for file in files:
         logger.info(f"Class file detected: '{str(file)}'")
-        files.append(file)
 
     # Check duplication
     counter = collections.Counter([file.stem for file in files])
@@ -55,105 +74,272 @@ def get_files(module_path: pathlib.Path) -> typing.List[pathlib.Path]:
         if count != 1:
             raise exceptions.ClassError(f"Duplicate class '{name}' detected")
 
-    sorted_files = sorted(files, key=lambda x: str(x))
-    return sorted_files
+    return files
 
 
-def get_modules(module_path: pathlib.Path) -> typing.List[types.ModuleType]:
-    paths = get_files(module_path=module_path)
+def get_modules(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[types.ModuleType]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
     modules: typing.List[types.ModuleType] = []
     for path in paths:
-        module_name = str(path.relative_to(module_path.parent).with_suffix('').as_posix()).replace('/', '.')
-        logger.info(f"importing class module '{module_name}'")
-        module = importlib.import_module(module_name)
-        modules.append(module)
+        modules.append(_import_module(index, path))
     return modules
 
 
-def get_definitions(module_path: pathlib.Path) -> typing.List[ClassDefinition]:
-    modules = get_modules(module_path)
+def _import_module(index: project_index.ProjectIndex, path: pathlib.Path) -> types.ModuleType:
+    logger.info(f"importing class module '{index.get_module_name(path)}'")
+    return index.import_module(path)
+
+
+def get_definitions(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[ClassDefinition]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    partial = paths is not None
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
     definitions: typing.List[ClassDefinition] = []
-    for module in modules:
-        class_name = module.__name__.split('.')[-1]
-        class_: typing.Optional[typing.Type[comp.BaseClass]] = getattr(module, class_name, None)
-        if class_ is None:
-            raise exceptions.ClassError(f"'{class_name}' does not exist in '{module.__name__}'")
-
-        if len(class_.__bases__) != 1:
-            raise exceptions.ClassError(f"Base class name must be 'classes.{class_name}' for '{class_name}'")
-
-        if not issubclass(class_.__bases__[0], comp.BaseClass):
-            raise exceptions.ClassError(f"Invalid base class '{class_.__bases__[0]}' for 'Class' in '{module.__name__}'")
-
-        class_instance = class_.__create_dummy_instance__()
-
-        # setting
-        setting = class_instance.__setting__()
-        if setting.workspace is None:
-            setting.workspace = _get_default_workspace(module)
-        if setting.category is None:
-            setting.category = _get_default_category(module)
-
-        class_methods: typing.List[ClassMethodDefinition] = []
-        instance_methods: typing.List[InstanceMethodDefinition] = []
-        for k, v in vars(class_).items():
-            # class method
-            if isinstance(v, classmethod):
-                if k == '__create_dummy_instance__':
-                    continue
-                class_method = getattr(class_instance, k)
-                code = inspect.getsource(class_method)
-                code = inspect_utils.outdent(code)
-                is_coroutine = inspect.iscoroutinefunction(class_method)
-                method_body = _remove_decorator(code=code, is_coroutine=is_coroutine)
-                class_methods.append(ClassMethodDefinition(method_body=method_body))
-
-            # instance method
-            # New in python 3.8. Use assignment expressions
-            # https://docs.python.org/ja/3/whatsnew/3.8.html#assignment-expressions
-            elif inspect.isfunction(v) and (
-                instance_method := getattr(class_instance, k)
-            ) and (
-                comp_instance_method := class_instance.__get_instance_method_by_qualname__(v.__qualname__)
-            ) and isinstance(comp_instance_method, comp.InstanceMethod):
-                code = inspect.getsource(instance_method)
-                code = inspect_utils.outdent(code)
-                is_coroutine = inspect.iscoroutinefunction(instance_method)
-                method_body = _remove_decorator(code=code, is_coroutine=is_coroutine)
-                instance: comp.InstanceMethod = comp_instance_method
-                instance_methods.append(
-                    InstanceMethodDefinition(
-                        method_body=method_body,
-                        instance_method=instance))
-
-        definition = ClassDefinition(
-            name=class_name,
-            setting=setting,
-            class_methods=class_methods,
-            instance_methods=instance_methods,
-        )
+    for path in paths:
+        definition = index.definitions.get(path)
+        if definition is None:
+            with profile_utils.span('parse', kind='classes', plugin=index.get_module_name(path)):
+                definition = _load_definition(index, path)
+            index.definitions[path] = definition
         definitions.append(definition)
 
-    sorted_class_definitions = _sort_class_definitions(definitions)
+    sorted_class_definitions = _sort_class_definitions(definitions, partial=partial)
     return sorted_class_definitions
 
 
-def _remove_decorator(code: str, is_coroutine: bool) -> str:
-    # TODO: Find better solution
-    if is_coroutine:
-        new_code = re.sub(r"@(.|\n)+?\n(?=async)", "", code, 1)
-    else:
-        new_code = re.sub(r"@(.|\n)+?\n(?=def)", "", code, 1)
-    return new_code
-
+def iter_definitions(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[ClassDefinition]:
+    """Yield definitions one by one in the same order as get_definitions()
+
+    The order is computed from the parent class names read by get_parent_class_names(),
+    so parsed definitions are not cached in the index and each definition can be freed
+    as soon as the caller is done with it.
+    """
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    for path in sort_files(module_path, paths=paths, index=index):
+        definition = index.definitions.get(path)
+        if definition is None:
+            with profile_utils.span('parse', kind='classes', plugin=index.get_module_name(path)):
+                definition = _load_definition(index, path)
+        yield definition
+
+
+def sort_files(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[pathlib.Path]:
+    """Return the class files in the order of iter_definitions(), so that classes come after their parents"""
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    partial = paths is not None
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
+    path_per_class_name = {path.stem: path for path in paths}
+    graph: typing.Dict[str, typing.List[str]] = {}
+    for class_name, path in path_per_class_name.items():
+        graph[class_name] = _get_sorted_parent_class_names(
+            class_name, get_parent_class_names(index, path), path_per_class_name, partial)
+    return [path_per_class_name[class_name] for class_name in sort_lib.topological_sort(graph)]
+
+
+def get_parent_class_names(index: project_index.ProjectIndex, path: pathlib.Path) -> typing.List[str]:
+    """Return the names of the classes which the class extends
+
+    The setting is read from the source code without parsing methods. Only if it cannot
+    be read statically, the definition is loaded and cached in the index.
+    """
+    definition = index.definitions.get(path)
+    if definition is None:
+        module_name = index.get_module_name(path)
+        try:
+            source = ast_utils.SourceFile(file_utils.open_file(path), module_name)
+            _, setting = _get_static_setting(
+                source, source.get_namespace(comp, class_names=index.get_class_names()), path.stem)
+        except exceptions.StaticAnalysisError as e:
+            logger.info(f"Loading '{str(path)}' to get parent classes: {e}")
+            definition = get_definitions(index.module_path, paths=[path], index=index)[0]
+    if definition is not None:
+        setting = definition.setting
+    if setting.extends is None:
+        return []
+    return [cls.__name__ for cls in setting.extends]
+
+
+def _load_definition(index: project_index.ProjectIndex, path: pathlib.Path) -> ClassDefinition:
+    if index.static:
+        try:
+            return _get_static_definition(index, path)
+        except exceptions.StaticAnalysisError as e:
+            logger.info(f"Falling back to import for '{str(path)}': {e}")
+    return _get_definition(_import_module(index, path))
+
+
+def _get_definition(module: types.ModuleType) -> ClassDefinition:
+    class_name = module.__name__.split('.')[-1]
+    class_: typing.Optional[typing.Type[comp.BaseClass]] = getattr(module, class_name, None)
+    if class_ is None:
+        raise exceptions.ClassError(f"'{class_name}' does not exist in '{module.__name__}'")
+
+    if len(class_.__bases__) != 1:
+        raise exceptions.ClassError(f"Base class name must be 'classes.{class_name}' for '{class_name}'")
+
+    if not inspect_utils.is_subclass(class_.__bases__[0], comp.BaseClass):
+        raise exceptions.ClassError(f"Invalid base class '{class_.__bases__[0]}' for 'Class' in '{module.__name__}'")
+
+    class_instance = class_.__create_dummy_instance__()
+
+    # setting
+    setting = class_instance.__setting__()
+    if setting.workspace is None:
+        setting.workspace = _get_default_workspace(module.__name__)
+    if setting.category is None:
+        setting.category = _get_default_category(module.__name__)
+
+    class_methods: typing.List[ClassMethodDefinition] = []
+    instance_methods: typing.List[InstanceMethodDefinition] = []
+    for k, v in vars(class_).items():
+        # class method
+        if isinstance(v, classmethod):
+            if k == '__create_dummy_instance__':
+                continue
+            class_method = getattr(class_instance, k)
+            code = inspect.getsource(class_method)
+            code = inspect_utils.outdent(code)
+            method_body = inspect_utils.remove_decorators(code)
+            class_methods.append(ClassMethodDefinition(method_body=method_body))
+
+        # instance method
+        # New in python 3.8. Use assignment expressions
+        # https://docs.python.org/ja/3/whatsnew/3.8.html#assignment-expressions
+        elif inspect.isfunction(v) and (
+            instance_method := getattr(class_instance, k)
+        ) and (
+            comp_instance_method := class_instance.__get_instance_method_by_qualname__(v.__qualname__)
+        ) and isinstance(comp_instance_method, comp.InstanceMethod):
+            code = inspect.getsource(instance_method)
+            code = inspect_utils.outdent(code)
+            method_body = inspect_utils.remove_decorators(code)
+            instance: comp.InstanceMethod = comp_instance_method
+            instance_methods.append(
+                InstanceMethodDefinition(
+                    method_body=method_body,
+                    instance_method=instance))
+
+    definition = ClassDefinition(
+        name=class_name,
+        setting=setting,
+        class_methods=class_methods,
+        instance_methods=instance_methods,
+        path=pathlib.Path(str(module.__file__)).resolve(),
+    )
+    return definition
+
+
+def _get_static_definition(index: project_index.ProjectIndex, path: pathlib.Path) -> ClassDefinition:
+    module_name = index.get_module_name(path)
+    logger.info(f"parsing class module '{module_name}'")
+    source = ast_utils.SourceFile(file_utils.open_file(path), module_name)
+    namespace = source.get_namespace(comp, class_names=index.get_class_names())
+
+    class_name = path.stem
+    class_node, setting = _get_static_setting(source, namespace, class_name)
+
+    class_methods: typing.List[ClassMethodDefinition] = []
+    instance_methods: typing.List[InstanceMethodDefinition] = []
+    for method in ast_utils.get_methods(class_node):
+        instance: typing.Optional[comp.InstanceMethod] = None
+        is_class_method = False
+        for position, decorator in enumerate(method.decorator_list):
+            if isinstance(decorator, ast.Name) and decorator.id in ('classmethod', 'staticmethod', 'property'):
+                # Only the outermost classmethod makes a class method
+                if decorator.id == 'classmethod' and position != 0:
+                    raise exceptions.StaticAnalysisError(
+                        f"Unsupported decorators of '{method.name}' in '{module_name}' (line {decorator.lineno})")
+                is_class_method = decorator.id == 'classmethod'
+                continue
+            value = ast_utils.evaluate(decorator, namespace)
+            if isinstance(value, comp.InstanceMethod):
+                instance = value
+
+        if not is_class_method and instance is None:
+            continue
+        if is_class_method and method.name == '__create_dummy_instance__':
+            continue
 
-def _get_default_workspace(module: types.ModuleType) -> str:
-    workspace = module.__name__.split('.')[2]
+        code = inspect_utils.outdent(source.get_source(method))
+        method_body = inspect_utils.remove_decorators(code)
+        if is_class_method:
+            class_methods.append(ClassMethodDefinition(method_body=method_body))
+        elif instance is not None:
+            instance_methods.append(
+                InstanceMethodDefinition(
+                    method_body=method_body,
+                    instance_method=instance))
+
+    definition = ClassDefinition(
+        name=class_name,
+        setting=setting,
+        class_methods=class_methods,
+        instance_methods=instance_methods,
+        path=path.resolve(),
+    )
+    return definition
+
+
+def _get_static_setting(
+    source: ast_utils.SourceFile,
+    namespace: typing.Dict[str, typing.Any],
+    class_name: str,
+) -> typing.Tuple[ast.ClassDef, comp.Setting]:
+    module_name = source.module_name
+    class_node = source.get_class(class_name)
+    if class_node is None:
+        raise exceptions.StaticAnalysisError(f"'{class_name}' does not exist in '{module_name}'")
+
+    if len(class_node.bases) != 1:
+        raise exceptions.ClassError(f"Base class name must be 'classes.{class_name}' for '{class_name}'")
+
+    if not isinstance(ast_utils.evaluate(class_node.bases[0], namespace), ast_utils.ClassReference):
+        raise exceptions.StaticAnalysisError(f"Unknown base class for '{class_name}' in '{module_name}'")
+
+    setting_node = ast_utils.get_method(class_node, '__setting__')
+    if setting_node is None:
+        raise exceptions.StaticAnalysisError(f"'{class_name}.__setting__' does not exist in '{module_name}'")
+    setting = ast_utils.get_returned_value(setting_node, namespace)
+    if not isinstance(setting, comp.Setting):
+        raise exceptions.StaticAnalysisError(f"Invalid setting of '{class_name}' in '{module_name}'")
+    if setting.workspace is None:
+        setting.workspace = _get_default_workspace(module_name)
+    if setting.category is None:
+        setting.category = _get_default_category(module_name)
+    return class_node, setting
+
+
+def _get_default_workspace(module_name: str) -> str:
+    workspace = module_name.split('.')[2]
     return workspace
 
 
-def _get_default_category(module: types.ModuleType) -> str:
-    names = module.__name__.split('.')[4:-1]
+def _get_default_category(module_name: str) -> str:
+    names = module_name.split('.')[4:-1]
     category = ".".join(names)
     return category
 
@@ -165,11 +351,13 @@ class ClassDefinition(object):
         setting: comp.Setting,
         class_methods: typing.List[ClassMethodDefinition],
         instance_methods: typing.List[InstanceMethodDefinition],
+        path: pathlib.Path,
     ) -> None:
         self.name = name
         self.setting = setting
         self.class_methods = class_methods
         self.instance_methods = instance_methods
+        self.path = path
 
 
 class ClassMethodDefinition(object):
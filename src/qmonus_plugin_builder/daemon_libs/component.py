@@ -59,6 +59,12 @@ class BaseCommand(abc.ABC):
     @typing.final
     def get_code(self, method_name: str) -> typing.Optional[str]:
         cls_dict = vars(self.__class__)
+        # Commands built by the static parser keep the source code of their methods
+        static_sources: typing.Optional[typing.Dict[str, str]] = cls_dict.get('__static_sources__')
+        if static_sources is not None:
+            source = static_sources.get(method_name)
+            return inspect_utils.get_function_body(source) if source is not None else None
+
         if method_name in cls_dict:
             code = inspect_utils.get_function_code(cls_dict[method_name])
         else:
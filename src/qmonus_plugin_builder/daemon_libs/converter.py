@@ -4,7 +4,7 @@ import logging
 import pathlib
 
 from .. import exceptions
-from ..libs import yaml_utils, file_utils, data_lib
+from ..libs import bundle_utils, data_lib, file_utils, inspect_utils, profile_utils, project_index, yaml_utils
 from . import component as comp
 from . import parser
 
@@ -12,6 +12,11 @@ logger = logging.getLogger(__name__)
 
 
 class DaemonYAML(object):
+    __slots__ = (
+        'category', 'name', 'unlimited', 'count', 'interval', 'status', 'version', 'update', 'global_variables',
+        'commands', 'variable_groups',
+    )
+
     def __init__(
         self, 
         category: typing.Optional[str],
@@ -25,17 +30,12 @@ class DaemonYAML(object):
     ) -> None:
         self.category = category
         self.name = name
+        self.unlimited = unlimited
+        self.count = count
+        self.interval = interval
         self.status = status
         self.version = version
-
-        if update is not None:
-            self.update = update
-        
-        self.action = {
-            'unlimited': unlimited,
-            'count': count,
-            'interval': interval,
-        }
+        self.update = update
 
         self.global_variables: typing.Dict[str, GlobalVariableYAML] = {}
         self.commands: typing.List[ScriptCommandYAML] = []
@@ -66,7 +66,24 @@ class DaemonYAML(object):
         self.commands.append(command)
 
     def to_dict(self) -> typing.Dict[str, typing.Any]:
-        _dict: typing.Dict[str, typing.Any] = data_lib.to_primitive(self)
+        with profile_utils.span('to_primitive'):
+            _dict: typing.Dict[str, typing.Any] = {
+                'category': self.category,
+                'name': self.name,
+                'status': self.status,
+                'version': self.version,
+            }
+            if self.update is not None:
+                _dict['update'] = self.update
+            _dict['action'] = {
+                'unlimited': self.unlimited,
+                'count': self.count,
+                'interval': self.interval,
+            }
+            _dict['global_variables'] = {
+                name: global_variable.to_dict() for name, global_variable in self.global_variables.items()}
+            _dict['commands'] = [command.to_dict() for command in self.commands]
+            _dict['variable_groups'] = data_lib.to_primitive(self.variable_groups)
         return _dict
 
     def dump(self) -> str:
@@ -75,12 +92,19 @@ class DaemonYAML(object):
 
 
 class GlobalVariableYAML(object):
+    __slots__ = ('description', 'initial')
+
     def __init__(self, description: str = '', initial: typing.Any = None) -> None:
         self.description = description
         self.initial = initial
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {'description': self.description, 'initial': data_lib.to_primitive(self.initial)}
+
 
 class ScriptCommandYAML(object):
+    __slots__ = ('command', 'label', 'kwargs')
+
     def __init__(
         self,
         label: typing.Optional[str],
@@ -89,9 +113,7 @@ class ScriptCommandYAML(object):
         post_process_code: typing.Optional[str],
     ) -> None:
         self.command = 'script'
-
-        if label is not None:
-            self.label = label
+        self.label = label
 
         self.kwargs: typing.Any = {}
         if pre_process_code is not None:
@@ -110,6 +132,13 @@ class ScriptCommandYAML(object):
 
         self.kwargs['code'] = code
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        _dict: typing.Dict[str, typing.Any] = {'command': self.command}
+        if self.label is not None:
+            _dict['label'] = self.label
+        _dict['kwargs'] = data_lib.to_primitive(self.kwargs)
+        return _dict
+
 
 def to_yaml(definition: parser.DaemonDefinition) -> DaemonYAML:
     # Get setting
@@ -134,7 +163,8 @@ def to_yaml(definition: parser.DaemonDefinition) -> DaemonYAML:
         )
 
     for command in definition.commands:
-        if isinstance(command, comp.Script):
+        if inspect_utils.is_instance(command, comp.Script):
+            command = typing.cast(comp.Script, command)
             _setting = command.__setting__()
             code = command.get_code('code')
             pre_process_code = command.get_code('pre_process')
@@ -151,14 +181,42 @@ def to_yaml(definition: parser.DaemonDefinition) -> DaemonYAML:
     return daemon_yaml
 
 
-def to_yaml_file(module_path: pathlib.Path, yaml_path: pathlib.Path) -> None:
-    definitions = parser.get_definitions(module_path=module_path)
-    for definition in definitions:
-        yaml = to_yaml(definition)
+def iter_yaml_files(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[typing.Tuple[pathlib.Path, pathlib.PurePosixPath, str]]:
+    """Yield the source file path, the yaml file path relative to the output directory and the yaml one by one"""
+    for definition in parser.iter_definitions(module_path=module_path, paths=paths, index=index):
+        with profile_utils.span('convert', kind='daemons', plugin=definition.name):
+            yaml = to_yaml(definition)
         if definition.setting.workspace is None:
             raise exceptions.FatalError("workspace must not be 'None'")
-        dir_path = yaml_path.joinpath(definition.setting.workspace).joinpath('daemons')
-        file_utils.create_dir(dir_path)
-        file_path = dir_path.joinpath(f"{definition.name}.yml")
-        logger.info(f"Creating '{str(file_path)}'")
-        file_utils.create_file(file_path=file_path, data=yaml.dump())
+        relative_path = pathlib.PurePosixPath(definition.setting.workspace, 'daemons', f"{definition.name}.yml")
+        yield definition.path, relative_path, yaml.dump()
+
+
+def to_yaml_file(
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+    stats: typing.Optional[file_utils.WriteStats] = None,
+    bundle: typing.Optional[bundle_utils.BundleWriter] = None,
+) -> typing.Dict[pathlib.Path, pathlib.Path]:
+    """Dump yaml files and return the created file path per source file path
+
+    If 'bundle' is given, the files are added to it instead of being written under 'yaml_path'.
+    """
+    file_paths: typing.Dict[pathlib.Path, pathlib.Path] = {}
+    for path, relative_path, data in iter_yaml_files(module_path, paths=paths, index=index):
+        file_path = yaml_path.joinpath(relative_path)
+        if bundle is not None:
+            logger.info(f"Adding '{str(file_path)}'")
+            bundle.create_file(file_path=file_path, data=data, stats=stats)
+        else:
+            file_utils.create_dir(file_path.parent)
+            logger.info(f"Creating '{str(file_path)}'")
+            file_utils.create_file(file_path=file_path, data=data, stats=stats)
+        file_paths[path] = file_path
+    return file_paths
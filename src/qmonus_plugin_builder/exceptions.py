@@ -28,3 +28,7 @@ class ModuleError(Error):
 
 class FatalError(Error):
     pass
+
+
+class StaticAnalysisError(Error):
+    pass
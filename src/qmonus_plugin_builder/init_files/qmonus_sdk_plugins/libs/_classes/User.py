@@ -0,0 +1,83 @@
+##########################
+# Automatically generated
+##########################
+
+from __future__ import annotations
+import typing
+from qmonus_plugin_builder.class_libs import component as comp
+from qmonus_sdk_plugins.libs.class_globals import *
+
+
+class User(
+    comp.BaseClass,
+):
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        type: str,
+        id: typing.Optional[str] = None,
+        **kwargs
+    ):
+        # Automatically Generated
+
+        self.name: str = name
+        self.description: str = description
+        self.type: str = type
+        self.id: typing.Optional[str] = id
+        super().__init__(**kwargs)
+
+    def __dictionary__(self) -> dict:
+        # Automatically Generated
+
+        dictionary: dict = {}
+        value = getattr(self, 'instance', None)
+        if value is not None:
+            dictionary['instance'] = value
+        value = getattr(self, 'xid', None)
+        if value is not None:
+            dictionary['xid'] = value
+        value = getattr(self, 'xname', None)
+        if value is not None:
+            dictionary['xname'] = value
+        value = getattr(self, 'id', None)
+        if value is not None:
+            dictionary['id'] = value
+        value = getattr(self, 'name', None)
+        if value is not None:
+            dictionary['name'] = value
+        value = getattr(self, 'description', None)
+        if value is not None:
+            dictionary['description'] = value
+        value = getattr(self, 'type', None)
+        if value is not None:
+            dictionary['type'] = value
+        return dictionary
+
+    @classmethod
+    async def load(
+        cls,
+        key,
+        conn=None,
+        shallow=False
+    ) -> atom.User:
+        raise NotImplementedError
+
+    @classmethod
+    async def retrieve(
+        cls,
+        conn=None,
+        shallow=False,
+        order_by=[],
+        offset=0,
+        limit=None,
+        *,
+        instance=None,
+        xid=None,
+        xname=None,
+        name=None,
+        description=None,
+        type=None,
+        id=None,
+    ) -> typing.List[atom.User]:
+        raise NotImplementedError
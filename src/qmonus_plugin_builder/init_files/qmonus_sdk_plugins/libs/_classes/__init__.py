@@ -0,0 +1,3 @@
+##########################
+# Automatically generated
+##########################
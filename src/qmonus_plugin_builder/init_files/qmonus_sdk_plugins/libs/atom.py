@@ -2,4 +2,31 @@
 # Automatically generated
 ##########################
 
-from ..plugins.default.classes.default.User import User
+from __future__ import annotations
+import typing
+
+if typing.TYPE_CHECKING:
+    from ..plugins.default.classes.default.User import User as User
+
+__all__ = [
+    'User',
+]
+
+# Module and relative import level of each name, imported on first access (PEP 562)
+_MODULES: typing.Dict[str, typing.Tuple[str, int]] = {
+    'User': ('plugins.default.classes.default.User', 2),
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _MODULES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    module_name, level = _MODULES[name]
+    # Same as 'from {module_name} import {name}', so that import hooks see the dependency
+    value = getattr(__import__(module_name, globals(), None, [name], level), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> typing.List[str]:
+    return sorted({*globals(), *_MODULES})
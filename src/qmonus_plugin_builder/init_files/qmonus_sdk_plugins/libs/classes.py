@@ -4,56 +4,29 @@
 
 from __future__ import annotations
 import typing
-from qmonus_plugin_builder.class_libs import component as comp
-from qmonus_sdk_plugins.libs.class_globals import *
-
-
-class User(
-    comp.BaseClass,
-):
-    def __init__(
-        self,
-        name: str,
-        description: str,
-        type: str,
-        id: typing.Optional[str] = None,
-        **kwargs
-    ):
-        # Automatically Generated
-
-        self.name: str = name
-        self.description: str = description
-        self.type: str = type
-        self.id: typing.Optional[str] = id
-        super().__init__(**kwargs)
-
-    @classmethod
-    async def load(
-        cls,
-        key,
-        conn=None,
-        shallow=False
-    ) -> atom.User:
-        raise NotImplementedError
-
-    @classmethod
-    async def retrieve(
-        cls,
-        conn=None,
-        shallow=False,
-        order_by=[],
-        offset=0,
-        limit=None,
-        *,
-        instance=None,
-        xid=None,
-        xname=None,
-        name=None,
-        description=None,
-        type=None,
-        id=None,
-    ) -> typing.List[atom.User]:
-        raise NotImplementedError
 
+if typing.TYPE_CHECKING:
+    from ._classes.User import User as User
 
+__all__ = [
+    'User',
+]
 
+# Module and relative import level of each name, imported on first access (PEP 562)
+_MODULES: typing.Dict[str, typing.Tuple[str, int]] = {
+    'User': ('_classes.User', 1),
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _MODULES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    module_name, level = _MODULES[name]
+    # Same as 'from {module_name} import {name}', so that import hooks see the dependency
+    value = getattr(__import__(module_name, globals(), None, [name], level), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> typing.List[str]:
+    return sorted({*globals(), *_MODULES})
@@ -0,0 +1,261 @@
+import ast
+import inspect
+import io
+import types
+import typing
+
+from .. import exceptions
+
+AnyFunctionDef = typing.Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+# Names which refer to generated classes in plugins (e.g. 'atom.User', 'classes.User')
+REFERENCE_NAMES = ('atom', 'classes')
+
+
+class ClassReference(object):
+    """Stands for a class referred to by name (only '__name__' is available)"""
+    def __init__(self, name: str) -> None:
+        self.__name__ = name
+
+    def __repr__(self) -> str:
+        return f"ClassReference({self.__name__!r})"
+
+
+class _ReferenceNamespace(object):
+    def __init__(self, class_names: typing.Optional[typing.Collection[str]] = None) -> None:
+        self._class_names = class_names
+
+    def __getattr__(self, name: str) -> ClassReference:
+        if name.startswith('__'):
+            raise AttributeError(name)
+        # Unknown classes are left to the import, which fails like a normal dump
+        if self._class_names is not None and name not in self._class_names:
+            raise AttributeError(name)
+        return ClassReference(name)
+
+
+class SourceFile(object):
+    def __init__(self, text: str, module_name: str) -> None:
+        self.text = text
+        self.module_name = module_name
+        # Same lines as inspect.getsource() uses
+        self.lines = io.StringIO(text).readlines()
+        if len(self.lines) > 0 and not self.lines[-1].endswith('\n'):
+            self.lines[-1] = self.lines[-1] + '\n'
+        try:
+            self.tree = ast.parse(text)
+        except SyntaxError as e:
+            raise exceptions.StaticAnalysisError(f"Invalid syntax in '{module_name}': {e}")
+
+    def get_namespace(
+        self,
+        component_module: types.ModuleType,
+        class_names: typing.Optional[typing.Collection[str]] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """Return the names available to evaluate settings: the component module and class references
+
+        If 'class_names' is given, only the classes in it can be referred to.
+        """
+        namespace: typing.Dict[str, typing.Any] = {}
+        for name in REFERENCE_NAMES:
+            namespace[name] = _ReferenceNamespace(class_names)
+
+        package_name, _, module_name = component_module.__name__.rpartition('.')
+        for node in self.tree.body:
+            if isinstance(node, ast.ImportFrom) and node.module == package_name:
+                for alias in node.names:
+                    if alias.name == module_name:
+                        namespace[alias.asname or alias.name] = component_module
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name == component_module.__name__ and alias.asname is not None:
+                        namespace[alias.asname] = component_module
+        return namespace
+
+    def get_class(self, name: str) -> typing.Optional[ast.ClassDef]:
+        class_node = None
+        for node in self.tree.body:
+            if isinstance(node, ast.ClassDef) and node.name == name:
+                class_node = node
+        return class_node
+
+    def get_classes(self) -> typing.List[ast.ClassDef]:
+        return [node for node in self.tree.body if isinstance(node, ast.ClassDef)]
+
+    def get_source(self, node: typing.Union[AnyFunctionDef, ast.ClassDef]) -> str:
+        """Return the source code of the node including decorators like inspect.getsource()"""
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        end = typing.cast(int, node.end_lineno)
+        return ''.join(self.lines[start - 1:end])
+
+
+def get_methods(class_node: ast.ClassDef) -> typing.List[AnyFunctionDef]:
+    """Return methods in definition order. A redefined method keeps its first position like vars()."""
+    methods: typing.Dict[str, AnyFunctionDef] = {}
+    for node in class_node.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            methods[node.name] = node
+    return list(methods.values())
+
+
+def get_method(class_node: ast.ClassDef, name: str) -> typing.Optional[AnyFunctionDef]:
+    for method in reversed(get_methods(class_node)):
+        if method.name == name:
+            return method
+    return None
+
+
+def get_returned_value(
+    function_node: AnyFunctionDef,
+    namespace: typing.Dict[str, typing.Any],
+) -> typing.Any:
+    """Evaluate a function consisting of an optional docstring and a single return statement"""
+    body = list(function_node.body)
+    if len(body) > 0 and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:]
+    if len(body) != 1 or not isinstance(body[0], ast.Return):
+        raise exceptions.StaticAnalysisError(
+            f"'{function_node.name}' must consist of a single return statement (line {function_node.lineno})")
+    if body[0].value is None:
+        return None
+    return evaluate(body[0].value, namespace)
+
+
+def evaluate(node: ast.AST, namespace: typing.Dict[str, typing.Any]) -> typing.Any:
+    """Evaluate literals, names in the namespace, attributes and calls of them"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    elif isinstance(node, ast.List):
+        return [evaluate(element, namespace) for element in _elements(node.elts)]
+    elif isinstance(node, ast.Tuple):
+        return tuple(evaluate(element, namespace) for element in _elements(node.elts))
+    elif isinstance(node, ast.Set):
+        return {evaluate(element, namespace) for element in _elements(node.elts)}
+    elif isinstance(node, ast.Dict):
+        if any(key is None for key in node.keys):
+            raise exceptions.StaticAnalysisError(f"Unpacking is not supported (line {node.lineno})")
+        return {
+            evaluate(typing.cast(ast.AST, key), namespace): evaluate(value, namespace)
+            for key, value in zip(node.keys, node.values)
+        }
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)) \
+            and isinstance(node.operand, ast.Constant):
+        return ast.literal_eval(node)
+    elif isinstance(node, ast.Name):
+        if node.id in ('True', 'False', 'None'):
+            return ast.literal_eval(node)
+        if node.id not in namespace:
+            raise exceptions.StaticAnalysisError(f"'{node.id}' cannot be resolved statically (line {node.lineno})")
+        return namespace[node.id]
+    elif isinstance(node, ast.Attribute):
+        value = evaluate(node.value, namespace)
+        if isinstance(value, ClassReference) or node.attr.startswith('_'):
+            raise exceptions.StaticAnalysisError(
+                f"'{node.attr}' cannot be resolved statically (line {node.lineno})")
+        try:
+            return getattr(value, node.attr)
+        except AttributeError:
+            raise exceptions.StaticAnalysisError(f"'{node.attr}' cannot be resolved statically (line {node.lineno})")
+    elif isinstance(node, ast.Call):
+        func = evaluate(node.func, namespace)
+        if not callable(func) or isinstance(func, (ClassReference, _ReferenceNamespace)):
+            raise exceptions.StaticAnalysisError(f"Invalid call (line {node.lineno})")
+        args = [evaluate(arg, namespace) for arg in _elements(node.args)]
+        kwargs = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                raise exceptions.StaticAnalysisError(f"Unpacking is not supported (line {node.lineno})")
+            kwargs[keyword.arg] = evaluate(keyword.value, namespace)
+        return func(*args, **kwargs)
+    else:
+        raise exceptions.StaticAnalysisError(
+            f"'{type(node).__name__}' cannot be evaluated statically (line {getattr(node, 'lineno', '?')})")
+
+
+def _elements(elements: typing.List[ast.expr]) -> typing.List[ast.expr]:
+    for element in elements:
+        if isinstance(element, ast.Starred):
+            raise exceptions.StaticAnalysisError(f"Unpacking is not supported (line {element.lineno})")
+    return elements
+
+
+def get_module_level_calls(
+    tree: ast.Module,
+    func: typing.Callable[..., typing.Any],
+    namespace: typing.Dict[str, typing.Any],
+) -> typing.List[typing.Tuple[str, typing.Any]]:
+    """Return (name, value) of module level assignments whose value is a call of 'func'"""
+    results: typing.List[typing.Tuple[str, typing.Any]] = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+            value = node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+            value = node.value
+        else:
+            continue
+
+        if not isinstance(value, ast.Call):
+            continue
+        try:
+            called = evaluate(value.func, namespace)
+        except exceptions.StaticAnalysisError:
+            continue
+        if called is not func:
+            continue
+
+        for target in targets:
+            if not isinstance(target, ast.Name):
+                raise exceptions.StaticAnalysisError(f"Unsupported assignment target (line {node.lineno})")
+        evaluated = evaluate(value, namespace)
+        for target in targets:
+            results.append((typing.cast(ast.Name, target).id, evaluated))
+    return results
+
+
+def create_class(
+    source: SourceFile,
+    class_node: ast.ClassDef,
+    base: type,
+    namespace: typing.Dict[str, typing.Any],
+    constant_method_names: typing.Iterable[str],
+) -> type:
+    """Create a subclass of 'base' standing for the class node without executing its code
+
+    Methods in 'constant_method_names' are evaluated and return the same value on every call.
+    Overrides of coroutine methods of 'base' are not executable, their source code is kept
+    in '__static_sources__' instead. Any other statement raises StaticAnalysisError.
+    """
+    attributes: typing.Dict[str, typing.Any] = {
+        '__module__': source.module_name,
+        '__qualname__': class_node.name,
+        '__static_sources__': {},
+    }
+    for node in class_node.body:
+        if isinstance(node, ast.Pass) or (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)):
+            continue
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            raise exceptions.StaticAnalysisError(
+                f"Unsupported statement in '{class_node.name}' (line {node.lineno})")
+
+        if node.name in constant_method_names:
+            attributes[node.name] = _create_constant_method(get_returned_value(node, namespace))
+        elif inspect.iscoroutinefunction(getattr(base, node.name, None)):
+            attributes['__static_sources__'][node.name] = source.get_source(node)
+            attributes[node.name] = _not_executable
+        else:
+            raise exceptions.StaticAnalysisError(
+                f"'{node.name}' cannot be evaluated statically in '{class_node.name}' (line {node.lineno})")
+    return type(class_node.name, (base,), attributes)
+
+
+def _create_constant_method(value: typing.Any) -> typing.Callable[..., typing.Any]:
+    def method(self: typing.Any) -> typing.Any:
+        return value
+    return method
+
+
+async def _not_executable(self: typing.Any) -> None:
+    raise NotImplementedError('Statically parsed methods are not executable')
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import abc
+import gzip
+import hashlib
+import io
+import json
+import os
+import pathlib
+import tarfile
+import typing
+import uuid
+import zipfile
+
+from . import file_utils, profile_utils
+
+# Path of the index in bundles
+INDEX_PATH = '.qmonus_build/index.json'
+
+# Fixed timestamps so that the same files are always bundled into the same bytes
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+_TAR_MODES = {
+    '.tar': 'w|',
+    '.tar.bz2': 'w|bz2',
+    '.tar.xz': 'w|xz',
+}
+# tarfile writes the current time into the gzip header, so gzip is applied outside of tarfile
+_TAR_GZ_SUFFIXES = ('.tar.gz', '.tgz')
+_TAR_ZST_SUFFIXES = ('.tar.zst', '.tzst')
+_ZIP_SUFFIXES = ('.zip',)
+_YAML_SUFFIXES = ('.yaml', '.yml')
+
+
+class BundleEntry(object):
+    def __init__(self, path: str, hash: str, size: int, offset: typing.Optional[int] = None) -> None:
+        self.path = path
+        self.hash = hash
+        self.size = size
+        # Byte offset of the content in a YAML stream
+        self.offset = offset
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        dict_: typing.Dict[str, typing.Any] = {'path': self.path, 'sha256': self.hash, 'size': self.size}
+        if self.offset is not None:
+            dict_['offset'] = self.offset
+        return dict_
+
+
+class BundleWriter(abc.ABC):
+    """Collect generated files instead of writing them into a directory
+
+    Files are passed to create_file() with a path under 'path' like file_utils.create_file().
+    """
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.entries: typing.List[BundleEntry] = []
+        self._paths: typing.Set[str] = set()
+
+    def create_file(self, file_path: pathlib.Path, data: str, stats: typing.Optional[file_utils.WriteStats] = None) -> None:
+        self.add(file_path.relative_to(self.path).as_posix(), data.encode('utf-8'), stats=stats)
+
+    def add(self, path: str, content: bytes, stats: typing.Optional[file_utils.WriteStats] = None) -> None:
+        if path in self._paths:
+            raise ValueError(f"Duplicate bundle entry '{path}'")
+        self._paths.add(path)
+        entry = BundleEntry(path=path, hash=hashlib.sha256(content).hexdigest(), size=len(content))
+        with profile_utils.span('write'):
+            self._write(entry, content)
+        self.entries.append(entry)
+        if stats is not None:
+            stats.written += 1
+
+    @abc.abstractmethod
+    def _write(self, entry: BundleEntry, content: bytes) -> None:
+        pass
+
+
+class MemoryBundleWriter(BundleWriter):
+    """Keep the contents in memory, e.g. to send them from a worker process"""
+    def __init__(self, path: pathlib.Path) -> None:
+        super().__init__(path)
+        self.contents: typing.List[typing.Tuple[str, bytes]] = []
+
+    def _write(self, entry: BundleEntry, content: bytes) -> None:
+        self.contents.append((entry.path, content))
+
+
+class ArchiveBundleWriter(BundleWriter):
+    """Stream the files into a single archive file
+
+    The archive is written to a temporary file which replaces 'path' on close(), after
+    the index of paths and content hashes is appended as INDEX_PATH.
+    """
+    def __init__(self, path: pathlib.Path) -> None:
+        super().__init__(path)
+        if path.is_dir():
+            raise ValueError(f"Failed to create bundle: '{str(path)}' is directory")
+        file_utils.create_dir(path.parent)
+        self._temp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+        self._file: typing.BinaryIO = open(str(self._temp_path), 'xb')
+
+    def __enter__(self) -> ArchiveBundleWriter:
+        return self
+
+    def __exit__(self, exc_type: typing.Any, exc_value: typing.Any, traceback: typing.Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def close(self) -> None:
+        index = {'entries': [entry.to_dict() for entry in self.entries]}
+        content = json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8')
+        try:
+            self._write(BundleEntry(path=INDEX_PATH, hash='', size=len(content)), content)
+            self._close()
+            self._file.close()
+            os.replace(str(self._temp_path), str(self.path))
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Close the archive and delete the temporary file"""
+        try:
+            self._close()
+        except Exception:
+            pass
+        self._file.close()
+        try:
+            self._temp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        pass
+
+
+class TarBundleWriter(ArchiveBundleWriter):
+    def __init__(
+        self,
+        path: pathlib.Path,
+        mode: str,
+        open_compressor: typing.Optional[typing.Callable[[typing.BinaryIO], typing.BinaryIO]] = None,
+    ) -> None:
+        super().__init__(path)
+        self._compressor: typing.Optional[typing.BinaryIO] = (
+            open_compressor(self._file) if open_compressor is not None else None)
+        fileobj = self._compressor if self._compressor is not None else self._file
+        # tarfile.open() is typed per literal mode
+        tar_mode: typing.Any = mode
+        self._tar = tarfile.open(fileobj=fileobj, mode=tar_mode, format=tarfile.PAX_FORMAT)
+
+    def _write(self, entry: BundleEntry, content: bytes) -> None:
+        info = tarfile.TarInfo(entry.path)
+        info.size = len(content)
+        info.mode = 0o644
+        self._tar.addfile(info, io.BytesIO(content))
+
+    def _close(self) -> None:
+        self._tar.close()
+        if self._compressor is not None:
+            self._compressor.close()
+
+
+class ZipBundleWriter(ArchiveBundleWriter):
+    def __init__(self, path: pathlib.Path) -> None:
+        super().__init__(path)
+        self._zip = zipfile.ZipFile(self._file, mode='w', compression=zipfile.ZIP_DEFLATED)
+
+    def _write(self, entry: BundleEntry, content: bytes) -> None:
+        info = zipfile.ZipInfo(entry.path, date_time=_ZIP_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        self._zip.writestr(info, content)
+
+    def _close(self) -> None:
+        self._zip.close()
+
+
+class YamlBundleWriter(ArchiveBundleWriter):
+    """Write a multi-document YAML stream
+
+    Each document is preceded by a '--- # {path}' line. The index is the last document
+    and has the byte offset and size of each document, so entries can be read without
+    parsing the whole stream.
+    """
+    def __init__(self, path: pathlib.Path) -> None:
+        super().__init__(path)
+        self._offset = 0
+
+    def _write(self, entry: BundleEntry, content: bytes) -> None:
+        header = f'--- # {entry.path}\n'.encode('utf-8')
+        if not content.endswith(b'\n'):
+            content += b'\n'
+        entry.offset = self._offset + len(header)
+        self._file.write(header)
+        self._file.write(content)
+        self._offset += len(header) + len(content)
+
+    def _close(self) -> None:
+        pass
+
+
+def create_writer(path: pathlib.Path) -> ArchiveBundleWriter:
+    """Create a bundle writer for the format given by the file extension"""
+    name = path.name.lower()
+    for suffix, mode in _TAR_MODES.items():
+        if name.endswith(suffix):
+            return TarBundleWriter(path, mode=mode)
+    if name.endswith(_TAR_GZ_SUFFIXES):
+        return TarBundleWriter(path, mode='w|', open_compressor=_open_gzip)
+    if name.endswith(_TAR_ZST_SUFFIXES):
+        # Fail before creating the temporary file
+        return TarBundleWriter(path, mode='w|', open_compressor=_get_zstd_opener())
+    if name.endswith(_ZIP_SUFFIXES):
+        return ZipBundleWriter(path)
+    if name.endswith(_YAML_SUFFIXES):
+        return YamlBundleWriter(path)
+    suffixes = [*_TAR_MODES.keys(), *_TAR_GZ_SUFFIXES, *_TAR_ZST_SUFFIXES, *_ZIP_SUFFIXES, *_YAML_SUFFIXES]
+    raise ValueError(f"Unsupported bundle format: '{path.name}'. Use one of {', '.join(suffixes)}")
+
+
+def _open_gzip(fileobj: typing.BinaryIO) -> typing.BinaryIO:
+    """Open a gzip writer on a file without closing the file. The header has no file name and time."""
+    return typing.cast(typing.BinaryIO, gzip.GzipFile(filename='', fileobj=fileobj, mode='wb', mtime=0))
+
+
+def _get_zstd_opener() -> typing.Callable[[typing.BinaryIO], typing.BinaryIO]:
+    """Return a function which opens a Zstandard writer on a file without closing the file"""
+    try:
+        import zstandard
+    except ImportError:
+        pass
+    else:
+        return lambda fileobj: typing.cast(
+            typing.BinaryIO, zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False))
+
+    # Python 3.14 or later
+    try:
+        from compression import zstd
+    except ImportError:
+        raise ValueError("'zstandard' package is required for '.tar.zst' bundles: pip install zstandard")
+    return lambda fileobj: typing.cast(typing.BinaryIO, zstd.ZstdFile(fileobj, mode='w'))
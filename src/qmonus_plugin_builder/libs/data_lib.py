@@ -1,23 +1,131 @@
+import dataclasses
 import typing
 
+# Kinds of conversion, decided once per type
+_PRIMITIVE = 0
+_DICT = 1
+_SEQUENCE = 2
+_VARS = 3
+_ATTRIBUTES = 4
+_STR = 5
 
-def to_primitive(data: typing.Any) -> typing.Any:
-    if isinstance(data, (str, int, float, bool)) or data is None:
+_PRIMITIVE_TYPES = frozenset([str, int, float, bool, type(None)])
+
+_kinds: typing.Dict[type, int] = {}
+_attribute_names: typing.Dict[type, typing.Tuple[str, ...]] = {}
+
+
+def to_primitive(data: typing.Any, memo: bool = False) -> typing.Any:
+    """Convert data to dicts, lists and primitive values
+
+    Dicts are converted to dicts, lists and tuples to lists, and dataclasses, objects with
+    __slots__ and other objects to dicts of their attributes. Any other value is converted by str().
+
+    If 'memo' is True, an object reached more than once is converted once and the
+    converted value is shared in the result.
+    """
+    if type(data) in _PRIMITIVE_TYPES:
         return data
+
+    memo_: typing.Optional[typing.Dict[int, typing.Any]] = {} if memo else None
+    # ids of the containers being converted, to detect circular references
+    active: typing.Set[int] = set()
+    root = [data]
+    # (converted container, key or index, value to convert), or (None, id, None) when the container of id is done.
+    # Containers are copied first and their values which are not primitive are replaced afterwards.
+    stack: typing.List[typing.Tuple[typing.Any, typing.Any, typing.Any]] = [(root, 0, data)]
+    while len(stack) > 0:
+        parent, key, value = stack.pop()
+        if parent is None:
+            active.discard(key)
+            continue
+
+        type_ = type(value)
+        kind = _kinds.get(type_)
+        if kind is None:
+            kind = _get_kind(value)
+            _kinds[type_] = kind
+        if kind == _PRIMITIVE:
+            continue
+        elif kind == _STR:
+            parent[key] = str(value)
+            continue
+
+        value_id = id(value)
+        if value_id in active:
+            raise ValueError(f"Circular reference detected: {type_.__name__}")
+        if memo_ is not None and value_id in memo_:
+            parent[key] = memo_[value_id]
+            continue
+
+        converted: typing.Any
+        items: typing.Iterable[typing.Tuple[typing.Any, typing.Any]]
+        if kind == _SEQUENCE:
+            converted = list(value)
+            items = enumerate(converted)
+        else:
+            if kind == _DICT:
+                converted = dict(value)
+            elif kind == _VARS:
+                converted = dict(vars(value))
+            else:
+                converted = _get_attributes(value)
+            items = converted.items()
+        parent[key] = converted
+        if memo_ is not None:
+            memo_[value_id] = converted
+
+        active.add(value_id)
+        stack.append((None, value_id, None))
+        for k, v in items:
+            if type(v) not in _PRIMITIVE_TYPES:
+                stack.append((converted, k, v))
+    return root[0]
+
+
+def _get_kind(data: typing.Any) -> int:
+    if isinstance(data, (str, int, float, bool)) or data is None:
+        return _PRIMITIVE
     elif isinstance(data, dict):
-        _dict = {}
-        for k, v in data.items():
-            _dict[k] = to_primitive(v)
-        return _dict
+        return _DICT
     elif isinstance(data, (list, tuple)):
-        items = []
-        for item in data:
-            items.append(to_primitive(item))
-        return items
+        return _SEQUENCE
     elif hasattr(data, '__dict__'):
-        _dict = {}
-        for k, v in vars(data).items():
-            _dict[k] = to_primitive(v)
-        return _dict
+        # Including dataclasses, whose attributes may not be fields
+        return _VARS
+    elif dataclasses.is_dataclass(data) and not isinstance(data, type):
+        return _ATTRIBUTES
+    elif len(_get_slot_names(type(data))) > 0:
+        return _ATTRIBUTES
     else:
-        return str(data)
+        return _STR
+
+
+def _get_attributes(data: typing.Any) -> typing.Dict[str, typing.Any]:
+    """Return the fields of a dataclass without __dict__ or the slots of an object"""
+    type_ = type(data)
+    names = _attribute_names.get(type_)
+    if names is None:
+        if dataclasses.is_dataclass(data):
+            names = tuple(f.name for f in dataclasses.fields(data))
+        else:
+            names = _get_slot_names(type_)
+        _attribute_names[type_] = names
+    # Unset attributes are skipped like missing keys of vars()
+    return {name: getattr(data, name) for name in names if hasattr(data, name)}
+
+
+def _get_slot_names(type_: type) -> typing.Tuple[str, ...]:
+    names: typing.List[str] = []
+    for class_ in reversed(type_.__mro__):
+        slots = class_.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name.startswith('__') and not name.endswith('__'):
+                # Private names are mangled
+                name = f"_{class_.__name__.lstrip('_')}{name}"
+            if name in ('__dict__', '__weakref__') or name in names:
+                continue
+            names.append(name)
+    return tuple(names)
@@ -1,20 +1,52 @@
+import dataclasses
 import typing
 from copy import deepcopy
 from enum import Enum
 
 
+class Rule(object):
+    """Process keys of a dictionary for which 'comparison_expression' returns True
+
+    A rule does not descend into the values of the keys it processes.
+    """
+    def __init__(
+        self,
+        comparison_expression: typing.Callable[[dict, typing.Any], bool],
+        process: typing.Callable[[dict, typing.Any], None],
+    ) -> None:
+        self.comparison_expression = comparison_expression
+        self.process = process
+
+
+def empty_the_select_value_rule(select_value: typing.Any = None) -> Rule:
+    def process(dict_: dict, key: typing.Any) -> None:
+        del dict_[key]
+    return Rule(lambda dict_, key: dict_[key] == select_value, process)
+
+
+def rename_now_key_to_new_key_rule(now_key: typing.Any, new_key: typing.Any) -> Rule:
+    def process(dict_: dict, key: typing.Any) -> None:
+        dict_[new_key] = dict_.pop(key)
+    return Rule(lambda _, key: key == now_key, process)
+
+
+def enum_to_value_rule() -> Rule:
+    def process(dict_: dict, key: typing.Any) -> None:
+        dict_[key] = dict_[key].value
+    return Rule(lambda dict_, key: isinstance(dict_[key], Enum), process)
+
+
 def empty_the_select_value(
     dictionary: dict,
     select_value: typing.Any = None,
     non_destructive: bool = True,
     recursive: bool = True
 ) -> dict:
-    def process(dict_: dict, key: typing.Any) -> None:
-        del dict_[key]
+    rule = empty_the_select_value_rule(select_value)
     return _process_by_comparison_expression(
         dictionary,
-        lambda dict_, key: dict_[key] == select_value,
-        process,
+        rule.comparison_expression,
+        rule.process,
         non_destructive=non_destructive,
         recursive=recursive,
     )
@@ -27,12 +59,11 @@ def rename_now_key_to_new_key(
     non_destructive: bool = True,
     recursive: bool = True
 ) -> dict:
-    def process(dict_: dict, key: typing.Any) -> None:
-        dict_[new_key] = dict_.pop(key)
+    rule = rename_now_key_to_new_key_rule(now_key, new_key)
     return _process_by_comparison_expression(
         dictionary,
-        lambda _, key: key == now_key,
-        process,
+        rule.comparison_expression,
+        rule.process,
         non_destructive=non_destructive,
         recursive=recursive,
     )
@@ -43,17 +74,99 @@ def enum_to_value(
     non_destructive: bool = True,
     recursive: bool = True
 ) -> dict:
-    def process(dict_: dict, key: typing.Any) -> None:
-        dict_[key] = dict_[key].value
+    rule = enum_to_value_rule()
     return _process_by_comparison_expression(
         dictionary,
-        lambda dict_, key: isinstance(dict_[key], Enum),
-        process,
+        rule.comparison_expression,
+        rule.process,
         non_destructive=non_destructive,
         recursive=recursive,
     )
 
 
+def transform(dictionary: dict, rules: typing.List[Rule]) -> dict:
+    """Apply the rules in place like applying each rule recursively one after another
+
+    The tree is walked once. At each dictionary the rules are applied in order, and each
+    nested dictionary is then visited with the rules which did not process its key.
+    """
+    stack: typing.List[typing.Tuple[dict, typing.List[Rule]]] = [(dictionary, rules)]
+    while len(stack) > 0:
+        dict_, dict_rules = stack.pop()
+        # Rules to apply to each nested dictionary, by identity
+        children: typing.Dict[int, typing.Tuple[dict, typing.List[Rule]]] = {}
+        for rule in dict_rules:
+            process_keys = []
+            for key, value in dict_.items():
+                if rule.comparison_expression(dict_, key):
+                    process_keys.append(key)
+                elif isinstance(value, dict):
+                    children.setdefault(id(value), (value, []))[1].append(rule)
+                elif isinstance(value, list):
+                    for element in value:
+                        if isinstance(element, dict):
+                            children.setdefault(id(element), (element, []))[1].append(rule)
+            for process_key in process_keys:
+                rule.process(dict_, process_key)
+        stack.extend(children.values())
+    return dictionary
+
+
+def dataclass_to_dict(obj: typing.Any, rules: typing.Optional[typing.List[Rule]] = None) -> dict:
+    """Same as dataclasses.asdict() except that immutable values are not copied
+
+    If 'rules' are given, the result is the same as transform() of the result without them,
+    but each dictionary is built and processed in a single walk. The comparison expressions
+    see the values before they are converted.
+    """
+    if not dataclasses.is_dataclass(obj) or isinstance(obj, type):
+        raise TypeError("dataclass_to_dict() should be called on dataclass instances")
+    return typing.cast(dict, _to_dict_inner(obj, rules or []))
+
+
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None), bytes, Enum)
+
+
+def _to_dict_inner(obj: typing.Any, rules: typing.List[Rule]) -> typing.Any:
+    """Convert obj. 'rules' apply to obj if it becomes a dictionary, or to the dictionaries in it if it is a list."""
+    if isinstance(obj, _IMMUTABLE_TYPES):
+        return obj
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return _to_processed_dict({f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}, rules)
+    elif isinstance(obj, tuple) and hasattr(obj, '_fields'):
+        return type(obj)(*[_to_dict_inner(v, []) for v in obj])
+    elif isinstance(obj, list):
+        return type(obj)(_to_dict_inner(v, rules if _is_dict_like(v) else []) for v in obj)
+    elif isinstance(obj, tuple):
+        return type(obj)(_to_dict_inner(v, []) for v in obj)
+    elif isinstance(obj, dict):
+        return _to_processed_dict(type(obj)((_to_dict_inner(k, []), v) for k, v in obj.items()), rules)
+    else:
+        return deepcopy(obj)
+
+
+def _is_dict_like(obj: typing.Any) -> bool:
+    return isinstance(obj, dict) or (dataclasses.is_dataclass(obj) and not isinstance(obj, type))
+
+
+def _to_processed_dict(dict_: dict, rules: typing.List[Rule]) -> dict:
+    """Apply the rules to the new dictionary like transform(), then convert its values"""
+    # Rules to apply to each value, by identity
+    value_rules: typing.Dict[int, typing.List[Rule]] = {}
+    for rule in rules:
+        process_keys = []
+        for key, value in dict_.items():
+            if rule.comparison_expression(dict_, key):
+                process_keys.append(key)
+            elif not isinstance(value, _IMMUTABLE_TYPES):
+                value_rules.setdefault(id(value), []).append(rule)
+        for process_key in process_keys:
+            rule.process(dict_, process_key)
+    for key, value in dict_.items():
+        dict_[key] = _to_dict_inner(value, value_rules.get(id(value), []))
+    return dict_
+
+
 def _process_by_comparison_expression(
     dictionary: dict,
     comparison_expression: typing.Callable[[dict, str], bool],
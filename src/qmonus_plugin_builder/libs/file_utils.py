@@ -1,4 +1,28 @@
+from __future__ import annotations
+
+import os
 import pathlib
+import stat
+import typing
+import uuid
+
+from . import profile_utils
+
+
+class WriteStats(object):
+    """Number of files written, skipped as unchanged and deleted"""
+    def __init__(self, written: int = 0, skipped: int = 0, deleted: int = 0) -> None:
+        self.written = written
+        self.skipped = skipped
+        self.deleted = deleted
+
+    def add(self, other: WriteStats) -> None:
+        self.written += other.written
+        self.skipped += other.skipped
+        self.deleted += other.deleted
+
+    def __str__(self) -> str:
+        return f"{self.written} written, {self.skipped} skipped, {self.deleted} deleted"
 
 
 def open_file(file_path: pathlib.Path) -> str:
@@ -7,14 +31,56 @@ def open_file(file_path: pathlib.Path) -> str:
     return text
 
 
-def create_file(file_path: pathlib.Path, data: str) -> None:
+def create_file(file_path: pathlib.Path, data: str, stats: typing.Optional[WriteStats] = None) -> bool:
+    """Write data atomically unless the file already has the same content. Return True if written."""
+    with profile_utils.span('write'):
+        return _create_file(file_path=file_path, data=data, stats=stats)
+
+
+def _create_file(file_path: pathlib.Path, data: str, stats: typing.Optional[WriteStats]) -> bool:
     if file_path.is_dir():
         raise ValueError("Failed to create file: '{}' is directory".format(str(file_path)))
 
+    content = data.encode('utf-8')
+    if _has_content(file_path=file_path, content=content):
+        if stats is not None:
+            stats.skipped += 1
+        return False
+
     create_dir(dir_path=file_path.parent)
 
-    with open(str(file_path.resolve()), 'w', encoding='utf-8', newline='\n') as f:
-        f.write(data)
+    # Write a temporary file next to the target and replace the target with it
+    temp_path = file_path.with_name(f'.{file_path.name}.{uuid.uuid4().hex}.tmp')
+    try:
+        fd = os.open(str(temp_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        with open(fd, 'wb') as f:
+            f.write(content)
+        try:
+            os.chmod(str(temp_path), stat.S_IMODE(file_path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(str(temp_path), str(file_path))
+    except BaseException:
+        try:
+            temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+    if stats is not None:
+        stats.written += 1
+    return True
+
+
+def _has_content(file_path: pathlib.Path, content: bytes) -> bool:
+    # Compare sizes first to avoid reading files which have obviously changed
+    try:
+        if file_path.stat().st_size != len(content):
+            return False
+        with open(str(file_path), 'rb') as f:
+            return f.read() == content
+    except (FileNotFoundError, NotADirectoryError):
+        return False
 
 
 def create_dir(dir_path: pathlib.Path) -> None:
@@ -23,18 +89,27 @@ def create_dir(dir_path: pathlib.Path) -> None:
     dir_path.mkdir(parents=True, exist_ok=True)
 
 
-def delete(path: pathlib.Path) -> None:
+def delete(path: pathlib.Path, stats: typing.Optional[WriteStats] = None) -> None:
     if path.is_file():
         path.unlink()
+        if stats is not None:
+            stats.deleted += 1
     else:
         for child_path in path.glob('*'):
-            delete(child_path)
+            delete(child_path, stats=stats)
         path.rmdir()
 
 
-def delete_files_in_directory(dir_path: pathlib.Path) -> None:
+def delete_files_in_directory(
+    dir_path: pathlib.Path,
+    excludes: typing.Optional[typing.Collection[str]] = None,
+    stats: typing.Optional[WriteStats] = None,
+) -> None:
+    """Delete everything in the directory except the entries whose name is in 'excludes'"""
     if dir_path.is_file():
         raise ValueError("Failed to delete files: '{}' is file".format(str(dir_path)))
 
     for child_path in dir_path.glob('*'):
-        delete(child_path)
+        if excludes is not None and child_path.name in excludes:
+            continue
+        delete(child_path, stats=stats)
@@ -1,8 +1,68 @@
+import ast
 import typing
 import tokenize
 import inspect
 import io
 
+from . import profile_utils
+
+
+# Fields of statements which contain statements (and except handlers or match cases)
+_STATEMENT_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+
+class _SourceIndex(object):
+    """Line spans of the functions in a source file
+
+    The file is parsed once and the lines of each function are sliced like
+    inspect.getsource() returns them, instead of tokenizing the rest of the file
+    from the function for each function.
+    """
+    def __init__(self, lines: typing.List[str]) -> None:
+        self.lines = lines
+        # End line (exclusive, 0-based) of the function starting at each line (0-based)
+        self.block_ends: typing.Dict[int, int] = {}
+        # Function body per start line
+        self.codes: typing.Dict[int, str] = {}
+        try:
+            tree = ast.parse(''.join(lines))
+        except (SyntaxError, ValueError):
+            return
+        # Functions are statements, so expressions are not visited
+        stack: typing.List[typing.Any] = list(tree.body)
+        while len(stack) > 0:
+            node = stack.pop()
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list]) - 1
+                end = self._get_block_end(node)
+                if end is not None:
+                    self.block_ends[start] = end
+            for field in _STATEMENT_FIELDS:
+                stack.extend(getattr(node, field, ()))
+
+    def _get_block_end(self, node: typing.Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> typing.Optional[int]:
+        # inspect.getblock() ends the block at the last line of the last statement,
+        # or at comments after it indented at least as much as the body.
+        # Which comments are included depends on the tokenizer, so such blocks are not indexed.
+        end = typing.cast(int, node.end_lineno)
+        for line in self.lines[end:]:
+            stripped = line.lstrip(' \t\f')
+            if stripped.startswith('#'):
+                return None
+            if stripped not in ('\n', '\r\n'):
+                break
+        return end
+
+    def get_source(self, lnum: int) -> typing.Optional[str]:
+        """Return the source code of the function at 'lnum' (as returned by inspect.findsource) if indexed"""
+        end = self.block_ends.get(lnum)
+        if end is None:
+            return None
+        return ''.join(self.lines[lnum:end])
+
+
+_source_indexes: typing.Dict[str, _SourceIndex] = {}
+
 
 def outdent(
     code: str,
@@ -26,7 +86,68 @@ def outdent(
 
 
 def get_function_code(func: typing.Callable[..., typing.Any]) -> str:
-    code = inspect.getsource(func)
+    with profile_utils.span('get_function_code'):
+        # Same lines and line number as inspect.getsource() uses
+        unwrapped = inspect.unwrap(func)
+        lines, lnum = inspect.findsource(unwrapped)
+        filename = inspect.getsourcefile(unwrapped)
+        if filename is None:
+            return get_function_body(inspect.getsource(func))
+
+        index = _source_indexes.get(filename)
+        # linecache returns other lines once the file is changed
+        if index is None or index.lines is not lines:
+            index = _SourceIndex(lines)
+            _source_indexes[filename] = index
+        code = index.codes.get(lnum)
+        if code is None:
+            source = index.get_source(lnum)
+            code = get_function_body(source if source is not None else inspect.getsource(func))
+            index.codes[lnum] = code
+        return code
+
+
+class _LineReader(object):
+    """readline() for tokenize which splits lines only as far as they are read"""
+    def __init__(self, text: str) -> None:
+        self.text = text
+        # Offset of each line read so far
+        self.offsets: typing.List[int] = []
+        self._position = 0
+
+    def readline(self) -> str:
+        start = self._position
+        end = self.text.find('\n', start)
+        self._position = len(self.text) if end == -1 else end + 1
+        self.offsets.append(start)
+        return self.text[start:self._position]
+
+
+def remove_decorators(code: str) -> str:
+    """Return the function source code from the 'def' or 'async def' line
+
+    Lines are read and tokenized only up to that line, so this takes time linear in the
+    length of the decorators regardless of the length of the function.
+    """
+    reader = _LineReader(code)
+    logical_line_start = True
+    try:
+        for token in tokenize.generate_tokens(reader.readline):
+            if token.type in (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT):
+                continue
+            if token.type == tokenize.NEWLINE:
+                logical_line_start = True
+                continue
+            if logical_line_start and token.type == tokenize.NAME and token.string in ('def', 'async'):
+                return code[reader.offsets[token.start[0] - 1]:]
+            logical_line_start = False
+    except tokenize.TokenError:
+        pass
+    return code
+
+
+def get_function_body(code: str) -> str:
+    """Return the outdented body of the function source code (as returned by inspect.getsource)"""
     lines = code.split('\n')
     tokens = tokenize.generate_tokens(io.StringIO(code).readline)
     last_func_def_token = None
@@ -73,3 +194,18 @@ def get_function_code(func: typing.Callable[..., typing.Any]) -> str:
         func_code = outdent(code='\n'.join(func_lines))
 
     return func_code
+
+
+def is_subclass(cls: type, base: type) -> bool:
+    """issubclass() by the MRO only
+
+    On a miss, ABCMeta.__subclasscheck__ checks every subclass of the ABC and caches the
+    miss in each of them, which takes quadratic time and memory with thousands of plugin classes.
+    Virtual subclasses registered to ABCs are not supported.
+    """
+    return base in cls.__mro__
+
+
+def is_instance(obj: typing.Any, base: type) -> bool:
+    """isinstance() by the MRO only. See is_subclass()."""
+    return base in type(obj).__mro__
@@ -0,0 +1,131 @@
+import ast
+import collections
+import hashlib
+import json
+import logging
+import pathlib
+import typing
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = '.qmonus_build/manifest'
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_names(text: str) -> typing.Optional[typing.Set[str]]:
+    """Return the identifiers referenced in the source text, or None if it cannot be parsed"""
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return None
+
+    names: typing.Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        elif isinstance(node, ast.alias):
+            names.update(node.name.split('.'))
+    return names
+
+
+class ManifestEntry(object):
+    def __init__(
+        self,
+        kind: str,
+        hash: str,
+        dependencies: typing.Optional[typing.List[str]] = None,
+        output: typing.Optional[str] = None,
+    ) -> None:
+        if dependencies is None:
+            dependencies = []
+
+        self.kind = kind
+        self.hash = hash
+        self.dependencies = dependencies
+        self.output = output
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "kind": self.kind,
+            "hash": self.hash,
+            "dependencies": self.dependencies,
+            "output": self.output,
+        }
+
+
+class Manifest(object):
+    """Build manifest
+
+    Records the hash, the dependencies and the output of each source file
+    (relative to 'qmonus_sdk_plugins') so that unchanged sources can be skipped.
+    """
+    def __init__(
+        self,
+        version: str,
+        entries: typing.Optional[typing.Dict[str, ManifestEntry]] = None,
+    ) -> None:
+        if entries is None:
+            entries = {}
+
+        self.version = version
+        self.entries = entries
+
+    @classmethod
+    def load(cls, path: pathlib.Path, version: str) -> 'Manifest':
+        """Load the manifest. An empty manifest is returned if it is missing, broken or built by another version"""
+        if not path.is_file():
+            return cls(version=version)
+
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if data['version'] != version:
+                logger.info(f"Builder version changed from '{data['version']}' to '{version}'")
+                return cls(version=version)
+            entries = {key: ManifestEntry(**value) for key, value in data['entries'].items()}
+        except (ValueError, KeyError, TypeError):
+            logger.info(f"Ignoring broken manifest '{str(path)}'")
+            return cls(version=version)
+
+        return cls(version=version, entries=entries)
+
+    def save(self, path: pathlib.Path) -> None:
+        data = {
+            "version": self.version,
+            "entries": {key: entry.to_dict() for key, entry in sorted(self.entries.items())},
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2) + '\n', encoding='utf-8')
+
+    def get_changed_keys(self, previous: 'Manifest') -> typing.Set[str]:
+        """Return the keys which were added, modified or removed since the previous manifest"""
+        changed_keys = set(previous.entries.keys()) - set(self.entries.keys())
+        for key, entry in self.entries.items():
+            previous_entry = previous.entries.get(key)
+            if previous_entry is None or previous_entry.hash != entry.hash or previous_entry.output is None:
+                changed_keys.add(key)
+        return changed_keys
+
+    def get_dirty_keys(self, previous: 'Manifest') -> typing.Set[str]:
+        """Return the keys which must be rebuilt: changed keys and their (transitive) dependents"""
+        dependents: typing.DefaultDict[str, typing.Set[str]] = collections.defaultdict(set)
+        for manifest in (previous, self):
+            for key, entry in manifest.entries.items():
+                for dependency in entry.dependencies:
+                    dependents[dependency].add(key)
+
+        changed_keys = self.get_changed_keys(previous)
+        dirty_keys = set(changed_keys)
+        stack = list(changed_keys)
+        while len(stack) > 0:
+            key = stack.pop()
+            for dependent in dependents[key]:
+                if dependent not in dirty_keys:
+                    dirty_keys.add(dependent)
+                    stack.append(dependent)
+
+        return dirty_keys & set(self.entries.keys())
@@ -0,0 +1,47 @@
+import concurrent.futures
+import importlib
+import multiprocessing
+import multiprocessing.context
+import sys
+import typing
+
+
+def create_executor(
+    max_workers: int,
+    preload: typing.Optional[typing.List[str]] = None,
+    imports: typing.Optional[typing.List[str]] = None,
+) -> concurrent.futures.ProcessPoolExecutor:
+    """Create a process pool
+
+    'forkserver' is used where available so that workers are forked from a process
+    which has already imported the modules in 'preload'. Otherwise 'spawn' is used.
+    Each worker inherits the current 'sys.path' and imports the modules in 'imports'.
+    """
+    context: multiprocessing.context.BaseContext
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        if preload is not None:
+            context.set_forkserver_preload(preload)
+    else:
+        context = multiprocessing.get_context('spawn')
+
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_initialize_worker,
+        initargs=(list(sys.path), imports if imports is not None else []),
+    )
+
+
+def _initialize_worker(sys_path: typing.List[str], imports: typing.List[str]) -> None:
+    for path in sys_path:
+        if path not in sys.path:
+            sys.path.append(path)
+    for name in imports:
+        importlib.import_module(name)
+
+
+def split(items: typing.List[typing.Any], count: int) -> typing.List[typing.List[typing.Any]]:
+    """Split items into at most 'count' non-empty shards in a round-robin manner"""
+    shards = [items[index::count] for index in range(count)]
+    return [shard for shard in shards if len(shard) > 0]
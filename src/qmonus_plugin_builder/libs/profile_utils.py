@@ -0,0 +1,134 @@
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+import tracemalloc
+import typing
+
+
+class Span(object):
+    def __init__(self, name: str, args: typing.Dict[str, typing.Any], started_at: float) -> None:
+        self.name = name
+        self.args = args
+        self.started_at = started_at
+        self.duration = 0.0
+        self.child_duration = 0.0
+        self.memory_peak = 0
+
+
+class Profiler(object):
+    """Record nested spans of the build phases
+
+    Spans are written as Chrome trace events ('chrome://tracing', Perfetto) and
+    summarized per name. If 'trace_memory' is True, the tracemalloc peak during
+    each span is recorded too.
+    """
+    def __init__(self, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.spans: typing.List[Span] = []
+        self._stack: typing.List[Span] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: typing.Any) -> typing.Iterator[Span]:
+        parent = self._stack[-1] if len(self._stack) > 0 else None
+        if self.trace_memory:
+            # The tracemalloc peak is reset for each span, so keep the peak observed so far in the parent
+            if parent is not None:
+                parent.memory_peak = max(parent.memory_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        span = Span(name=name, args=args, started_at=time.perf_counter())
+        self._stack.append(span)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.started_at
+            self._stack.pop()
+            if self.trace_memory:
+                span.memory_peak = max(span.memory_peak, tracemalloc.get_traced_memory()[1])
+                if parent is not None:
+                    parent.memory_peak = max(parent.memory_peak, span.memory_peak)
+            if parent is not None:
+                parent.child_duration += span.duration
+            self.spans.append(span)
+
+    def to_trace_events(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        events: typing.List[typing.Dict[str, typing.Any]] = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': self._tid,
+            'args': {'name': 'qmonus_plugin_builder'},
+        }]
+        for span in sorted(self.spans, key=lambda x: x.started_at):
+            args = dict(span.args)
+            if self.trace_memory:
+                args['tracemalloc_peak_kib'] = span.memory_peak // 1024
+            events.append({
+                'name': span.name,
+                'cat': span.name.split(':')[0],
+                'ph': 'X',
+                'ts': (span.started_at - self._origin) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': self._pid,
+                'tid': self._tid,
+                'args': args,
+            })
+        return events
+
+    def write_trace(self, path: pathlib.Path) -> None:
+        with open(str(path), 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.to_trace_events(), 'displayTimeUnit': 'ms'}, f)
+
+    def format_summary(self) -> str:
+        """Return a table of count, total, self and max time and memory peak per span name"""
+        rows: typing.Dict[str, typing.List[float]] = {}
+        for span in self.spans:
+            row = rows.setdefault(span.name, [0, 0.0, 0.0, 0.0, 0])
+            row[0] += 1
+            row[1] += span.duration
+            row[2] += span.duration - span.child_duration
+            row[3] = max(row[3], span.duration)
+            row[4] = max(row[4], span.memory_peak)
+
+        lines = [f"{'phase':<24}{'count':>8}{'total [ms]':>12}{'self [ms]':>12}{'max [ms]':>12}{'peak [KiB]':>12}"]
+        for name, (count, total, self_total, max_, peak) in sorted(rows.items(), key=lambda x: -x[1][2]):
+            peak_text = f"{int(peak) // 1024}" if self.trace_memory else '-'
+            lines.append(
+                f"{name:<24}{int(count):>8}{total * 1e3:>12.1f}{self_total * 1e3:>12.1f}"
+                f"{max_ * 1e3:>12.1f}{peak_text:>12}")
+        return '\n'.join(lines)
+
+
+_profiler: typing.Optional[Profiler] = None
+_null_span = contextlib.nullcontext()
+# Whether start() started tracemalloc, so that stop() leaves the tracing of the caller running
+_started_tracemalloc = False
+
+
+def start(trace_memory: bool = True) -> Profiler:
+    global _profiler, _started_tracemalloc
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _profiler = Profiler(trace_memory=trace_memory)
+    return _profiler
+
+
+def stop() -> typing.Optional[Profiler]:
+    global _profiler, _started_tracemalloc
+    profiler = _profiler
+    _profiler = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    return profiler
+
+
+def span(name: str, **args: typing.Any) -> typing.ContextManager[typing.Any]:
+    """Record a span if profiling is started. Otherwise do nothing."""
+    if _profiler is None:
+        return _null_span
+    return _profiler.span(name, **args)
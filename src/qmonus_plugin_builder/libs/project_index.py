@@ -0,0 +1,99 @@
+import importlib
+import logging
+import os
+import pathlib
+import types
+import typing
+
+from . import profile_utils
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('classes', 'scenarios', 'daemons', 'modules')
+
+
+class ProjectIndex(object):
+    """Index of the plugin files in 'qmonus_sdk_plugins'
+
+    The tree is scanned once, on first use. Imported modules and parsed definitions
+    are cached per file so that update() and dump() can share them.
+    If 'static' is True, the parsers read definitions from the source code without
+    importing the plugin modules where possible.
+    """
+    def __init__(self, module_path: pathlib.Path, static: bool = False) -> None:
+        self.module_path = module_path
+        self.static = static
+        self._files: typing.Optional[typing.Dict[str, typing.Dict[str, typing.List[pathlib.Path]]]] = None
+        self._modules: typing.Dict[pathlib.Path, types.ModuleType] = {}
+        self.definitions: typing.Dict[pathlib.Path, typing.Any] = {}
+        self._class_names: typing.Optional[typing.FrozenSet[str]] = None
+
+    def scan(self) -> None:
+        if not self.module_path.is_dir():
+            raise ValueError(f"Invalid module_path specified: '{str(self.module_path)}' does not exist.")
+
+        files: typing.Dict[str, typing.Dict[str, typing.List[pathlib.Path]]] = {kind: {} for kind in KINDS}
+        plugins_path = self.module_path.joinpath('plugins')
+        for workspace_entry in _scandir(str(plugins_path)):
+            if not workspace_entry.is_dir():
+                continue
+            for kind_entry in _scandir(workspace_entry.path):
+                if kind_entry.name not in files or not kind_entry.is_dir():
+                    continue
+                paths = files[kind_entry.name].setdefault(workspace_entry.name, [])
+                stack = [kind_entry.path]
+                while len(stack) > 0:
+                    for entry in _scandir(stack.pop()):
+                        if entry.is_dir():
+                            if entry.name != '__pycache__':
+                                stack.append(entry.path)
+                        elif entry.name.endswith('.py') and entry.name != '__init__.py':
+                            paths.append(pathlib.Path(entry.path))
+
+        for files_per_workspace in files.values():
+            for paths in files_per_workspace.values():
+                paths.sort(key=lambda x: str(x))
+        self._files = files
+        self._class_names = None
+
+    def get_files(self, kind: str, workspace: typing.Optional[str] = None) -> typing.List[pathlib.Path]:
+        files_per_workspace = self.get_files_per_workspace(kind)
+        if workspace is not None:
+            return list(files_per_workspace.get(workspace, []))
+        files = [path for paths in files_per_workspace.values() for path in paths]
+        return sorted(files, key=lambda x: str(x))
+
+    def get_files_per_workspace(self, kind: str) -> typing.Dict[str, typing.List[pathlib.Path]]:
+        if kind not in KINDS:
+            raise ValueError(f"Invalid kind: '{kind}'")
+        if self._files is None:
+            with profile_utils.span('discovery'):
+                self.scan()
+        assert self._files is not None
+        return self._files[kind]
+
+    def get_class_names(self) -> typing.FrozenSet[str]:
+        """Return the names of the classes, which plugins refer to as 'atom.{name}' or 'classes.{name}'"""
+        if self._class_names is None:
+            self._class_names = frozenset(path.stem for path in self.get_files('classes'))
+        return self._class_names
+
+    def get_module_name(self, path: pathlib.Path) -> str:
+        return str(path.relative_to(self.module_path.parent).with_suffix('').as_posix()).replace('/', '.')
+
+    def import_module(self, path: pathlib.Path) -> types.ModuleType:
+        module = self._modules.get(path)
+        if module is None:
+            module_name = self.get_module_name(path)
+            with profile_utils.span('import', module=module_name):
+                module = importlib.import_module(module_name)
+            self._modules[path] = module
+        return module
+
+
+def _scandir(path: str) -> typing.List[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except FileNotFoundError:
+        return []
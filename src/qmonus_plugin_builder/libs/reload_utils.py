@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import builtins
+import collections
+import importlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import logging
+import pathlib
+import sys
+import types
+import typing
+
+from ..class_libs import component as class_component
+from . import sort_lib
+
+logger = logging.getLogger(__name__)
+
+
+class ImportGraph(object):
+    """Dependencies between the modules of a package, recorded by import hooks
+
+    While installed, every import statement executed by a module of the package is recorded
+    as a dependency, even if the imported module has already been imported, and the order in
+    which the modules of the package start loading is recorded.
+    """
+    def __init__(self, package_name: str) -> None:
+        self.package_name = package_name
+        # Modules imported by each module
+        self.dependencies: typing.Dict[str, typing.Set[str]] = collections.defaultdict(set)
+        # Order in which each module started loading
+        self._load_order: typing.Dict[str, int] = {}
+        self._load_count = 0
+        self._original_import: typing.Optional[typing.Callable[..., types.ModuleType]] = None
+        self._finder = _LoadOrderFinder(self)
+
+    def install(self) -> None:
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        if self._original_import is None:
+            return
+        if builtins.__import__ == self._import:
+            builtins.__import__ = self._original_import
+        self._original_import = None
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def __enter__(self) -> ImportGraph:
+        self.install()
+        return self
+
+    def __exit__(self, exc_type: typing.Any, exc_value: typing.Any, traceback: typing.Any) -> None:
+        self.uninstall()
+
+    def _import(
+        self,
+        name: str,
+        globals: typing.Optional[typing.Mapping[str, object]] = None,
+        locals: typing.Optional[typing.Mapping[str, object]] = None,
+        fromlist: typing.Optional[typing.Sequence[str]] = (),
+        level: int = 0,
+    ) -> types.ModuleType:
+        assert self._original_import is not None
+        module = self._original_import(name, globals, locals, fromlist, level)
+        importer = globals.get('__name__') if globals is not None else None
+        if not isinstance(importer, str) or not self._contains(importer):
+            return module
+
+        if level > 0:
+            package = globals.get('__package__') if globals is not None else None
+            if not isinstance(package, str):
+                return module
+            imported = importlib.util.resolve_name('.' * level + name, package)
+        else:
+            imported = name
+        if self._contains(imported):
+            self._add(importer, imported)
+            # 'from package import submodule'
+            for attribute in fromlist or ():
+                submodule = f'{imported}.{attribute}'
+                if submodule in sys.modules:
+                    self._add(importer, submodule)
+        return module
+
+    def _contains(self, name: str) -> bool:
+        return name == self.package_name or name.startswith(f'{self.package_name}.')
+
+    def _add(self, importer: str, imported: str) -> None:
+        if importer != imported:
+            self.dependencies[importer].add(imported)
+
+    def _record_load(self, name: str) -> None:
+        if self._contains(name):
+            self._load_order[name] = self._load_count
+            self._load_count += 1
+
+    def get_dependents(self, names: typing.Iterable[str]) -> typing.Set[str]:
+        """Return the modules which import any of the modules directly or indirectly, including themselves"""
+        dependents_per_name: typing.Dict[str, typing.Set[str]] = collections.defaultdict(set)
+        for importer, imported_names in self.dependencies.items():
+            for imported in imported_names:
+                dependents_per_name[imported].add(importer)
+
+        result = set(names)
+        stack = list(result)
+        while len(stack) > 0:
+            for dependent in dependents_per_name.get(stack.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    stack.append(dependent)
+        return result
+
+    def sort(self, names: typing.Iterable[str]) -> typing.List[typing.List[str]]:
+        """Sort modules so that each module comes after the modules it imports
+
+        Modules which import each other are grouped together, in the order in which they
+        started loading, so that importing the first module of a group imports it like before.
+        """
+        sorted_names = sorted(set(names), key=lambda x: (self._load_order.get(x, self._load_count), x))
+        graph = {name: sorted(self.dependencies.get(name, ())) for name in sorted_names}
+        return sort_lib.strongly_connected_components(graph)
+
+    def reload_changed(self, paths: typing.Iterable[pathlib.Path]) -> typing.List[str]:
+        """Import the modules of the changed files and all modules which depend on them again
+
+        Modules are imported again in the order of sort(). Modules of deleted files are only
+        removed. Instance methods registered by the classes of the removed modules and the
+        field layouts cached on classes are cleared.
+        Return the names of the modules imported again.
+        """
+        changed_paths = {path.resolve() for path in paths}
+        for path in changed_paths:
+            # mtime based pyc validation may miss quick successive saves
+            try:
+                pathlib.Path(importlib.util.cache_from_source(str(path))).unlink()
+            except OSError:
+                pass
+
+        changed_names = set()
+        for name, module in list(sys.modules.items()):
+            if not self._contains(name):
+                continue
+            module_file = getattr(module, '__file__', None)
+            if module_file is not None and pathlib.Path(module_file).resolve() in changed_paths:
+                changed_names.add(name)
+        names = {name for name in self.get_dependents(changed_names) if name in sys.modules}
+        if len(names) == 0:
+            return []
+
+        components = self.sort(names)
+        files_per_name = {name: getattr(sys.modules[name], '__file__', None) for name in names}
+        for name in names:
+            _remove_module(name)
+            # Recorded again on import
+            self.dependencies.pop(name, None)
+        # Layouts of the remaining classes may refer to the removed classes
+        class_component.invalidate_field_layouts()
+        importlib.invalidate_caches()
+
+        reloaded_names = []
+        for component in components:
+            for name in component:
+                module_file = files_per_name[name]
+                if module_file is not None and not pathlib.Path(module_file).exists():
+                    logger.info(f"Removed module '{name}'")
+                    continue
+                if name not in sys.modules:
+                    logger.info(f"Reloading module '{name}'")
+                    importlib.import_module(name)
+                reloaded_names.append(name)
+        return reloaded_names
+
+
+class _LoadOrderFinder(importlib.abc.MetaPathFinder):
+    """Record the order in which modules start loading without finding them"""
+    def __init__(self, graph: ImportGraph) -> None:
+        self._graph = graph
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: typing.Optional[typing.Sequence[str]],
+        target: typing.Optional[types.ModuleType] = None,
+    ) -> typing.Optional[importlib.machinery.ModuleSpec]:
+        self._graph._record_load(fullname)
+        return None
+
+
+def _remove_module(name: str) -> None:
+    module = sys.modules.pop(name)
+    _clear_instance_methods(module)
+    # Otherwise 'from package import module' returns the removed module
+    parent_name, _, child_name = name.rpartition('.')
+    parent = sys.modules.get(parent_name)
+    if parent is not None and getattr(parent, child_name, None) is module:
+        delattr(parent, child_name)
+
+
+def _clear_instance_methods(module: types.ModuleType) -> None:
+    """Remove the instance methods of the classes defined in the module from the registry"""
+    prefixes = tuple(
+        f'{value.__qualname__}.' for value in vars(module).values()
+        if isinstance(value, type) and value.__module__ == module.__name__
+    )
+    if len(prefixes) == 0:
+        return
+    for qualname in list(class_component.instance_method_per_qualname):
+        if qualname.startswith(prefixes):
+            del class_component.instance_method_per_qualname[qualname]
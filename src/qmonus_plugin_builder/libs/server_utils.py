@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import http.client
+import http.server
+import json
+import logging
+import os
+import pathlib
+import secrets
+import socket
+import socketserver
+import typing
+
+logger = logging.getLogger(__name__)
+
+# Path of the server information in the project directory
+SERVER_INFO_PATH = '.qmonus_build/server.json'
+
+# Longest path of a Unix socket on Linux (sizeof(sockaddr_un.sun_path) - 1)
+_MAX_SOCKET_PATH_LENGTH = 107
+
+Handler = typing.Callable[[str, typing.Dict[str, typing.Any]], typing.Dict[str, typing.Any]]
+
+
+class ServerError(ValueError):
+    """The server was reached but did not handle the request"""
+
+
+class ServerInfo(object):
+    """How to connect to a running server. Exactly one of 'socket_path' and 'port' is set."""
+    def __init__(
+        self,
+        version: str,
+        pid: int,
+        token: str,
+        socket_path: typing.Optional[str] = None,
+        port: typing.Optional[int] = None,
+    ) -> None:
+        self.version = version
+        self.pid = pid
+        self.token = token
+        self.socket_path = socket_path
+        self.port = port
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> typing.Optional[ServerInfo]:
+        """Return None if there is no valid server information"""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            return cls(
+                version=data['version'],
+                pid=data['pid'],
+                token=data['token'],
+                socket_path=data.get('socket_path'),
+                port=data.get('port'),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: pathlib.Path) -> None:
+        data = {'version': self.version, 'pid': self.pid, 'token': self.token}
+        if self.socket_path is not None:
+            data['socket_path'] = self.socket_path
+        if self.port is not None:
+            data['port'] = self.port
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Only the owner can read the token
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server: typing.Any
+
+    def do_POST(self) -> None:
+        # The body is read first, otherwise the client fails to send it and misses the response
+        try:
+            length = int(self.headers.get('Content-Length', '0'))
+            content = self.rfile.read(length) if length > 0 else b''
+        except ValueError as e:
+            self._send(400, {'error': f'Invalid request: {e}'})
+            return
+        # Compared in constant time. Non-ASCII headers cannot be compared as str.
+        authorization = self.headers.get('Authorization', '').encode('utf-8')
+        if not secrets.compare_digest(authorization, f'Bearer {self.server.token}'.encode('utf-8')):
+            self._send(401, {'error': 'Invalid token'})
+            return
+        command = self.path.strip('/')
+        try:
+            args = json.loads(content.decode('utf-8')) if len(content) > 0 else {}
+        except ValueError as e:
+            self._send(400, {'error': f'Invalid request: {e}'})
+            return
+        if not isinstance(args, dict):
+            self._send(400, {'error': 'Arguments must be an object'})
+            return
+        self._send(200, self.server.handler(command, args))
+
+    def _send(self, status: int, body: typing.Dict[str, typing.Any]) -> None:
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def address_string(self) -> str:
+        # client_address is empty for Unix sockets
+        return 'local' if isinstance(self.client_address, str) else str(self.client_address[0])
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class _UnixHTTPServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, handler: Handler, token: str) -> None:
+        self.handler = handler
+        self.token = token
+        super().__init__(socket_path, _RequestHandler)
+
+
+class _TCPHTTPServer(http.server.HTTPServer):
+    def __init__(self, port: int, handler: Handler, token: str) -> None:
+        self.handler = handler
+        self.token = token
+        super().__init__(('127.0.0.1', port), _RequestHandler)
+
+
+class Server(object):
+    """HTTP server on a Unix socket or on the loopback interface
+
+    Requests are handled one by one in the calling thread by 'handler', which takes
+    the command and its arguments and returns the response body.
+    """
+    def __init__(
+        self,
+        handler: Handler,
+        version: str,
+        socket_path: typing.Optional[pathlib.Path] = None,
+        port: typing.Optional[int] = None,
+    ) -> None:
+        token = secrets.token_hex(16)
+        self._socket_path = socket_path
+        self._server: socketserver.BaseServer
+        if socket_path is not None:
+            if len(str(socket_path)) > _MAX_SOCKET_PATH_LENGTH:
+                raise ValueError(f"Socket path is too long, use a port instead: '{str(socket_path)}'")
+            socket_path.parent.mkdir(parents=True, exist_ok=True)
+            _remove_stale_socket(socket_path)
+            old_umask = os.umask(0o177)
+            try:
+                self._server = _UnixHTTPServer(str(socket_path), handler=handler, token=token)
+            finally:
+                os.umask(old_umask)
+            self.info = ServerInfo(version=version, pid=os.getpid(), token=token, socket_path=str(socket_path))
+        elif port is not None:
+            tcp_server = _TCPHTTPServer(port, handler=handler, token=token)
+            self._server = tcp_server
+            self.info = ServerInfo(version=version, pid=os.getpid(), token=token, port=tcp_server.server_address[1])
+        else:
+            raise ValueError("Either socket_path or port must be specified")
+
+    @property
+    def address(self) -> str:
+        if self.info.socket_path is not None:
+            return f'unix:{self.info.socket_path}'
+        return f'http://127.0.0.1:{self.info.port}'
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever(poll_interval=0.5)
+
+    def close(self) -> None:
+        self._server.server_close()
+        if self._socket_path is not None:
+            try:
+                self._socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _remove_stale_socket(socket_path: pathlib.Path) -> None:
+    if not socket_path.exists():
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        socket_path.unlink()
+    else:
+        raise ValueError(f"Another server is listening on '{str(socket_path)}'")
+    finally:
+        sock.close()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: typing.Optional[float] = None) -> None:
+        super().__init__('localhost', timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self._socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def request(
+    info: ServerInfo,
+    command: str,
+    args: typing.Dict[str, typing.Any],
+    timeout: typing.Optional[float] = None,
+) -> typing.Dict[str, typing.Any]:
+    """Send a command to the server and return the response body
+
+    OSError is raised if the server cannot be reached, and ServerError if it was reached
+    but did not handle the command. The command may have run in the latter case.
+    """
+    connection: http.client.HTTPConnection
+    if info.socket_path is not None:
+        connection = _UnixHTTPConnection(info.socket_path, timeout=timeout)
+    else:
+        connection = http.client.HTTPConnection('127.0.0.1', info.port, timeout=timeout)
+    try:
+        connection.connect()
+        try:
+            connection.request(
+                'POST',
+                f'/{command}',
+                body=json.dumps(args).encode('utf-8'),
+                headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {info.token}'},
+            )
+            response = connection.getresponse()
+            body = json.loads(response.read().decode('utf-8'))
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise ServerError(f"No valid response: {e}") from e
+    finally:
+        connection.close()
+    if not isinstance(body, dict):
+        raise ServerError(f"Invalid response: {body}")
+    if response.status != 200:
+        raise ServerError(f"Server error {response.status}: {body.get('error')}")
+    return body
+
+
+class LogCapture(logging.Handler):
+    """Collect the log records of the root logger while it is used as a context manager
+
+    If 'level' is below the level of the root logger, the root logger is lowered to it meanwhile.
+    """
+    def __init__(self, formatter: typing.Optional[logging.Formatter] = None, level: int = logging.NOTSET) -> None:
+        super().__init__(level=level)
+        self.lines: typing.List[str] = []
+        if formatter is not None:
+            self.setFormatter(formatter)
+        self._root_level = logging.NOTSET
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def __enter__(self) -> LogCapture:
+        root_logger = logging.getLogger()
+        self._root_level = root_logger.level
+        if self.level != logging.NOTSET and self.level < root_logger.getEffectiveLevel():
+            root_logger.setLevel(self.level)
+        root_logger.addHandler(self)
+        return self
+
+    def __exit__(self, exc_type: typing.Any, exc_value: typing.Any, traceback: typing.Any) -> None:
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(self)
+        root_logger.setLevel(self._root_level)
+
+    def getvalue(self) -> str:
+        return ''.join(f'{line}\n' for line in self.lines)
@@ -1,10 +1,20 @@
 import typing
-import collections
+
+
+class CycleError(ValueError):
+    """The graph given to topological_sort() or topological_levels() has cycles
+
+    'cycles' has the strongly connected components which make the cycles. Nodes which
+    only depend on a cycle are not included.
+    """
+    def __init__(self, cycles: typing.List[typing.List[str]]) -> None:
+        self.cycles = cycles
+        super().__init__(f"Cycles detected: {'; '.join(' <-> '.join(cycle) for cycle in cycles)}")
 
 
 def topological_sort(graph: typing.Dict[str, typing.List[str]]) -> typing.List[str]:
     """toplogical sort
-    
+
     Args:
         graph: DAG
             {
@@ -12,7 +22,7 @@ def topological_sort(graph: typing.Dict[str, typing.List[str]]) -> typing.List[s
                 "node_name_2": [predecessor_0, predecessor_1, ...],
                 ...
             }
-    
+
     Examples:
         graph = {
             "ClassA": ["ClassD"],
@@ -23,35 +33,119 @@ def topological_sort(graph: typing.Dict[str, typing.List[str]]) -> typing.List[s
             "ClassF": ["ClassA"],
         }
         sorted = topological_sort(graph)
+
+    Raises:
+        CycleError: the graph has cycles
+    """
+    return [node_name for level in topological_levels(graph) for node_name in level]
+
+
+def topological_levels(graph: typing.Dict[str, typing.List[str]]) -> typing.List[typing.List[str]]:
+    """Kahn's algorithm grouped by level in O(V+E)
+
+    Each level has the nodes whose predecessors are all in the previous levels, so the
+    nodes of a level do not depend on each other. Joining the levels gives topological_sort().
+
+    Args:
+        graph: same as topological_sort()
+
+    Examples:
+        topological_levels(graph)
+        # [["ClassD"], ["ClassA"], ["ClassB", "ClassC", "ClassF"], ["ClassE"]]
+
+    Raises:
+        CycleError: the graph has cycles
     """
-    node_map: dict = {}
-    for _node_name, _predecessors in graph.items():
-        node_map[_node_name] = {
-            "name": _node_name,
-            "indegree": len(_predecessors),
-            "next_node_names": []
+    successors_per_node: typing.Dict[str, typing.List[str]] = {node_name: [] for node_name in graph}
+    indegree_per_node: typing.Dict[str, int] = {}
+    for node_name, predecessors in graph.items():
+        # Duplicate predecessors make a single edge
+        unique_predecessors = dict.fromkeys(predecessors)
+        for predecessor in unique_predecessors:
+            successors = successors_per_node.get(predecessor)
+            if successors is None:
+                raise ValueError(f"Unknown predecessor '{predecessor}' of '{node_name}'")
+            successors.append(node_name)
+        indegree_per_node[node_name] = len(unique_predecessors)
+
+    levels: typing.List[typing.List[str]] = []
+    level = [node_name for node_name, indegree in indegree_per_node.items() if indegree == 0]
+    sorted_count = 0
+    while len(level) > 0:
+        levels.append(level)
+        sorted_count += len(level)
+        next_level = []
+        for node_name in level:
+            for successor in successors_per_node[node_name]:
+                indegree_per_node[successor] -= 1
+                if indegree_per_node[successor] == 0:
+                    next_level.append(successor)
+        level = next_level
+
+    if sorted_count != len(graph):
+        remaining = {
+            node_name: graph[node_name] for node_name, indegree in indegree_per_node.items() if indegree > 0
         }
-    for _node_name, _predecessors in graph.items():
-        for _predecessor in _predecessors:
-            if _node_name not in node_map[_predecessor]['next_node_names']:
-                node_map[_predecessor]['next_node_names'].append(_node_name)
-
-    queue: typing.Deque = collections.deque()
-    for node in node_map.values():
-        if node['indegree'] == 0:
-            queue.append(node)
-
-    sorted_node_names = []
-    while len(queue) > 0:
-        node = queue.popleft()
-        sorted_node_names.append(node['name'])
-        for next_node_name in node['next_node_names']:
-            next_node = node_map[next_node_name]
-            next_node['indegree'] = next_node['indegree'] - 1
-            if next_node['indegree'] == 0:
-                queue.append(next_node)
-
-    if len(sorted_node_names) != len(node_map):
-        raise ValueError(f"Cycles detected: {str(graph)}")
-
-    return sorted_node_names
+        cycles = [
+            component for component in strongly_connected_components(remaining)
+            if len(component) > 1 or component[0] in remaining[component[0]]
+        ]
+        raise CycleError(cycles)
+
+    return levels
+
+
+def strongly_connected_components(graph: typing.Dict[str, typing.List[str]]) -> typing.List[typing.List[str]]:
+    """Tarjan's strongly connected components
+
+    Args:
+        graph: same as topological_sort() but may have cycles.
+            Predecessors which are not in the graph are ignored.
+
+    Returns:
+        Components in topological order, i.e. each component comes after the components
+        of its predecessors. Nodes in a component are in the order of 'graph'.
+    """
+    order = {node_name: i for i, node_name in enumerate(graph)}
+    index_per_node: typing.Dict[str, int] = {}
+    lowlink_per_node: typing.Dict[str, int] = {}
+    stack: typing.List[str] = []
+    on_stack: typing.Set[str] = set()
+    components: typing.List[typing.List[str]] = []
+
+    for root in graph:
+        if root in index_per_node:
+            continue
+        # (node, iterator over its predecessors) to avoid recursion
+        work: typing.List[typing.Tuple[str, typing.Iterator[str]]] = [(root, iter(graph[root]))]
+        index_per_node[root] = lowlink_per_node[root] = len(index_per_node)
+        stack.append(root)
+        on_stack.add(root)
+        while len(work) > 0:
+            node, predecessors = work[-1]
+            for predecessor in predecessors:
+                if predecessor not in graph:
+                    continue
+                if predecessor not in index_per_node:
+                    index_per_node[predecessor] = lowlink_per_node[predecessor] = len(index_per_node)
+                    stack.append(predecessor)
+                    on_stack.add(predecessor)
+                    work.append((predecessor, iter(graph[predecessor])))
+                    break
+                elif predecessor in on_stack:
+                    lowlink_per_node[node] = min(lowlink_per_node[node], index_per_node[predecessor])
+            else:
+                work.pop()
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    lowlink_per_node[parent] = min(lowlink_per_node[parent], lowlink_per_node[node])
+                if lowlink_per_node[node] == index_per_node[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component, key=lambda x: order[x]))
+    return components
@@ -1,9 +1,62 @@
+import hashlib
+import logging
 import typing
 import jinja2
 
+from . import profile_utils
+
+logger = logging.getLogger(__name__)
+
+
+class _SourceLoader(jinja2.BaseLoader):
+    """Load templates registered by their source code
+
+    Template sources are identified by their hash so that the bytecode cache
+    can be shared across processes.
+    """
+    def __init__(self) -> None:
+        self._sources: typing.Dict[str, str] = {}
+        self._names: typing.Dict[str, str] = {}
+
+    def get_name(self, source: str) -> str:
+        name = self._names.get(source)
+        if name is None:
+            name = hashlib.sha256(source.encode('utf-8')).hexdigest()
+            self._names[source] = name
+            self._sources[name] = source
+        return name
+
+    def get_source(
+        self,
+        environment: jinja2.Environment,
+        template: str,
+    ) -> typing.Tuple[str, typing.Optional[str], typing.Callable[[], bool]]:
+        source = self._sources.get(template)
+        if source is None:
+            raise jinja2.TemplateNotFound(template)
+        return source, None, lambda: True
+
+
+_loader = _SourceLoader()
+_env: typing.Optional[jinja2.Environment] = None
+
+
+def _get_env() -> jinja2.Environment:
+    global _env
+    if _env is None:
+        try:
+            bytecode_cache: typing.Optional[jinja2.BytecodeCache] = jinja2.FileSystemBytecodeCache()
+        except RuntimeError as e:
+            logger.debug(f"Template bytecode cache is not available: {e}")
+            bytecode_cache = None
+        # Compiled templates are kept by the environment, so each template is compiled once per process
+        _env = jinja2.Environment(
+            loader=_loader, bytecode_cache=bytecode_cache, cache_size=-1, auto_reload=False,
+            autoescape=False, undefined=jinja2.StrictUndefined,
+            trim_blocks=True, lstrip_blocks=True)
+    return _env
+
 
 def render(template: str, variables: typing.Dict[typing.Any, typing.Any]) -> str:
-    env = jinja2.Environment(
-        autoescape=False, undefined=jinja2.StrictUndefined,
-        trim_blocks=True, lstrip_blocks=True)
-    return env.from_string(template).render(variables)
+    with profile_utils.span('render'):
+        return _get_env().get_template(_loader.get_name(template)).render(variables)
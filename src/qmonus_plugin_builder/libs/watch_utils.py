@@ -0,0 +1,152 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import pathlib
+import select
+import sys
+import time
+import typing
+
+logger = logging.getLogger(__name__)
+
+# inotify(7)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+
+Snapshot = typing.Dict[pathlib.Path, typing.Tuple[int, int]]
+
+
+def take_snapshot(root_path: pathlib.Path, suffix: str = '.py') -> Snapshot:
+    """Return (mtime_ns, size) per file under the root path"""
+    snapshot: Snapshot = {}
+    stack = [str(root_path)]
+    while len(stack) > 0:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name != '__pycache__':
+                    stack.append(entry.path)
+            elif entry.name.endswith(suffix):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[pathlib.Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> typing.Set[pathlib.Path]:
+    """Return the files which were added, modified or removed"""
+    changed_paths = set(old.keys()) ^ set(new.keys())
+    for path, stat in new.items():
+        if path in old and old[path] != stat:
+            changed_paths.add(path)
+    return changed_paths
+
+
+class _Inotify(object):
+    def __init__(self, root_path: pathlib.Path) -> None:
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd: int = fd
+        self._root_path = root_path
+        self._watched_dirs: typing.Set[str] = set()
+        self.add_watches()
+
+    def add_watches(self) -> None:
+        for dir_path, dir_names, _ in os.walk(str(self._root_path)):
+            dir_names[:] = [name for name in dir_names if name != '__pycache__']
+            if dir_path in self._watched_dirs:
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _IN_MASK)
+            if wd >= 0:
+                self._watched_dirs.add(dir_path)
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if len(readable) == 0:
+            return False
+        while True:
+            try:
+                if len(os.read(self._fd, 65536)) == 0:
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class FileWatcher(object):
+    """Watch '*.py' files under the root path
+
+    inotify is used on Linux to wake up on changes. Otherwise (or if 'polling' is True)
+    the files are polled every 'interval' seconds. In both cases the changed files
+    are determined by comparing snapshots of mtime and size.
+    """
+    def __init__(self, root_path: pathlib.Path, interval: float = 0.1, polling: bool = False) -> None:
+        self.root_path = root_path
+        self.interval = interval
+        self._snapshot = take_snapshot(root_path)
+        self._inotify: typing.Optional[_Inotify] = None
+        if not polling and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify(root_path)
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify is not available, falling back to polling: {e}")
+
+    @property
+    def polling(self) -> bool:
+        return self._inotify is None
+
+    def wait(self, timeout: typing.Optional[float] = None) -> typing.Set[pathlib.Path]:
+        """Block until files are changed and return them. An empty set is returned on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait_time = self.interval
+            if deadline is not None:
+                wait_time = max(0.0, min(wait_time, deadline - time.monotonic()))
+
+            if self._inotify is not None:
+                if self._inotify.wait(wait_time):
+                    # Let editors finish a burst of writes
+                    time.sleep(0.01)
+                    self._inotify.wait(0)
+                    self._inotify.add_watches()
+                    changed_paths = self._rescan()
+                    if len(changed_paths) > 0:
+                        return changed_paths
+            else:
+                time.sleep(wait_time)
+                changed_paths = self._rescan()
+                if len(changed_paths) > 0:
+                    return changed_paths
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def _rescan(self) -> typing.Set[pathlib.Path]:
+        snapshot = take_snapshot(self.root_path)
+        changed_paths = diff_snapshots(self._snapshot, snapshot)
+        self._snapshot = snapshot
+        return changed_paths
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -3,6 +3,8 @@ import re
 
 import yaml
 
+from . import profile_utils
+
 
 def str_representer(dumper: typing.Any, data: typing.Any) -> typing.Any:
     if '\n' in data:
@@ -16,9 +18,45 @@ def str_representer(dumper: typing.Any, data: typing.Any) -> typing.Any:
 # Specify SafeDumper for yaml.safe_dump
 yaml.add_representer(str, str_representer, Dumper=yaml.SafeDumper)
 
+# libyaml based dumper if available
+CSafeDumper: typing.Optional[typing.Any] = getattr(yaml, 'CSafeDumper', None)
+if CSafeDumper is not None:
+    yaml.add_representer(str, str_representer, Dumper=CSafeDumper)
+
+# Characters which libyaml emits exactly like the pure python emitter.
+# Tabs, control characters, unicode line breaks, BOM and non-BMP characters are escaped differently.
+_LIBYAML_UNSAFE_CHARACTER = re.compile('[^\n\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]')
+
 
 def dump(obj: typing.Any) -> str:
-    yml: str = yaml.safe_dump(
-        obj, indent=2, default_flow_style=False,
-        allow_unicode=True, encoding='utf-8').decode('utf-8')
+    """Dump obj with libyaml if the output is the same as the pure python emitter's"""
+    with profile_utils.span('yaml'):
+        dumper = CSafeDumper if CSafeDumper is not None and is_libyaml_safe(obj) else yaml.SafeDumper
+        yml: str = yaml.dump(
+            obj, Dumper=dumper, indent=2, default_flow_style=False,
+            allow_unicode=True, encoding='utf-8').decode('utf-8')
     return yml
+
+
+def is_libyaml_safe(obj: typing.Any) -> bool:
+    """Return True if libyaml emits obj byte for byte like the pure python emitter"""
+    stack = [obj]
+    while len(stack) > 0:
+        value = stack.pop()
+        if isinstance(value, str):
+            if _LIBYAML_UNSAFE_CHARACTER.search(value) is not None:
+                return False
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                # The emitters disagree on which keys must be written as complex keys ('? key')
+                if isinstance(k, str) and (k == '' or '\n' in k or len(k.encode('utf-8')) >= 128):
+                    return False
+                if not isinstance(k, (str, int, float, bool)) and k is not None:
+                    return False
+                stack.append(k)
+                stack.append(v)
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif value is not None and not isinstance(value, (int, float, bool)):
+            return False
+    return True
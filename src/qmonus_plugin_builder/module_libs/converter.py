@@ -4,7 +4,7 @@ import logging
 import pathlib
 
 from .. import exceptions
-from ..libs import yaml_utils, file_utils, data_lib
+from ..libs import bundle_utils, data_lib, file_utils, profile_utils, project_index, yaml_utils
 from . import component as comp
 from . import parser
 
@@ -12,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 
 class ModuleYAML(object):
+    __slots__ = ('category', 'name', 'code', 'version', 'update')
+
     def __init__(
         self,
         category: typing.Optional[str],
@@ -24,12 +26,18 @@ class ModuleYAML(object):
         self.name = name
         self.code = code
         self.version = version
-
-        if update is not None:
-            self.update = update
+        self.update = update
 
     def to_dict(self) -> typing.Dict[str, typing.Any]:
-        _dict: typing.Dict[str, typing.Any] = data_lib.to_primitive(self)
+        with profile_utils.span('to_primitive'):
+            _dict: typing.Dict[str, typing.Any] = {
+                'category': self.category,
+                'name': self.name,
+                'code': self.code,
+                'version': self.version,
+            }
+            if self.update is not None:
+                _dict['update'] = self.update
         return _dict
 
     def dump(self) -> str:
@@ -52,14 +60,42 @@ def to_yaml(mod_def: parser.ModuleDefinition) -> ModuleYAML:
     return module_yaml
 
 
-def to_yaml_file(module_path: pathlib.Path, yaml_path: pathlib.Path) -> None:
-    definitions = parser.get_definitions(module_path)
-    for definition in definitions:
-        yaml = to_yaml(definition)
+def iter_yaml_files(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[typing.Tuple[pathlib.Path, pathlib.PurePosixPath, str]]:
+    """Yield the source file path, the yaml file path relative to the output directory and the yaml one by one"""
+    for definition in parser.iter_definitions(module_path, paths=paths, index=index):
+        with profile_utils.span('convert', kind='modules', plugin=definition.name):
+            yaml = to_yaml(definition)
         if definition.setting.workspace is None:
             raise exceptions.FatalError("workspace must not be 'None'")
-        dir_path = yaml_path.joinpath(definition.setting.workspace).joinpath('modules')
-        file_utils.create_dir(dir_path)
-        file_path = dir_path.joinpath(f"{definition.name}.yml")
-        logger.info(f"Creating '{str(file_path)}'")
-        file_utils.create_file(file_path=file_path, data=yaml.dump())
+        relative_path = pathlib.PurePosixPath(definition.setting.workspace, 'modules', f"{definition.name}.yml")
+        yield definition.path, relative_path, yaml.dump()
+
+
+def to_yaml_file(
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+    stats: typing.Optional[file_utils.WriteStats] = None,
+    bundle: typing.Optional[bundle_utils.BundleWriter] = None,
+) -> typing.Dict[pathlib.Path, pathlib.Path]:
+    """Dump yaml files and return the created file path per source file path
+
+    If 'bundle' is given, the files are added to it instead of being written under 'yaml_path'.
+    """
+    file_paths: typing.Dict[pathlib.Path, pathlib.Path] = {}
+    for path, relative_path, data in iter_yaml_files(module_path, paths=paths, index=index):
+        file_path = yaml_path.joinpath(relative_path)
+        if bundle is not None:
+            logger.info(f"Adding '{str(file_path)}'")
+            bundle.create_file(file_path=file_path, data=data, stats=stats)
+        else:
+            file_utils.create_dir(file_path.parent)
+            logger.info(f"Creating '{str(file_path)}'")
+            file_utils.create_file(file_path=file_path, data=data, stats=stats)
+        file_paths[path] = file_path
+    return file_paths
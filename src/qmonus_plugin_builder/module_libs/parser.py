@@ -3,27 +3,26 @@ import typing
 import types
 import logging
 import inspect
-import importlib
 import pathlib
 import collections
 
 from . import component as comp
 from .. import exceptions
-from ..libs import file_utils
+from ..libs import ast_utils, file_utils, profile_utils, project_index
 
 logger = logging.getLogger(__name__)
 
 
-def get_files(module_path: pathlib.Path) -> typing.List[pathlib.Path]:
-    if not module_path.is_dir():
-        raise ValueError(f"Invalid module_path specified: '{str(module_path)}' does not exist.")
+def get_files(
+    module_path: pathlib.Path,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[pathlib.Path]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
 
-    files: typing.List[pathlib.Path] = []
-    for file in module_path.glob('plugins/*/modules/**/*.py'):
-        if file.name == '__init__.py':
-            continue
+    files = index.get_files('modules')
+    for file in files:
         logger.info(f"Module file detected: '{str(file)}'")
-        files.append(file)
 
     # Check duplication
     counter = collections.Counter([file.stem for file in files])
@@ -34,59 +33,149 @@ def get_files(module_path: pathlib.Path) -> typing.List[pathlib.Path]:
     return files
 
 
-def get_modules(module_path: pathlib.Path) -> typing.List[types.ModuleType]:
-    paths = get_files(module_path=module_path)
+def get_modules(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[types.ModuleType]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
     modules: typing.List[types.ModuleType] = []
     for path in paths:
-        module_name = str(path.relative_to(module_path.parent).with_suffix('').as_posix()).replace('/', '.')
-        logger.info(f"importing module '{module_name}'")
-        module = importlib.import_module(module_name)
-        modules.append(module)
+        modules.append(_import_module(index, path))
     return modules
 
 
-def get_definitions(module_path: pathlib.Path) -> typing.List[ModuleDefinition]:
-    py_modules = get_modules(module_path)
+def _import_module(index: project_index.ProjectIndex, path: pathlib.Path) -> types.ModuleType:
+    logger.info(f"importing module '{index.get_module_name(path)}'")
+    return index.import_module(path)
+
+
+def get_definitions(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[ModuleDefinition]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
     definitions: typing.List[ModuleDefinition] = []
-    for py_module in py_modules:
-        module_class: typing.Optional[typing.Type[comp.BaseHeader]] = \
-            getattr(py_module, 'ModuleHeader', None)
-        if module_class is None:
-            raise exceptions.ModuleError(f"'class ModuleHeader(BaseModuleHeader)' does not exist in '{py_module.__name__}'")
-
-        module_instance = module_class()
-
-        # setting
-        setting = module_instance.__setting__()
-        if setting.workspace is None:
-            setting.workspace = _get_default_workspace(py_module)
-        if setting.category is None:
-            setting.category = _get_default_category(py_module)
-
-        # code
-        lines, starting_line_num = inspect.getsourcelines(module_class)
-        ending_line_num = starting_line_num + len(lines)
-        module_file = pathlib.Path(str(py_module.__file__)).resolve()
-        module_text = file_utils.open_file(module_file)
-        code = '\n'.join(module_text.split('\n')[ending_line_num - 1:]).lstrip()
-
-        definition = ModuleDefinition(
-            name=module_file.stem,
-            setting=setting,
-            code=code,
-        )
+    for path in paths:
+        definition = index.definitions.get(path)
+        if definition is None:
+            with profile_utils.span('parse', kind='modules', plugin=index.get_module_name(path)):
+                definition = _load_definition(index, path)
+            index.definitions[path] = definition
         definitions.append(definition)
 
     return definitions
 
 
-def _get_default_workspace(module: types.ModuleType) -> str:
-    workspace = module.__name__.split('.')[2]
+def iter_definitions(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[ModuleDefinition]:
+    """Yield definitions one by one
+
+    Unlike get_definitions(), parsed definitions are not cached in the index, so each
+    definition can be freed as soon as the caller is done with it.
+    """
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
+    for path in paths:
+        definition = index.definitions.get(path)
+        if definition is None:
+            with profile_utils.span('parse', kind='modules', plugin=index.get_module_name(path)):
+                definition = _load_definition(index, path)
+        yield definition
+
+
+def _load_definition(index: project_index.ProjectIndex, path: pathlib.Path) -> ModuleDefinition:
+    if index.static:
+        try:
+            return _get_static_definition(index, path)
+        except exceptions.StaticAnalysisError as e:
+            logger.info(f"Falling back to import for '{str(path)}': {e}")
+    return _get_definition(_import_module(index, path))
+
+
+def _get_definition(py_module: types.ModuleType) -> ModuleDefinition:
+    module_class: typing.Optional[typing.Type[comp.BaseHeader]] = \
+        getattr(py_module, 'ModuleHeader', None)
+    if module_class is None:
+        raise exceptions.ModuleError(f"'class ModuleHeader(BaseModuleHeader)' does not exist in '{py_module.__name__}'")
+
+    module_instance = module_class()
+
+    # setting
+    setting = module_instance.__setting__()
+
+    # code
+    lines, starting_line_num = inspect.getsourcelines(module_class)
+    ending_line_num = starting_line_num + len(lines)
+    module_file = pathlib.Path(str(py_module.__file__)).resolve()
+    module_text = file_utils.open_file(module_file)
+    code = '\n'.join(module_text.split('\n')[ending_line_num - 1:]).lstrip()
+
+    return _create_definition(module_name=py_module.__name__, path=module_file, setting=setting, code=code)
+
+
+def _get_static_definition(index: project_index.ProjectIndex, path: pathlib.Path) -> ModuleDefinition:
+    module_name = index.get_module_name(path)
+    logger.info(f"parsing module '{module_name}'")
+    module_text = file_utils.open_file(path)
+    source = ast_utils.SourceFile(module_text, module_name)
+    namespace = source.get_namespace(comp, class_names=index.get_class_names())
+
+    # setting
+    module_node = source.get_class('ModuleHeader')
+    setting_node = ast_utils.get_method(module_node, '__setting__') if module_node is not None else None
+    if module_node is None or setting_node is None:
+        raise exceptions.StaticAnalysisError(f"'ModuleHeader.__setting__' does not exist in '{module_name}'")
+    setting = ast_utils.get_returned_value(setting_node, namespace)
+    if not isinstance(setting, comp.Setting):
+        raise exceptions.StaticAnalysisError(f"Invalid setting of 'ModuleHeader' in '{module_name}'")
+
+    # code
+    ending_line_num = typing.cast(int, module_node.end_lineno)
+    code = '\n'.join(module_text.split('\n')[ending_line_num:]).lstrip()
+
+    return _create_definition(module_name=module_name, path=path.resolve(), setting=setting, code=code)
+
+
+def _create_definition(
+    module_name: str,
+    path: pathlib.Path,
+    setting: comp.Setting,
+    code: str,
+) -> ModuleDefinition:
+    if setting.workspace is None:
+        setting.workspace = _get_default_workspace(module_name)
+    if setting.category is None:
+        setting.category = _get_default_category(module_name)
+
+    definition = ModuleDefinition(
+        name=path.stem,
+        setting=setting,
+        code=code,
+        path=path,
+    )
+    return definition
+
+
+def _get_default_workspace(module_name: str) -> str:
+    workspace = module_name.split('.')[2]
     return workspace
 
 
-def _get_default_category(module: types.ModuleType) -> str:
-    names = module.__name__.split('.')[4:-1]
+def _get_default_category(module_name: str) -> str:
+    names = module_name.split('.')[4:-1]
     category = ".".join(names)
     return category
 
@@ -97,7 +186,9 @@ class ModuleDefinition(object):
         name: str,
         setting: comp.Setting,
         code: str,
+        path: pathlib.Path,
     ) -> None:
         self.name = name
         self.setting = setting
         self.code = code
+        self.path = path
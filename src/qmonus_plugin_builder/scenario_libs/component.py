@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import abc
 import typing
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from enum import Enum
 from http import HTTPStatus
 
@@ -68,11 +68,16 @@ class Spec:
     response: typing.Optional[Spec.Response] = field(default_factory=Response)
 
     def to_dict(self, empty_the_value_of_none: bool = True) -> dict:
-        dict_of_self = dictionary.rename_now_key_to_new_key(asdict(self), now_key='dollar_sign_schema', new_key='$schema')
-        dict_of_self = dictionary.enum_to_value(dict_of_self)
-        if empty_the_value_of_none:
-            return dictionary.empty_the_select_value(dict_of_self, select_value=None)
-        return dict_of_self
+        rules = _SPEC_RULES if empty_the_value_of_none else _SPEC_RULES[:2]
+        return dictionary.dataclass_to_dict(self, rules=rules)
+
+
+# Rename 'dollar_sign_schema', convert enums to their values and remove None values
+_SPEC_RULES = [
+    dictionary.rename_now_key_to_new_key_rule(now_key='dollar_sign_schema', new_key='$schema'),
+    dictionary.enum_to_value_rule(),
+    dictionary.empty_the_select_value_rule(select_value=None),
+]
 
 
 class BaseHeader(abc.ABC):
@@ -181,6 +186,12 @@ class BaseCommand(abc.ABC):
     @typing.final
     def get_code(self, method_name: str) -> typing.Optional[str]:
         cls_dict = vars(self.__class__)
+        # Commands built by the static parser keep the source code of their methods
+        static_sources: typing.Optional[typing.Dict[str, str]] = cls_dict.get('__static_sources__')
+        if static_sources is not None:
+            source = static_sources.get(method_name)
+            return inspect_utils.get_function_body(source) if source is not None else None
+
         if method_name in cls_dict:
             code = inspect_utils.get_function_code(cls_dict[method_name])
         else:
@@ -5,7 +5,7 @@ import pathlib
 import typing
 
 from .. import exceptions
-from ..libs import data_lib, file_utils, yaml_utils
+from ..libs import bundle_utils, data_lib, file_utils, inspect_utils, profile_utils, project_index, yaml_utils
 from . import component as comp
 from . import parser
 
@@ -13,6 +13,12 @@ logger = logging.getLogger(__name__)
 
 
 class ScenarioYAML(object):
+    __slots__ = (
+        'category', 'name', 'uri', 'method', 'additional_paths', 'request_timeout', 'connect_timeout', 'version',
+        'update', 'routing_auto_generation_mode', 'scope', 'spec', 'global_variables', 'transaction', 'commands',
+        'variable_groups',
+    )
+
     def __init__(
         self,
         category: typing.Optional[str],
@@ -36,18 +42,13 @@ class ScenarioYAML(object):
         self.request_timeout = request_timeout
         self.connect_timeout = connect_timeout
         self.version = version
-
-        if update is not None:
-            self.update = update
-
+        self.update = update
         self.routing_auto_generation_mode = routing_auto_generation_mode
-        self.routing_options = {
-            "scope": scope
-        }
+        self.scope = scope
         self.spec: dict = spec
 
         self.global_variables: typing.Dict[str, GlobalVariableYAML] = {}
-        self.transaction: typing.Any = {}
+        self.transaction: typing.Optional[TransactionYAML] = None
         self.commands: typing.List[typing.Union[RequestValidationCommandYAML, ScriptCommandYAML, dict]] = []
 
         # Not supported
@@ -151,7 +152,33 @@ class ScenarioYAML(object):
         self.commands.append(command)
 
     def to_dict(self) -> typing.Dict[str, typing.Any]:
-        _dict: typing.Dict[str, typing.Any] = data_lib.to_primitive(self)
+        with profile_utils.span('to_primitive'):
+            _dict: typing.Dict[str, typing.Any] = {
+                'category': self.category,
+                'name': self.name,
+                'uri': self.uri,
+                'method': self.method,
+                'additional_paths': data_lib.to_primitive(self.additional_paths),
+                'request_timeout': self.request_timeout,
+                'connect_timeout': self.connect_timeout,
+                'version': self.version,
+            }
+            if self.update is not None:
+                _dict['update'] = self.update
+            _dict['routing_auto_generation_mode'] = self.routing_auto_generation_mode
+            _dict['routing_options'] = {
+                "scope": self.scope
+            }
+            _dict['spec'] = data_lib.to_primitive(self.spec)
+            _dict['global_variables'] = {
+                name: global_variable.to_dict() for name, global_variable in self.global_variables.items()}
+            _dict['transaction'] = {} if self.transaction is None else self.transaction.to_dict()
+            _dict['commands'] = [
+                command.to_dict() if isinstance(command, (RequestValidationCommandYAML, ScriptCommandYAML))
+                else data_lib.to_primitive(command)
+                for command in self.commands
+            ]
+            _dict['variable_groups'] = data_lib.to_primitive(self.variable_groups)
         return _dict
 
     def dump(self) -> str:
@@ -160,6 +187,11 @@ class ScenarioYAML(object):
 
 
 class TransactionYAML(object):
+    __slots__ = (
+        'enable', 'xdomain', 'xtype', 'xname', 'xname_use_counter', 'auto_rollback', 'auto_begin',
+        'auto_response', 'lock_keys', 'retry_count', 'retry_interval', 'timeout', 'crash_recovery_policy', 'async_',
+    )
+
     def __init__(
         self,
         enable: bool,
@@ -178,38 +210,64 @@ class TransactionYAML(object):
         async_: bool = True,
     ) -> None:
         self.enable = enable
+        self.xdomain = xdomain
+        self.xtype = xtype
         self.xname = xname
+        self.xname_use_counter = xname_use_counter
+        self.auto_rollback = auto_rollback
+        self.auto_begin = auto_begin
+        self.auto_response = auto_response
+        self.lock_keys = lock_keys
+        self.retry_count = retry_count
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.crash_recovery_policy = crash_recovery_policy
+        self.async_ = async_
 
-        # because it is a reserved word
-        setattr(self, 'async', async_)
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        _dict: typing.Dict[str, typing.Any] = {
+            'enable': self.enable,
+            'xname': self.xname,
+            # because it is a reserved word
+            'async': self.async_,
+        }
         if self.enable:
-            self.xname_use_counter = xname_use_counter
-            self.xdomain = xdomain
-            self.xtype = xtype
-            self.auto_rollback = auto_rollback
-            self.auto_begin = auto_begin
-            self.auto_response = auto_response
-
-            if lock_keys:
-                self.lock: typing.Dict[str, typing.Any] = {}
-                self.lock['lock_keys'] = lock_keys
-                self.lock['retry_count'] = retry_count
-                self.lock['retry_interval'] = retry_interval
+            _dict['xname_use_counter'] = self.xname_use_counter
+            _dict['xdomain'] = self.xdomain
+            _dict['xtype'] = self.xtype
+            _dict['auto_rollback'] = self.auto_rollback
+            _dict['auto_begin'] = self.auto_begin
+            _dict['auto_response'] = self.auto_response
+
+            if self.lock_keys:
+                _dict['lock'] = {
+                    'lock_keys': data_lib.to_primitive(self.lock_keys),
+                    'retry_count': self.retry_count,
+                    'retry_interval': self.retry_interval,
+                }
 
-            if timeout is not None:
-                self.timeout = timeout
+            if self.timeout is not None:
+                _dict['timeout'] = self.timeout
 
-            if crash_recovery_policy is not None:
-                self.crash_recovery_policy = crash_recovery_policy
+            if self.crash_recovery_policy is not None:
+                _dict['crash_recovery_policy'] = self.crash_recovery_policy
+        return _dict
 
 
 class GlobalVariableYAML(object):
+    __slots__ = ('description', 'initial')
+
     def __init__(self, description: str = '', initial: typing.Any = None) -> None:
         self.description = description
         self.initial = initial
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {'description': self.description, 'initial': data_lib.to_primitive(self.initial)}
+
 
 class RequestValidationCommandYAML(object):
+    __slots__ = ('command', 'label', 'kwargs')
+
     def __init__(
         self,
         label: typing.Optional[str],
@@ -224,9 +282,7 @@ class RequestValidationCommandYAML(object):
         headers: typing.Optional[typing.Dict[typing.Any, typing.Any]],
     ) -> None:
         self.command = 'request_validation'
-
-        if label is not None:
-            self.label = label
+        self.label = label
 
         self.kwargs: typing.Dict[typing.Any, typing.Any] = {}
         if pre_process_code is not None or pre_condition_code is not None:
@@ -262,8 +318,13 @@ class RequestValidationCommandYAML(object):
         if headers is not None:
             self.kwargs['headers'] = headers
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return _command_to_dict(self.command, self.label, self.kwargs)
+
 
 class ScriptCommandYAML(object):
+    __slots__ = ('command', 'label', 'kwargs')
+
     def __init__(
         self,
         label: typing.Optional[str],
@@ -276,9 +337,7 @@ class ScriptCommandYAML(object):
         post_condition_code: typing.Optional[str],
     ) -> None:
         self.command = 'script'
-
-        if label is not None:
-            self.label = label
+        self.label = label
 
         self.kwargs: typing.Dict[str, typing.Any] = {}
         if pre_process_code is not None or pre_condition_code is not None:
@@ -311,6 +370,21 @@ class ScriptCommandYAML(object):
                 }
             ]
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return _command_to_dict(self.command, self.label, self.kwargs)
+
+
+def _command_to_dict(
+    command: str,
+    label: typing.Optional[str],
+    kwargs: typing.Dict[str, typing.Any],
+) -> typing.Dict[str, typing.Any]:
+    _dict: typing.Dict[str, typing.Any] = {'command': command}
+    if label is not None:
+        _dict['label'] = label
+    _dict['kwargs'] = data_lib.to_primitive(kwargs)
+    return _dict
+
 
 def to_yaml(scenario_def: parser.ScenarioDefinition) -> ScenarioYAML:
     # Get setting
@@ -357,7 +431,8 @@ def to_yaml(scenario_def: parser.ScenarioDefinition) -> ScenarioYAML:
         )
 
     for command in scenario_def.commands:
-        if isinstance(command, comp.RequestValidation):
+        if inspect_utils.is_instance(command, comp.RequestValidation):
+            command = typing.cast(comp.RequestValidation, command)
             pre_process_code = command.get_code('pre_process')
             pre_condition_code = command.get_code('pre_condition')
             post_process_code = command.get_code('post_process')
@@ -375,7 +450,8 @@ def to_yaml(scenario_def: parser.ScenarioDefinition) -> ScenarioYAML:
                 post_condition_code=post_condition_code,
                 except_code=except_code,
             )
-        elif isinstance(command, comp.Script):
+        elif inspect_utils.is_instance(command, comp.Script):
+            command = typing.cast(comp.Script, command)
             code = command.get_code('code')
             cancel_code = command.get_code('cancel_code')
             pre_process_code = command.get_code('pre_process')
@@ -392,7 +468,7 @@ def to_yaml(scenario_def: parser.ScenarioDefinition) -> ScenarioYAML:
                 post_process_code=post_process_code,
                 post_condition_code=post_condition_code,
             )
-        elif isinstance(command, comp.BaseCommand) and hasattr(command, 'to_dict'):
+        elif inspect_utils.is_instance(command, comp.BaseCommand) and hasattr(command, 'to_dict'):
             scenario_yaml.commands.append(command.to_dict())
         else:
             raise exceptions.CommandError("FatalError: Invalid command type")
@@ -400,14 +476,42 @@ def to_yaml(scenario_def: parser.ScenarioDefinition) -> ScenarioYAML:
     return scenario_yaml
 
 
-def to_yaml_file(module_path: pathlib.Path, yaml_path: pathlib.Path) -> None:
-    definitions = parser.get_definitions(module_path=module_path)
-    for definition in definitions:
-        yaml = to_yaml(definition)
+def iter_yaml_files(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[typing.Tuple[pathlib.Path, pathlib.PurePosixPath, str]]:
+    """Yield the source file path, the yaml file path relative to the output directory and the yaml one by one"""
+    for definition in parser.iter_definitions(module_path=module_path, paths=paths, index=index):
+        with profile_utils.span('convert', kind='scenarios', plugin=definition.name):
+            yaml = to_yaml(definition)
         if definition.setting.workspace is None:
             raise exceptions.FatalError("workspace must not be 'None'")
-        dir_path = yaml_path.joinpath(definition.setting.workspace).joinpath('scenarios')
-        file_utils.create_dir(dir_path)
-        file_path = dir_path.joinpath(f"{definition.name}.yml")
-        logger.info(f"Creating '{str(file_path)}'")
-        file_utils.create_file(file_path=file_path, data=yaml.dump())
+        relative_path = pathlib.PurePosixPath(definition.setting.workspace, 'scenarios', f"{definition.name}.yml")
+        yield definition.path, relative_path, yaml.dump()
+
+
+def to_yaml_file(
+    module_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+    stats: typing.Optional[file_utils.WriteStats] = None,
+    bundle: typing.Optional[bundle_utils.BundleWriter] = None,
+) -> typing.Dict[pathlib.Path, pathlib.Path]:
+    """Dump yaml files and return the created file path per source file path
+
+    If 'bundle' is given, the files are added to it instead of being written under 'yaml_path'.
+    """
+    file_paths: typing.Dict[pathlib.Path, pathlib.Path] = {}
+    for path, relative_path, data in iter_yaml_files(module_path, paths=paths, index=index):
+        file_path = yaml_path.joinpath(relative_path)
+        if bundle is not None:
+            logger.info(f"Adding '{str(file_path)}'")
+            bundle.create_file(file_path=file_path, data=data, stats=stats)
+        else:
+            file_utils.create_dir(file_path.parent)
+            logger.info(f"Creating '{str(file_path)}'")
+            file_utils.create_file(file_path=file_path, data=data, stats=stats)
+        file_paths[path] = file_path
+    return file_paths
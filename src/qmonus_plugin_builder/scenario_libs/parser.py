@@ -3,26 +3,29 @@ import typing
 import types
 import inspect
 import logging
-import importlib
 import pathlib
 import collections
 
 from .. import exceptions
+from ..libs import ast_utils, file_utils, inspect_utils, profile_utils, project_index
 from . import component as comp
 
 logger = logging.getLogger(__name__)
 
+# Methods of commands which return a setting or a schema
+_CONSTANT_METHOD_NAMES = ('__setting__', 'resources', 'params', 'headers', 'body')
 
-def get_files(module_path: pathlib.Path) -> typing.List[pathlib.Path]:
-    if not module_path.is_dir():
-        raise ValueError(f"Invalid module_path specified: '{str(module_path)}' does not exist.")
 
-    files: typing.List[pathlib.Path] = []
-    for file in module_path.glob('plugins/*/scenarios/**/*.py'):
-        if file.name == '__init__.py':
-            continue
+def get_files(
+    module_path: pathlib.Path,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[pathlib.Path]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+
+    files = index.get_files('scenarios')
+    for file in files:
         logger.info(f"Scenario file detected: '{str(file)}'")
-        files.append(file)
 
     # Check duplication
     counter = collections.Counter([file.stem for file in files])
@@ -33,82 +36,196 @@ def get_files(module_path: pathlib.Path) -> typing.List[pathlib.Path]:
     return files
 
 
-def get_modules(module_path: pathlib.Path) -> typing.List[types.ModuleType]:
-    paths = get_files(module_path=module_path)
+def get_modules(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[types.ModuleType]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
     modules: typing.List[types.ModuleType] = []
     for path in paths:
-        module_name = str(path.relative_to(module_path.parent).with_suffix('').as_posix()).replace('/', '.')
-        logger.info(f"importing scenario module '{module_name}'")
-        module = importlib.import_module(module_name)
-        modules.append(module)
+        modules.append(_import_module(index, path))
     return modules
 
 
-def get_definitions(module_path: pathlib.Path) -> typing.List[ScenarioDefinition]:
-    modules = get_modules(module_path)
+def _import_module(index: project_index.ProjectIndex, path: pathlib.Path) -> types.ModuleType:
+    logger.info(f"importing scenario module '{index.get_module_name(path)}'")
+    return index.import_module(path)
+
+
+def get_definitions(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.List[ScenarioDefinition]:
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
     definitions: typing.List[ScenarioDefinition] = []
-    for module in modules:
-        header_class: typing.Optional[typing.Type[comp.BaseHeader]] = \
-            getattr(module, 'ScenarioHeader', None)
-        if header_class is None:
-            raise exceptions.ScenarioError(f"'class ScenarioHeader' does not exist in '{module.__name__}'")
-
-        header = header_class()
-        setting = header.__setting__()
-        if setting.name is None:
-            setting.name = _get_default_name(module)
-        if setting.workspace is None:
-            setting.workspace = _get_default_workspace(module)
-        if setting.category is None:
-            setting.category = _get_default_category(module)
-
-        global_variable_definitions: typing.List[GlobalVariableDefinition] = []
-        for k, v in vars(module).items():
-            if isinstance(v, comp.GlobalVariable):
-                global_variable_definition = GlobalVariableDefinition(
-                    name=k,
-                    global_variable=v,
-                )
-                global_variable_definitions.append(global_variable_definition)
-
-        _commands: typing.List[comp.BaseCommand] = []
-        for k, v in vars(module).items():
-            if inspect.isclass(v):
-                if issubclass(v, comp.BaseCommand):
-                    _commands.append(v())
-        commands: typing.List[comp.BaseCommand] = \
-            sorted(_commands, key=lambda x: int(x.__class__.__name__.replace('Command', '')))
-
-        for index, command in enumerate(commands):
-            if command.__class__.__name__ != f'Command{index}':
-                _err = f"Invalid command name '{command.__class__.__name__}' in '{module.__name__.split('.')[-1]}'. " \
-                       f"Current name is 'Command{index}'."
-                raise exceptions.ScenarioError(_err)
-
-        definition = ScenarioDefinition(
-            name=setting.name,
-            setting=setting,
-            global_variables=global_variable_definitions,
-            commands=commands,
-        )
+    for path in paths:
+        definition = index.definitions.get(path)
+        if definition is None:
+            with profile_utils.span('parse', kind='scenarios', plugin=index.get_module_name(path)):
+                definition = _load_definition(index, path)
+            index.definitions[path] = definition
         definitions.append(definition)
 
     return definitions
 
 
-def _get_default_name(module: types.ModuleType) -> str:
-    module_file = pathlib.Path(str(module.__file__)).resolve()
-    name = module_file.stem
-    return name
-
-
-def _get_default_workspace(module: types.ModuleType) -> str:
-    workspace = module.__name__.split('.')[2]
+def iter_definitions(
+    module_path: pathlib.Path,
+    paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    index: typing.Optional[project_index.ProjectIndex] = None,
+) -> typing.Iterator[ScenarioDefinition]:
+    """Yield definitions one by one
+
+    Unlike get_definitions(), parsed definitions are not cached in the index, so each
+    definition can be freed as soon as the caller is done with it.
+    """
+    if index is None:
+        index = project_index.ProjectIndex(module_path)
+    if paths is None:
+        paths = get_files(module_path=module_path, index=index)
+    for path in paths:
+        definition = index.definitions.get(path)
+        if definition is None:
+            with profile_utils.span('parse', kind='scenarios', plugin=index.get_module_name(path)):
+                definition = _load_definition(index, path)
+        yield definition
+
+
+def _load_definition(index: project_index.ProjectIndex, path: pathlib.Path) -> ScenarioDefinition:
+    if index.static:
+        try:
+            return _get_static_definition(index, path)
+        except exceptions.StaticAnalysisError as e:
+            logger.info(f"Falling back to import for '{str(path)}': {e}")
+    return _get_definition(_import_module(index, path))
+
+
+def _get_definition(module: types.ModuleType) -> ScenarioDefinition:
+    header_class: typing.Optional[typing.Type[comp.BaseHeader]] = \
+        getattr(module, 'ScenarioHeader', None)
+    if header_class is None:
+        raise exceptions.ScenarioError(f"'class ScenarioHeader' does not exist in '{module.__name__}'")
+
+    header = header_class()
+    setting = header.__setting__()
+
+    global_variable_definitions: typing.List[GlobalVariableDefinition] = []
+    for k, v in vars(module).items():
+        if isinstance(v, comp.GlobalVariable):
+            global_variable_definition = GlobalVariableDefinition(
+                name=k,
+                global_variable=v,
+            )
+            global_variable_definitions.append(global_variable_definition)
+
+    commands: typing.List[comp.BaseCommand] = []
+    for k, v in vars(module).items():
+        if inspect.isclass(v):
+            if inspect_utils.is_subclass(v, comp.BaseCommand):
+                commands.append(typing.cast(comp.BaseCommand, v()))
+
+    return _create_definition(
+        module_name=module.__name__,
+        path=pathlib.Path(str(module.__file__)).resolve(),
+        setting=setting,
+        global_variables=global_variable_definitions,
+        commands=commands,
+    )
+
+
+def _get_static_definition(index: project_index.ProjectIndex, path: pathlib.Path) -> ScenarioDefinition:
+    module_name = index.get_module_name(path)
+    logger.info(f"parsing scenario module '{module_name}'")
+    source = ast_utils.SourceFile(file_utils.open_file(path), module_name)
+    namespace = source.get_namespace(comp, class_names=index.get_class_names())
+
+    header_node = source.get_class('ScenarioHeader')
+    setting_node = ast_utils.get_method(header_node, '__setting__') if header_node is not None else None
+    if setting_node is None:
+        raise exceptions.StaticAnalysisError(f"'ScenarioHeader.__setting__' does not exist in '{module_name}'")
+    setting = ast_utils.get_returned_value(setting_node, namespace)
+    if not isinstance(setting, comp.Setting):
+        raise exceptions.StaticAnalysisError(f"Invalid setting of 'ScenarioHeader' in '{module_name}'")
+
+    # A reassigned global variable keeps its first position like vars()
+    global_variables: typing.Dict[str, comp.GlobalVariable] = {}
+    for name, value in ast_utils.get_module_level_calls(source.tree, comp.global_variable, namespace):
+        global_variables[name] = value
+    global_variable_definitions = [
+        GlobalVariableDefinition(name=k, global_variable=v) for k, v in global_variables.items()
+    ]
+
+    command_classes: typing.Dict[str, type] = {}
+    for class_node in source.get_classes():
+        if len(class_node.bases) != 1:
+            continue
+        base = ast_utils.evaluate(class_node.bases[0], namespace)
+        if inspect.isclass(base) and inspect_utils.is_subclass(base, comp.BaseCommand):
+            command_classes[class_node.name] = ast_utils.create_class(
+                source=source,
+                class_node=class_node,
+                base=base,
+                namespace=namespace,
+                constant_method_names=_CONSTANT_METHOD_NAMES,
+            )
+    commands: typing.List[comp.BaseCommand] = [command_class() for command_class in command_classes.values()]
+
+    return _create_definition(
+        module_name=module_name,
+        path=path.resolve(),
+        setting=setting,
+        global_variables=global_variable_definitions,
+        commands=commands,
+    )
+
+
+def _create_definition(
+    module_name: str,
+    path: pathlib.Path,
+    setting: comp.Setting,
+    global_variables: typing.List[GlobalVariableDefinition],
+    commands: typing.List[comp.BaseCommand],
+) -> ScenarioDefinition:
+    if setting.name is None:
+        setting.name = path.stem
+    if setting.workspace is None:
+        setting.workspace = _get_default_workspace(module_name)
+    if setting.category is None:
+        setting.category = _get_default_category(module_name)
+
+    commands = sorted(commands, key=lambda x: int(x.__class__.__name__.replace('Command', '')))
+
+    for index, command in enumerate(commands):
+        if command.__class__.__name__ != f'Command{index}':
+            _err = f"Invalid command name '{command.__class__.__name__}' in '{module_name.split('.')[-1]}'. " \
+                   f"Current name is 'Command{index}'."
+            raise exceptions.ScenarioError(_err)
+
+    definition = ScenarioDefinition(
+        name=setting.name,
+        setting=setting,
+        global_variables=global_variables,
+        commands=commands,
+        path=path,
+    )
+    return definition
+
+
+def _get_default_workspace(module_name: str) -> str:
+    workspace = module_name.split('.')[2]
     return workspace
 
 
-def _get_default_category(module: types.ModuleType) -> str:
-    names = module.__name__.split('.')[4:-1]
+def _get_default_category(module_name: str) -> str:
+    names = module_name.split('.')[4:-1]
     category = ".".join(names)
     return category
 
@@ -120,11 +237,13 @@ class ScenarioDefinition(object):
         setting: comp.Setting,
         global_variables: typing.List[GlobalVariableDefinition],
         commands: typing.List[comp.BaseCommand],
+        path: pathlib.Path,
     ) -> None:
         self.name = name
         self.setting = setting
         self.global_variables = global_variables
         self.commands = commands
+        self.path = path
 
 
 class GlobalVariableDefinition(object):
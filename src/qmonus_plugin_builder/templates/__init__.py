@@ -89,13 +89,46 @@ from . import module_context as context, atom, model
 """
 
 
-ATOM_TEMPLATE = """##########################
+LAZY_MODULE_TEMPLATE = """##########################
 # Automatically generated
 ##########################
 
-{% for import_stmt in import_stmts %}
-{{ import_stmt }}
-{% endfor %}
+from __future__ import annotations
+import typing
+
+if typing.TYPE_CHECKING:
+    {% for member in members %}
+    from {{ member.relative_module }} import {{ member.name }} as {{ member.name }}
+    {% else %}
+    pass
+    {% endfor %}
+
+__all__ = [
+    {% for member in members %}
+    '{{ member.name }}',
+    {% endfor %}
+]
+
+# Module and relative import level of each name, imported on first access (PEP 562)
+_MODULES: typing.Dict[str, typing.Tuple[str, int]] = {
+    {% for member in members %}
+    '{{ member.name }}': ('{{ member.module }}', {{ member.level }}),
+    {% endfor %}
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _MODULES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    module_name, level = _MODULES[name]
+    # Same as 'from {module_name} import {name}', so that import hooks see the dependency
+    value = getattr(__import__(module_name, globals(), None, [name], level), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> typing.List[str]:
+    return sorted({*globals(), *_MODULES})
 
 """
 
@@ -149,7 +182,7 @@ MODULE_TEMPLATE = """##########################
 """
 
 
-CLASSES_INITIAL_TEMPLATE = """##########################
+CLASS_INITIAL_TEMPLATE = """##########################
 # Automatically generated
 ##########################
 
@@ -157,17 +190,13 @@ from __future__ import annotations
 from qmonus_plugin_builder.class_libs import component as comp
 
 
-{% for class_name in class_names %}
 class {{ class_name }}(comp.BaseClass):
     pass
 
-
-{% endfor %}
-
 """
 
 
-CLASSES_FULL_TEMPLATE = """##########################
+CLASS_FULL_TEMPLATE = """##########################
 # Automatically generated
 ##########################
 
@@ -175,14 +204,24 @@ from __future__ import annotations
 import typing
 from qmonus_plugin_builder.class_libs import component as comp
 from qmonus_sdk_plugins.libs.class_globals import *
+{% if class_definition.referenced_class_names|length > 0 %}
+
+if typing.TYPE_CHECKING:
+    {% for class_name in class_definition.referenced_class_names %}
+    from .{{ class_name }} import {{ class_name }}
+    {% endfor %}
+{% endif %}
 
 
-{% for class_definition in class_definitions %}
 class {{ class_definition.name }}(
     {% for extend in class_definition.extends %}
     {{ extend.module }},
     {% endfor %}
 ):
+    {% if class_definition.slots is not none %}
+    __slots__ = {{ class_definition.slots }}
+
+    {% endif %}
     def __init__(
         self,
         {% for variable in class_definition.variables_without_defaults %}
@@ -203,6 +242,28 @@ class {{ class_definition.name }}(
         {% endfor %}
         super().__init__(**kwargs)
 
+    def __dictionary__(self) -> dict:
+        # Automatically Generated
+
+        dictionary: dict = {}
+        {% for field in class_definition.dictionary_fields %}
+        value = getattr(self, '{{ field.name }}', None)
+        if value is not None:
+            {% if field.kind == 'scalar' %}
+            dictionary['{{ field.name }}'] = value
+            {% elif field.kind == 'class' %}
+            dictionary['{{ field.name }}'] = value.dictionary if isinstance(value, comp.BaseClass) else value
+            {% elif field.kind == 'array_of_class' %}
+            if type(value) is list:
+                dictionary['{{ field.name }}'] = [v.dictionary if isinstance(v, comp.BaseClass) else v for v in value]
+            else:
+                dictionary['{{ field.name }}'] = comp.to_dictionary_value(value)
+            {% else %}
+            dictionary['{{ field.name }}'] = comp.to_dictionary_value(value)
+            {% endif %}
+        {% endfor %}
+        return dictionary
+
     {% if class_definition.variables_without_defaults|length > 0 or class_definition.variables_with_defaults|length > 0 %}
     @classmethod
     async def load(
@@ -235,8 +296,4 @@ class {{ class_definition.name }}(
         raise NotImplementedError
     {% endif %}
 
-
-{% endfor %}
-
-
 """
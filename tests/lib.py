@@ -1,4 +1,10 @@
 import pathlib
+import typing
+
+import yaml
+
+# Registers the representer of str used by yaml_utils.dump
+from qmonus_plugin_builder.libs import yaml_utils
 
 
 def compare_dir(a: pathlib.Path, b: pathlib.Path, glob_pattern: str) -> bool:
@@ -14,3 +20,11 @@ def compare_dir(a: pathlib.Path, b: pathlib.Path, glob_pattern: str) -> bool:
         b_map[str(file.relative_to(b))] = file.read_text()
 
     return a_map == b_map
+
+
+def dump_python(obj: typing.Any) -> str:
+    """Dump obj with the pure python emitter like yaml_utils.dump without libyaml"""
+    yml: str = yaml.safe_dump(
+        obj, indent=2, default_flow_style=False,
+        allow_unicode=True, encoding='utf-8').decode('utf-8')
+    return yml
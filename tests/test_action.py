@@ -1,4 +1,7 @@
 import pathlib
+import shutil
+
+import pytest
 
 import qmonus_plugin_builder
 from . import lib
@@ -9,3 +12,74 @@ def test_dump_action_creates_correct_yml_files(project_path: pathlib.Path, yaml_
     qmonus_plugin_builder.dump(project_path=str(project_path), yaml_path=str(yaml_path))
     init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml')
     assert lib.compare_dir(init_yaml_path, yaml_path, glob_pattern='**/*.yml')
+
+
+def test_dump_to_mapping_returns_yml_files_without_writing_them(project_path: pathlib.Path):
+    qmonus_plugin_builder.init(project_path=str(project_path))
+    libs_path = project_path.joinpath('qmonus_sdk_plugins/libs')
+    shutil.rmtree(libs_path)
+    with pytest.raises(ValueError):
+        qmonus_plugin_builder.dump_to_mapping(project_path=str(project_path), static=True, update_libs=False)
+
+    init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml').resolve()
+    expected = {
+        file.relative_to(init_yaml_path).as_posix(): file.read_bytes() for file in init_yaml_path.glob('**/*.yml')
+    }
+    mapping = qmonus_plugin_builder.dump_to_mapping(project_path=str(project_path), static=True)
+    assert mapping == expected
+    assert libs_path.joinpath('classes.py').is_file()
+
+    # libs is not updated
+    libs_path.joinpath('classes.py').write_text(libs_path.joinpath('classes.py').read_text() + '# edited\n')
+    files = qmonus_plugin_builder.iter_dump(project_path=str(project_path), static=True, update_libs=False)
+    assert list(files) == list(mapping.items())
+    assert libs_path.joinpath('classes.py').read_text().endswith('# edited\n')
+
+
+def _class_text(name: str, extends: str, field: str) -> str:
+    return f'''from __future__ import annotations
+from qmonus_plugin_builder.class_libs import component as comp
+from qmonus_sdk_plugins.libs import classes
+from qmonus_sdk_plugins.libs.class_globals import *
+
+
+class {name}(classes.{name}):
+    def __setting__(self):
+        return comp.Setting(
+            local_fields=[comp.LocalField(name='{field}', type=comp.STRING()), comp.LocalField(name='name', type=comp.STRING())],
+            extends=[{extends}],
+        )
+'''
+
+
+def test_update_action_generates_slots(project_path: pathlib.Path):
+    qmonus_plugin_builder.init(project_path=str(project_path))
+    classes_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default/classes/default')
+    classes_path.joinpath('Admin.py').write_text(_class_text('Admin', 'atom.User', 'role'))
+    classes_path.joinpath('Guest.py').write_text(_class_text('Guest', 'atom.User', 'expires'))
+    classes_path.joinpath('Member.py').write_text(_class_text('Member', 'atom.Admin, atom.Guest', 'team'))
+    classes_path.joinpath('Owner.py').write_text(_class_text('Owner', 'atom.Member', 'since'))
+
+    qmonus_plugin_builder.update(project_path=str(project_path), static=True, slots=True)
+    class_modules_path = project_path.joinpath('qmonus_sdk_plugins/libs/_classes')
+    slots = {
+        path.stem: [line.strip() for line in path.read_text().splitlines() if '__slots__' in line]
+        for path in class_modules_path.glob('*.py')
+    }
+    # Member has two bases, so the classes it extends keep __dict__ and 'name' of User is not in slots
+    assert slots == {
+        '__init__': [],
+        'Admin': [],
+        'Guest': [],
+        'Member': ["__slots__ = ('team', 'name')"],
+        'Owner': ["__slots__ = ('since',)"],
+        'User': [],
+    }
+
+    # The previous choice is kept
+    qmonus_plugin_builder.update(project_path=str(project_path), static=True)
+    assert "__slots__ = ('since',)" in class_modules_path.joinpath('Owner.py').read_text()
+
+    qmonus_plugin_builder.update(project_path=str(project_path), static=True, slots=False)
+    for path in class_modules_path.glob('*.py'):
+        assert '__slots__' not in path.read_text()
@@ -0,0 +1,49 @@
+import pathlib
+import subprocess
+import sys
+
+from benchmarks import decorators, generator, slots
+from qmonus_plugin_builder.libs import inspect_utils
+
+from . import lib
+
+
+def test_generated_project_can_be_dumped(project_path: pathlib.Path, yaml_path: pathlib.Path, tmp_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    parameters = generator.ProjectParameters(
+        workspaces=2, classes=4, inheritance_depth=1, scenarios=3, commands=3, daemons=2, modules=2)
+    generator.generate(project_path, parameters)
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    # 4 plugins created by init
+    assert len(list(yaml_path.glob('**/*.yml'))) == 4 + 2 * (4 + 3 + 2 + 2)
+
+    static_yaml_path = tmp_path.joinpath('static_yaml')
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--static', str(project_path), str(static_yaml_path)]
+    )
+    assert process.returncode == 0
+    assert lib.compare_dir(yaml_path, static_yaml_path, glob_pattern='**/*.yml')
+
+
+def test_decorators_benchmark_works():
+    results = decorators.run(lines=10, decorators=[2], repeat=1)
+    assert [(result['decorators'], result['coroutine']) for result in results] == [(2, False), (2, True)]
+    code = decorators.generate_method(lines=10, decorators=2, is_coroutine=True)
+    assert inspect_utils.remove_decorators(code).startswith('async def method(')
+
+
+def test_slots_benchmark_works():
+    parameters = generator.ProjectParameters(
+        workspaces=1, classes=2, inheritance_depth=1, local_fields=4, ref_fields=1, scenarios=0, daemons=0, modules=0)
+    results = slots.run(parameters, instances=100)
+    assert results['dict']['has_dict'] is True
+    assert results['slots']['has_dict'] is False
+    assert results['slots']['bytes_per_atom'] < results['dict']['bytes_per_atom']
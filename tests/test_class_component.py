@@ -0,0 +1,67 @@
+from qmonus_plugin_builder.class_libs import component as comp
+
+setting_calls = []
+
+
+class Base(comp.BaseClass):
+    def __init__(self, id=None, name=None, **kwargs):
+        self.id = id
+        self.name = name
+        super().__init__(**kwargs)
+
+
+class Item(Base):
+    def __setting__(self):
+        setting_calls.append('Item')
+        return comp.Setting(
+            identifier=comp.Identifier(name='id', type=comp.STRING()),
+            local_fields=[comp.LocalField(name='name', type=comp.STRING())],
+        )
+
+
+class Box(Item):
+    def __init__(self, item=None, items=None, **kwargs):
+        self.item = item
+        self.items = items
+        super().__init__(**kwargs)
+
+    def __setting__(self):
+        setting_calls.append('Box')
+        return comp.Setting(
+            identifier=comp.Identifier(name='key', type=comp.STRING()),
+            local_fields=[
+                comp.LocalField(name='item', type=comp.CLASS(Item)),
+                comp.LocalField(name='items', type=comp.ARRAY_OF_CLASS(Item)),
+            ],
+            extends=[Item],
+        )
+
+
+def test_field_layout_is_cached_per_class():
+    comp.invalidate_field_layouts()
+    setting_calls.clear()
+
+    # Base has no '__setting__' and cannot be instantiated
+    assert Box.fieldnames() == ['instance', 'xid', 'xname', 'id', 'name', 'key', 'item', 'items']
+    assert Item.fieldnames() == ['instance', 'xid', 'xname', 'id', 'name']
+    layout = Box.__field_layout__()
+    assert isinstance(layout.types['items'], comp.ARRAY_OF_CLASS)
+    assert layout.types['items'].cls is Item
+
+    item = Item(id='i1', name='item', instance='a')
+    box = Box(id='b1', item=item, items=[item, 'raw'], instance='b')
+    assert box.to_key_field() == 'key'
+    assert item.to_key_field() == 'id'
+    for _ in range(3):
+        assert box.dictionary == {
+            'instance': 'b',
+            'id': 'b1',
+            'item': {'instance': 'a', 'id': 'i1', 'name': 'item'},
+            'items': [{'instance': 'a', 'id': 'i1', 'name': 'item'}, 'raw'],
+        }
+    assert setting_calls == ['Item', 'Box', 'Item']
+
+    comp.invalidate_field_layouts()
+    assert Box.fieldnames() == ['instance', 'xid', 'xname', 'id', 'name', 'key', 'item', 'items']
+    assert Box.__field_layout__() is not layout
+    assert setting_calls == ['Item', 'Box', 'Item', 'Item', 'Box']
@@ -1,6 +1,18 @@
+import hashlib
+import json
 import sys
 import pathlib
 import subprocess
+import tarfile
+import time
+import zipfile
+
+import pytest
+import yaml
+
+import qmonus_plugin_builder
+
+from . import lib
 
 
 def test_init_action_works(project_path: pathlib.Path):
@@ -32,3 +44,508 @@ def test_dump_action_works(project_path: pathlib.Path, yaml_path: pathlib.Path):
         [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)]
     )
     assert process.returncode == 0
+
+
+def test_incremental_dump_action_dumps_only_changed_plugins(project_path: pathlib.Path, yaml_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--incremental', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml')
+    assert lib.compare_dir(init_yaml_path, yaml_path, glob_pattern='**/*.yml')
+    assert yaml_path.joinpath('.qmonus_build/manifest').is_file()
+
+    # Change a daemon and remove the module
+    plugins_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default')
+    log_path = plugins_path.joinpath('daemons/default/Log.py')
+    log_path.write_text(log_path.read_text().replace("'executed!!'", "'changed!!'"))
+    plugins_path.joinpath('modules/default/constants.py').unlink()
+    scenario_yaml_path = yaml_path.joinpath('default/scenarios/CreateUser.yml')
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--incremental', str(project_path), str(yaml_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 0
+    assert "'changed!!'" in yaml_path.joinpath('default/daemons/Log.yml').read_text()
+    assert not yaml_path.joinpath('default/modules/constants.yml').exists()
+    # CreateUser refers to 'constants' and is dumped again
+    assert f"Creating '{str(scenario_yaml_path.resolve())}'" in process.stderr
+    user_mtime = yaml_path.joinpath('default/classes/User.yml').stat().st_mtime_ns
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--incremental', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    assert yaml_path.joinpath('default/classes/User.yml').stat().st_mtime_ns == user_mtime
+
+
+def test_incremental_dump_action_tracks_plugins_with_the_same_name_in_each_workspace(
+    project_path: pathlib.Path, yaml_path: pathlib.Path
+):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+    # Another workspace has a module named like the class 'User'
+    plugins_path = project_path.joinpath('qmonus_sdk_plugins/plugins')
+    other_path = plugins_path.joinpath('other/modules/default')
+    other_path.mkdir(parents=True)
+    for path in (other_path.parent.parent, other_path.parent, other_path):
+        path.joinpath('__init__.py').write_text('')
+    other_path.joinpath('User.py').write_text(
+        plugins_path.joinpath('default/modules/default/constants.py').read_text())
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--incremental', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    scenario_yaml_path = yaml_path.joinpath('default/scenarios/CreateUser.yml')
+    assert scenario_yaml_path.is_file()
+
+    user_path = plugins_path.joinpath('default/classes/default/User.py')
+    user_path.write_text(user_path.read_text() + '\n# changed\n')
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--incremental', str(project_path), str(yaml_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 0
+    # CreateUser refers to 'User', which may be either of them
+    assert f"Creating '{str(scenario_yaml_path.resolve())}'" in process.stderr
+
+
+def test_parallel_dump_action_creates_the_same_yml_files(project_path: pathlib.Path, yaml_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--jobs', '2', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml')
+    assert lib.compare_dir(init_yaml_path, yaml_path, glob_pattern='**/*.yml')
+
+
+def test_static_dump_action_creates_the_same_yml_files_without_importing(
+    project_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    # Module level code leaves a marker file if the module is imported
+    plugins_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default')
+    scenario_path = plugins_path.joinpath('scenarios/default/CreateUser.py')
+    scenario_path.write_text(
+        scenario_path.read_text() + "\nimport pathlib\npathlib.Path(__file__).with_name('imported').touch()\n")
+    # A setting which cannot be evaluated statically falls back to import
+    daemon_path = plugins_path.joinpath('daemons/default/Log.py')
+    daemon_path.write_text(
+        daemon_path.read_text().replace('interval=60', 'interval=INTERVAL')
+        + "\nINTERVAL = 60\nimport pathlib\npathlib.Path(__file__).with_name('imported').touch()\n")
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', '--static', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml')
+    assert lib.compare_dir(init_yaml_path, yaml_path, glob_pattern='**/*.yml')
+    assert not plugins_path.joinpath('scenarios/default/imported').exists()
+    assert plugins_path.joinpath('daemons/default/imported').exists()
+
+
+def test_dump_action_does_not_rewrite_unchanged_files(project_path: pathlib.Path, yaml_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    libs_path = project_path.joinpath('qmonus_sdk_plugins/libs')
+    atom_mtime = libs_path.joinpath('atom.py').stat().st_mtime_ns
+    user_mtime = yaml_path.joinpath('default/classes/User.yml').stat().st_mtime_ns
+    libs_path.joinpath('stale.py').write_text('')
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 0
+    assert libs_path.joinpath('atom.py').stat().st_mtime_ns == atom_mtime
+    assert yaml_path.joinpath('default/classes/User.yml').stat().st_mtime_ns == user_mtime
+    assert not libs_path.joinpath('stale.py').exists()
+    assert ': 0 written, 4 skipped, 0 deleted' in process.stderr
+
+
+def test_update_action_does_not_rewrite_unchanged_files(project_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)]
+    )
+    assert process.returncode == 0
+    libs_path = project_path.joinpath('qmonus_sdk_plugins/libs')
+    mtimes = {
+        name: libs_path.joinpath(name).stat().st_mtime_ns for name in ('classes.py', 'model.py', '_classes/User.py')
+    }
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 0
+    assert {name: libs_path.joinpath(name).stat().st_mtime_ns for name in mtimes} == mtimes
+    assert f"Updated '{str(libs_path.resolve())}': 0 written," in process.stderr
+
+
+def _extending_class_text(name: str, extends: str) -> str:
+    return f'''from __future__ import annotations
+from qmonus_plugin_builder.class_libs import component as comp
+from qmonus_sdk_plugins.libs import classes
+from qmonus_sdk_plugins.libs.class_globals import *
+
+
+class {name}(classes.{name}):
+    def __setting__(self):
+        return comp.Setting(
+            local_fields=[comp.LocalField(name='{name.lower()}', type=comp.STRING())],
+            extends=[{extends}],
+        )
+'''
+
+
+def test_update_action_recreates_modules_of_classes_extending_removed_classes(project_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+    classes_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default/classes/default')
+    classes_path.joinpath('Base.py').write_text(_extending_class_text('Base', 'atom.User'))
+    classes_path.joinpath('Child.py').write_text(_extending_class_text('Child', 'atom.Base'))
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    # The generated module of Child still extends Base
+    classes_path.joinpath('Base.py').unlink()
+    classes_path.joinpath('Child.py').write_text(_extending_class_text('Child', 'atom.User'))
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)]
+    )
+    assert process.returncode == 0
+    class_modules_path = project_path.joinpath('qmonus_sdk_plugins/libs/_classes')
+    assert not class_modules_path.joinpath('Base.py').exists()
+    assert 'atom.User' in class_modules_path.joinpath('Child.py').read_text()
+
+
+def test_static_dump_action_fails_for_unknown_parent_classes(project_path: pathlib.Path, yaml_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+    classes_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default/classes/default')
+    classes_path.joinpath('Child.py').write_text(_extending_class_text('Child', 'atom.Usr'))
+
+    # Falls back to import like a normal dump
+    for options in ([], ['--static']):
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', *options, str(project_path), str(yaml_path)],
+            capture_output=True,
+            text=True,
+        )
+        assert process.returncode != 0
+        assert "has no attribute 'Usr'" in process.stderr
+        assert not yaml_path.joinpath('default/classes/Child.yml').exists()
+
+
+def test_profile_option_writes_chrome_trace(project_path: pathlib.Path, yaml_path: pathlib.Path, tmp_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    trace_path = tmp_path.joinpath('trace.json')
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', '--profile', str(trace_path),
+         'dump', str(project_path), str(yaml_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 0
+    events = json.loads(trace_path.read_text())['traceEvents']
+    spans = [event for event in events if event['ph'] == 'X']
+    names = {event['name'] for event in spans}
+    assert {'dump', 'update', 'discovery', 'import', 'parse', 'convert', 'yaml', 'write'} <= names
+    assert {event['args']['plugin'] for event in spans if event['name'] == 'convert'} \
+        == {'User', 'constants', 'CreateUser', 'Log'}
+    assert all(event['dur'] >= 0 and 'tracemalloc_peak_kib' in event['args'] for event in spans)
+    assert 'parse' in process.stderr
+
+
+def test_dump_action_bundles_yml_files(project_path: pathlib.Path, tmp_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml').resolve()
+    expected = {
+        file.relative_to(init_yaml_path).as_posix(): file.read_bytes() for file in init_yaml_path.glob('**/*.yml')
+    }
+
+    for name, options in [('out.tar.gz', []), ('out.zip', ['--jobs', '2']), ('out.yaml', [])]:
+        bundle_path = tmp_path.joinpath(name)
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', *options,
+             '--bundle', str(bundle_path), str(project_path)]
+        )
+        assert process.returncode == 0
+
+        if name.endswith('.tar.gz'):
+            with tarfile.open(bundle_path) as tar:
+                contents = {member.name: tar.extractfile(member).read() for member in tar.getmembers()}
+        elif name.endswith('.zip'):
+            with zipfile.ZipFile(bundle_path) as zip_:
+                contents = {info.filename: zip_.read(info) for info in zip_.infolist()}
+        else:
+            stream = bundle_path.read_bytes()
+            index_header = b'--- # .qmonus_build/index.json\n'
+            index = json.loads(stream[stream.rindex(index_header) + len(index_header):])
+            contents = {
+                entry['path']: stream[entry['offset']:entry['offset'] + entry['size']] for entry in index['entries']
+            }
+            contents['.qmonus_build/index.json'] = json.dumps(index).encode('utf-8')
+            assert len(list(yaml.safe_load_all(stream))) == len(expected) + 1
+
+        index = json.loads(contents.pop('.qmonus_build/index.json'))
+        assert contents == expected
+        assert {entry['path']: entry['sha256'] for entry in index['entries']} == {
+            path: hashlib.sha256(content).hexdigest() for path, content in expected.items()
+        }
+        assert [path.name for path in tmp_path.iterdir() if path.name.startswith('.')] == []
+
+    # The same files are bundled into the same bytes
+    for name in ('out.tar.gz', 'out.zip'):
+        bundle = tmp_path.joinpath(name).read_bytes()
+        time.sleep(1)
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'dump',
+             '--bundle', str(tmp_path.joinpath(name)), str(project_path)]
+        )
+        assert process.returncode == 0
+        assert tmp_path.joinpath(name).read_bytes() == bundle
+
+    # Classes are bundled after the classes they extend with --jobs too
+    classes_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default/classes/default')
+    classes_path.joinpath('Aa.py').write_text(_extending_class_text('Aa', 'atom.Zz'))
+    classes_path.joinpath('Zz.py').write_text(_extending_class_text('Zz', ''))
+    bundles = []
+    for options in ([], ['--jobs', '2']):
+        bundle_path = tmp_path.joinpath(f'classes{len(bundles)}.yaml')
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', *options,
+             '--bundle', str(bundle_path), str(project_path)]
+        )
+        assert process.returncode == 0
+        bundles.append(bundle_path.read_bytes())
+    assert bundles[0] == bundles[1]
+    assert bundles[0].index(b'--- # default/classes/Zz.yml') < bundles[0].index(b'--- # default/classes/Aa.yml')
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump',
+         '--bundle', str(tmp_path.joinpath('out.rar')), str(project_path)]
+    )
+    assert process.returncode != 0
+    assert not tmp_path.joinpath('out.rar').exists()
+
+
+@pytest.mark.parametrize('port', [None, 0])
+def test_serve_action_handles_forwarded_commands(project_path: pathlib.Path, yaml_path: pathlib.Path, port):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    info_path = project_path.joinpath('.qmonus_build/server.json')
+    port_args = [] if port is None else ['--port', str(port)]
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'serve', *port_args, str(project_path)]
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not info_path.is_file():
+            assert time.monotonic() < deadline and server.poll() is None
+            time.sleep(0.05)
+
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)],
+            capture_output=True,
+            text=True,
+        )
+        assert process.returncode == 0
+        assert 'Forwarded' in process.stderr
+        init_yaml_path = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml')
+        assert lib.compare_dir(init_yaml_path, yaml_path, glob_pattern='**/*.yml')
+
+        # The log is filtered by the log level of the client
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', '--log-level', 'error', 'dump',
+             str(project_path), str(yaml_path)],
+            capture_output=True,
+            text=True,
+        )
+        assert process.returncode == 0
+        assert process.stderr == ''
+
+        # Changed modules are imported again
+        log_path = project_path.joinpath('qmonus_sdk_plugins/plugins/default/daemons/default/Log.py')
+        log_path.write_text(log_path.read_text().replace("'executed!!'", "'changed!!'"))
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)],
+            capture_output=True,
+            text=True,
+        )
+        assert process.returncode == 0
+        assert "'changed!!'" in yaml_path.joinpath('default/daemons/Log.yml').read_text()
+
+        # Errors are returned to the client
+        log_path.write_text(log_path.read_text().replace('class Command0', 'class Command1'))
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'check', str(project_path)],
+            capture_output=True,
+            text=True,
+        )
+        assert process.returncode == 1
+        assert "Invalid command name 'Command1'" in process.stderr
+        assert 'Forwarded' in process.stderr
+
+        # Requests rejected by the server are not run locally
+        info_text = info_path.read_text()
+        info_path.write_text(json.dumps({**json.loads(info_text), 'token': 'invalid'}))
+        process = subprocess.run(
+            [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)],
+            capture_output=True,
+            text=True,
+        )
+        info_path.write_text(info_text)
+        assert process.returncode == 1
+        assert 'Invalid token' in process.stderr
+        assert 'running locally' not in process.stderr
+    finally:
+        server.terminate()
+        assert server.wait(timeout=30) == 0
+    assert not info_path.exists()
+    assert not project_path.joinpath('.qmonus_build/server.sock').exists()
+
+    # The stale server information is ignored
+    info_path.write_text(json.dumps({'version': qmonus_plugin_builder.__version__, 'pid': 0, 'token': '', 'port': 1}))
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 0
+    assert 'Forwarded' not in process.stderr
+
+
+def test_dump_action_keeps_slots_of_update(project_path: pathlib.Path, yaml_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', '--slots', str(project_path)]
+    )
+    assert process.returncode == 0
+    user_path = project_path.joinpath('qmonus_sdk_plugins/libs/_classes/User.py')
+    assert '__slots__' in user_path.read_text()
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'dump', str(project_path), str(yaml_path)]
+    )
+    assert process.returncode == 0
+    assert '__slots__' in user_path.read_text()
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', '--no-slots', str(project_path)]
+    )
+    assert process.returncode == 0
+    assert '__slots__' not in user_path.read_text()
+
+
+USER_GROUP_CLASS_TEXT = '''from __future__ import annotations
+from qmonus_plugin_builder.class_libs import component as comp
+from qmonus_sdk_plugins.libs import classes
+from qmonus_sdk_plugins.libs.class_globals import *
+
+
+class UserGroup(classes.UserGroup):
+    def __setting__(self):
+        return comp.Setting(
+            identifier=comp.Identifier(name='key', type=comp.STRING()),
+            local_fields=[
+                comp.LocalField(name='owner', type=comp.CLASS(atom.User)),
+                comp.LocalField(name='users', type=comp.ARRAY_OF_CLASS(atom.User)),
+                comp.LocalField(name='metadata', type=comp.OBJECT()),
+            ],
+        )
+'''
+
+CHECK_DICTIONARY_SCRIPT = '''
+import sys
+
+from qmonus_plugin_builder.class_libs import component as comp
+from qmonus_sdk_plugins.libs import atom, classes
+
+# Classes are imported on first access
+assert 'qmonus_sdk_plugins.libs._classes.UserGroup' not in sys.modules
+assert 'UserGroup' in dir(atom) and 'UserGroup' in classes.__all__
+assert '__dictionary__' in vars(classes.UserGroup)
+assert classes.UserGroup is sys.modules['qmonus_sdk_plugins.libs._classes.UserGroup'].UserGroup
+assert 'qmonus_sdk_plugins.plugins.default.classes.default.UserGroup' not in sys.modules
+assert issubclass(atom.UserGroup, classes.UserGroup)
+user = atom.User(name='n', description='d', type='t', id='u1')
+group = atom.UserGroup(key='k', owner=user, users=[user, 'u2'], metadata={'a': [user]})
+assert group.dictionary == comp.BaseClass.__dictionary__(group), group.dictionary
+assert list(group.dictionary) == [name for name in atom.UserGroup.fieldnames() if name != 'xid' and name != 'xname']
+assert group.dictionary['owner'] == user.dictionary
+# Unset fields are skipped like None
+del group.owner
+assert 'owner' not in group.dictionary
+assert group.dictionary == comp.BaseClass.__dictionary__(group)
+'''
+
+
+def test_update_action_generates_dictionary_methods(project_path: pathlib.Path):
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'init', str(project_path)]
+    )
+    assert process.returncode == 0
+    project_path.joinpath('qmonus_sdk_plugins/plugins/default/classes/default/UserGroup.py').write_text(USER_GROUP_CLASS_TEXT)
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'qmonus_plugin_builder', 'update', str(project_path)]
+    )
+    assert process.returncode == 0
+
+    process = subprocess.run([sys.executable, '-c', CHECK_DICTIONARY_SCRIPT], cwd=str(project_path))
+    assert process.returncode == 0
@@ -0,0 +1,47 @@
+from qmonus_plugin_builder.class_libs import converter as class_converter
+from qmonus_plugin_builder.scenario_libs import converter as scenario_converter
+
+
+def test_class_yaml_to_dict_works():
+    class_yaml = class_converter.ClassYAML(
+        category='category', name='User', persistence=True, abstract=False, extends=('Base',),
+        api_generation=True, api_auto_response=None, scope=None, version=2, created_at=None, update='2024',
+    )
+    class_yaml.add_local_field(
+        field_name='name', field_type='string', field_persistence=True, field_nullable=False,
+        field_immutable=False, field_unique=False, field_default=None, field_enum=None, field_format=None,
+        field_metadata={'a': (1, 2)}, field_alias=None, field_fsm=None, field_dbtype=None, field_length=10,
+    )
+    class_yaml.add_instance_method(
+        method_body='pass', propagation_mode=True, topdown=True, auto_rollback=False,
+        multiplexable_number=1, field_order='ascend', timeout=None,
+    )
+
+    dict_ = class_yaml.to_dict()
+    assert list(dict_) == [
+        'category', 'name', 'persistence', 'abstract', 'extends', 'api_generation', 'version', 'update',
+        'attributes', 'methods',
+    ]
+    assert dict_['extends'] == ['Base']
+    assert dict_['attributes'] == {'local_fields': [{
+        'field_name': 'name', 'field_type': 'string', 'field_persistence': True, 'field_nullable': False,
+        'field_immutable': False, 'field_unique': False, 'field_metadata': {'a': [1, 2]}, 'field_length': 10,
+    }]}
+    assert list(dict_['methods']['instance_methods'][0]) == [
+        'method_body', 'propagation_mode', 'topdown', 'auto_rollback', 'multiplexable_number', 'field_order',
+    ]
+
+
+def test_transaction_yaml_to_dict_works():
+    kwargs = dict(
+        xdomain='domain', xtype='type', xname='name', xname_use_counter=True, auto_rollback=True,
+        auto_begin=True, auto_response=True, lock_keys=['key'], retry_count=3, retry_interval=1.0,
+        timeout=None, crash_recovery_policy=None, async_=False,
+    )
+    assert scenario_converter.TransactionYAML(enable=False, **kwargs).to_dict() == {
+        'enable': False, 'xname': 'name', 'async': False,
+    }
+    assert list(scenario_converter.TransactionYAML(enable=True, **kwargs).to_dict()) == [
+        'enable', 'xname', 'async', 'xname_use_counter', 'xdomain', 'xtype', 'auto_rollback', 'auto_begin',
+        'auto_response', 'lock',
+    ]
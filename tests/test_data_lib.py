@@ -0,0 +1,108 @@
+import dataclasses
+import enum
+import sys
+
+import pytest
+
+from qmonus_plugin_builder.libs import data_lib
+
+
+class Color(str, enum.Enum):
+    RED = 'red'
+
+
+class Data(object):
+    def __init__(self) -> None:
+        self.name = 'name'
+        self.color = Color.RED
+        self.items = ({'a': 1}, [None, 2.5])
+        setattr(self, 'async', True)
+
+
+class Slotted(object):
+    __slots__ = ('name', 'unset', '__private')
+
+    def __init__(self) -> None:
+        self.name = 'slotted'
+        self.__private = [1]
+
+
+class SlottedChild(Slotted):
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.value = Data()
+
+
+@dataclasses.dataclass
+class DataclassData:
+    slotted: SlottedChild
+    values: dict = dataclasses.field(default_factory=dict)
+
+
+def test_to_primitive_works():
+    data = {
+        'data': Data(),
+        'dataclass': DataclassData(slotted=SlottedChild(), values={1: b'bytes'}),
+        'set': {1},
+    }
+    expected_data = {'name': 'name', 'color': Color.RED, 'items': [{'a': 1}, [None, 2.5]], 'async': True}
+    expected = {
+        'data': expected_data,
+        'dataclass': {
+            'slotted': {'name': 'slotted', '_Slotted__private': [1], 'value': expected_data},
+            'values': {1: "b'bytes'"},
+        },
+        'set': '{1}',
+    }
+    assert data_lib.to_primitive(data) == expected
+    assert data_lib.to_primitive('text') == 'text'
+
+
+@dataclasses.dataclass(slots=True)
+class SlottedDataclassData:
+    name: str
+    values: list
+
+
+def test_to_primitive_works_with_dataclasses():
+    data = DataclassData(slotted=SlottedChild())
+    # Attributes which are not fields are kept like other objects
+    setattr(data, 'extra', 5)
+    assert data_lib.to_primitive(data)['extra'] == 5
+    assert data_lib.to_primitive(SlottedDataclassData(name='n', values=[1])) == {'name': 'n', 'values': [1]}
+
+
+def test_to_primitive_works_with_deep_data():
+    data: dict = {}
+    leaf = data
+    for _ in range(sys.getrecursionlimit() * 2):
+        leaf['child'] = {}
+        leaf = leaf['child']
+    leaf['value'] = 1
+
+    converted = data_lib.to_primitive(data)
+    while 'child' in converted:
+        converted = converted['child']
+    assert converted == {'value': 1}
+
+
+def test_to_primitive_works_with_memo():
+    schema = {'type': 'object', 'properties': {'name': {'type': 'string'}}}
+    data = [Data(), {'a': schema, 'b': schema}]
+
+    converted = data_lib.to_primitive(data)
+    assert converted[1]['a'] is not converted[1]['b']
+
+    converted_with_memo = data_lib.to_primitive(data, memo=True)
+    assert converted_with_memo == converted
+    assert converted_with_memo[1]['a'] is converted_with_memo[1]['b']
+
+
+def test_to_primitive_detects_circular_references():
+    data: list = [{}]
+    data[0]['data'] = data
+    for memo in (False, True):
+        with pytest.raises(ValueError):
+            data_lib.to_primitive(data, memo=memo)
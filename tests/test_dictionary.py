@@ -0,0 +1,78 @@
+import dataclasses
+import json
+
+from qmonus_plugin_builder.libs import dictionary
+from qmonus_plugin_builder.scenario_libs.component import Spec
+
+
+def _to_dict_by_each_rule(spec: Spec, empty_the_value_of_none: bool = True) -> dict:
+    # Former implementation of Spec.to_dict()
+    dict_ = dictionary.rename_now_key_to_new_key(dataclasses.asdict(spec), now_key='dollar_sign_schema', new_key='$schema')
+    dict_ = dictionary.enum_to_value(dict_)
+    if empty_the_value_of_none:
+        dict_ = dictionary.empty_the_select_value(dict_, select_value=None)
+    return dict_
+
+
+def test_transform_works_like_applying_each_rule():
+    Schema = Spec.Request.PropertieAttributeSchema
+    specs = [
+        Spec(),
+        Spec(request=None, response=None),
+        Spec(
+            request=Spec.Request(
+                headers=Spec.Request.Headers(
+                    properties={
+                        'Content-Type': Schema(type=Schema.Type.STRING, default='application/json'),
+                    },
+                    dollar_sign_schema='http://json-schema.org/draft-04/schema#',
+                ),
+                params=Spec.Request.Params(
+                    properties={
+                        'ids': Schema(
+                            type=Schema.Type.ARRAY,
+                            items={'type': Schema.Type.INT, 'dollar_sign_schema': None, 'format': None},
+                        ),
+                    },
+                ),
+                resources=Spec.Request.Resources(
+                    properties={
+                        'name': Schema(
+                            type=Schema.Type.STRING,
+                            example=[{'a': None, 'b': Schema.Type.STRING}, (None, 1)],
+                            default={'dollar_sign_schema': {'c': None}, '$schema': 'x', 'd': [None]},
+                        ),
+                    },
+                ),
+            ),
+            response=Spec.Response(normal=Spec.Response.Normal(codes=[200, 201])),
+        ),
+    ]
+
+    for spec in specs:
+        for empty_the_value_of_none in (True, False):
+            expected = _to_dict_by_each_rule(spec, empty_the_value_of_none=empty_the_value_of_none)
+            actual = spec.to_dict(empty_the_value_of_none=empty_the_value_of_none)
+            assert actual == expected
+            # Key order is kept too
+            assert json.dumps(actual, default=repr) == json.dumps(expected, default=repr)
+
+            rules = [
+                dictionary.rename_now_key_to_new_key_rule(now_key='dollar_sign_schema', new_key='$schema'),
+                dictionary.enum_to_value_rule(),
+                dictionary.empty_the_select_value_rule(select_value=None),
+            ]
+            if not empty_the_value_of_none:
+                rules.pop()
+            transformed = dictionary.transform(dictionary.dataclass_to_dict(spec), rules)
+            assert json.dumps(actual, default=repr) == json.dumps(transformed, default=repr)
+
+
+def test_dataclass_to_dict_does_not_share_mutable_values():
+    Schema = Spec.Request.PropertieAttributeSchema
+    schema = Schema(type=Schema.Type.ARRAY, items={'type': 'string'}, example=[1, 2])
+    dict_ = dictionary.dataclass_to_dict(schema)
+    assert dict_ == dataclasses.asdict(schema)
+    assert dict_['items'] is not schema.items
+    assert dict_['example'] is not schema.example
+    assert dict_['type'] is Schema.Type.ARRAY
@@ -0,0 +1,34 @@
+import os
+import pathlib
+
+from qmonus_plugin_builder.libs import file_utils
+
+
+def test_create_file_skips_unchanged_content(tmp_path: pathlib.Path):
+    file_path = tmp_path.joinpath('a/b.txt')
+    stats = file_utils.WriteStats()
+    assert file_utils.create_file(file_path=file_path, data='abc\n', stats=stats)
+    os.chmod(str(file_path), 0o600)
+    mtime = file_path.stat().st_mtime_ns
+
+    assert not file_utils.create_file(file_path=file_path, data='abc\n', stats=stats)
+    assert file_path.stat().st_mtime_ns == mtime
+
+    # Same size, different content
+    assert file_utils.create_file(file_path=file_path, data='abd\n', stats=stats)
+    assert file_path.read_text() == 'abd\n'
+    assert file_path.stat().st_mode & 0o777 == 0o600
+    assert [path.name for path in tmp_path.joinpath('a').iterdir()] == ['b.txt']
+    assert (stats.written, stats.skipped, stats.deleted) == (2, 1, 0)
+
+
+def test_delete_files_in_directory_keeps_excludes(tmp_path: pathlib.Path):
+    tmp_path.joinpath('keep.py').write_text('')
+    tmp_path.joinpath('stale.py').write_text('')
+    tmp_path.joinpath('__pycache__').mkdir()
+    tmp_path.joinpath('__pycache__/stale.pyc').write_text('')
+
+    stats = file_utils.WriteStats()
+    file_utils.delete_files_in_directory(dir_path=tmp_path, excludes=['keep.py'], stats=stats)
+    assert [path.name for path in tmp_path.iterdir()] == ['keep.py']
+    assert stats.deleted == 2
@@ -1,3 +1,4 @@
+import abc
 import inspect
 import textwrap
 import importlib
@@ -223,3 +224,103 @@ def test_get_function_code_works(data_module):
     for test_data in test_data_list:
         code = inspect_utils.get_function_code(**test_data['args'])
         assert code == test_data['expected']
+
+
+EDGE_CASE_MODULE_TEXT = r'''
+import functools
+
+
+def decorator(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+class Outer(object):
+    class Inner(object):
+        def nested(self):
+            return 1
+    # comment between methods
+
+    @decorator
+    def decorated(self, x: dict = {'a': 1}) -> int:
+        return x['a']
+
+    def trailing_comment(self):
+        a = 1
+        # trailing comment
+    # outdented comment
+
+    def annotated(self) -> {'key': 1}:
+        pass
+
+    async def last(self):
+        if True:
+            pass
+        else:
+            return 2'''
+
+
+def test_get_function_code_works_like_getsource(temp_module_path: pathlib.Path):
+    path = temp_module_path.joinpath('edge_case_data.py').resolve()
+    path.write_text(EDGE_CASE_MODULE_TEXT)
+    module = importlib.import_module('edge_case_data')
+    Outer = module.Outer
+    funcs = [
+        Outer.Inner.nested, Outer.decorated, Outer.trailing_comment, Outer.annotated, Outer.last,
+        module.decorator,
+    ]
+
+    for func in funcs:
+        expected = inspect_utils.get_function_body(inspect.getsource(func))
+        assert inspect_utils.get_function_code(func) == expected
+        # cached
+        assert inspect_utils.get_function_code(func) == expected
+
+    # Changed files are indexed again
+    path.write_text(EDGE_CASE_MODULE_TEXT.replace('return x[', 'return  x['))
+    assert inspect_utils.get_function_code(Outer.decorated) == "return  x['a']\n"
+
+
+def test_remove_decorators_works():
+    test_data_list = [
+        {
+            "code": "@classmethod\ndef f(cls):\n    return 1\n",
+            "expected": "def f(cls):\n    return 1\n",
+        },
+        {
+            "code": "@comp.instance_method()\nasync def f(self):\n    return a @ b\n",
+            "expected": "async def f(self):\n    return a @ b\n",
+        },
+        {
+            # Arguments of decorators may start with 'def' or 'async'
+            "code": "@a\n@comp.instance_method(\ndefault=1,\nasync_=2)\n# comment\ndef f(self):\n    pass\n",
+            "expected": "def f(self):\n    pass\n",
+        },
+        {
+            "code": "def f(self):\n    pass\n",
+            "expected": "def f(self):\n    pass\n",
+        },
+    ]
+
+    for test_data in test_data_list:
+        assert inspect_utils.remove_decorators(test_data['code']) == test_data['expected']
+
+
+def test_is_subclass_works_like_issubclass():
+    class Base(abc.ABC):
+        pass
+
+    class Child(Base):
+        pass
+
+    class Other(object):
+        pass
+
+    assert inspect_utils.is_subclass(Child, Base)
+    assert inspect_utils.is_subclass(Base, Base)
+    assert not inspect_utils.is_subclass(Base, Child)
+    assert not inspect_utils.is_subclass(Other, Base)
+    assert inspect_utils.is_instance(Child(), Base)
+    assert not inspect_utils.is_instance(Other(), Base)
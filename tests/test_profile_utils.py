@@ -0,0 +1,51 @@
+import tracemalloc
+
+from qmonus_plugin_builder.libs import profile_utils
+
+
+def test_span_does_nothing_unless_started():
+    assert profile_utils.stop() is None
+    with profile_utils.span('phase'):
+        pass
+    assert profile_utils.stop() is None
+
+
+def test_nested_spans_are_summarized():
+    profile_utils.start()
+    try:
+        with profile_utils.span('outer'):
+            for i in range(3):
+                with profile_utils.span('inner', index=i):
+                    data = [0] * 100000
+                    del data
+    finally:
+        profiler = profile_utils.stop()
+    assert profiler is not None
+
+    inner = [span for span in profiler.spans if span.name == 'inner']
+    outer = [span for span in profiler.spans if span.name == 'outer']
+    assert [span.args['index'] for span in inner] == [0, 1, 2]
+    assert outer[0].child_duration == sum(span.duration for span in inner)
+    # The peak of a child is propagated to its parent
+    assert outer[0].memory_peak >= max(span.memory_peak for span in inner) > 800000
+
+    events = profiler.to_trace_events()
+    assert [event['name'] for event in events if event['ph'] == 'X'] == ['outer', 'inner', 'inner', 'inner']
+    lines = profiler.format_summary().splitlines()
+    assert lines[0].split()[:2] == ['phase', 'count']
+    assert any(line.split()[:2] == ['inner', '3'] for line in lines)
+
+
+def test_stop_keeps_tracing_started_by_the_caller():
+    tracemalloc.start()
+    try:
+        profile_utils.start()
+        profile_utils.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    profile_utils.start()
+    assert tracemalloc.is_tracing()
+    profile_utils.stop()
+    assert not tracemalloc.is_tracing()
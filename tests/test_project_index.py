@@ -0,0 +1,67 @@
+import pathlib
+
+import pytest
+
+import qmonus_plugin_builder
+from qmonus_plugin_builder.libs import project_index
+from qmonus_plugin_builder.class_libs import parser as class_parser
+from qmonus_plugin_builder.daemon_libs import parser as daemon_parser
+from qmonus_plugin_builder.module_libs import parser as module_parser
+from qmonus_plugin_builder.scenario_libs import parser as scenario_parser
+
+
+def test_project_index_classifies_files(project_path: pathlib.Path):
+    qmonus_plugin_builder.init(project_path=str(project_path))
+    module_path = project_path.joinpath('qmonus_sdk_plugins').resolve()
+    # another workspace with a nested category
+    nested_path = module_path.joinpath('plugins/other/scenarios/a/b/Nested.py')
+    nested_path.parent.mkdir(parents=True)
+    nested_path.write_text('')
+    nested_path.parent.joinpath('__init__.py').write_text('')
+
+    index = project_index.ProjectIndex(module_path)
+    plugins_path = module_path.joinpath('plugins')
+    assert index.get_files('classes') == [plugins_path.joinpath('default/classes/default/User.py')]
+    assert index.get_files('modules') == [plugins_path.joinpath('default/modules/default/constants.py')]
+    assert index.get_files('daemons') == [plugins_path.joinpath('default/daemons/default/Log.py')]
+    assert index.get_files('scenarios') == [
+        plugins_path.joinpath('default/scenarios/default/CreateUser.py'),
+        nested_path,
+    ]
+    assert index.get_files('scenarios', workspace='other') == [nested_path]
+    assert index.get_files('classes', workspace='other') == []
+    assert index.get_module_name(nested_path) == 'qmonus_sdk_plugins.plugins.other.scenarios.a.b.Nested'
+
+    with pytest.raises(ValueError):
+        index.get_files('unknown')
+
+
+def test_project_index_raises_error_for_missing_directory(tmp_path: pathlib.Path):
+    index = project_index.ProjectIndex(tmp_path.joinpath('missing'))
+    with pytest.raises(ValueError):
+        index.get_files('classes')
+
+
+def test_iter_definitions_does_not_cache_definitions(project_path: pathlib.Path):
+    qmonus_plugin_builder.init(project_path=str(project_path))
+    module_path = project_path.joinpath('qmonus_sdk_plugins').resolve()
+    classes_path = module_path.joinpath('plugins/default/classes/default')
+    # 'Admin' extends 'User' and must be yielded after it
+    classes_path.joinpath('Admin.py').write_text(
+        classes_path.joinpath('User.py').read_text()
+        .replace('class User(classes.User)', 'class Admin(classes.Admin)')
+        .replace("identifier=comp.Identifier(name='id', type=comp.STRING(), immutable=True),", 'extends=[atom.User],')
+        .replace('from qmonus_sdk_plugins.libs import classes', 'from qmonus_sdk_plugins.libs import atom, classes')
+    )
+
+    for parser in (class_parser, module_parser, scenario_parser, daemon_parser):
+        index = project_index.ProjectIndex(module_path, static=True)
+        names = [definition.name for definition in parser.iter_definitions(module_path, index=index)]
+        assert index.definitions == {}
+        index = project_index.ProjectIndex(module_path, static=True)
+        expected = [definition.name for definition in parser.get_definitions(module_path, index=index)]
+        assert names == expected
+    assert expected == ['Log']
+
+    index = project_index.ProjectIndex(module_path, static=True)
+    assert [definition.name for definition in class_parser.iter_definitions(module_path, index=index)] == ['User', 'Admin']
@@ -0,0 +1,62 @@
+import pathlib
+import sys
+import textwrap
+
+from qmonus_plugin_builder.class_libs import component as class_component
+from qmonus_plugin_builder.libs import reload_utils
+
+
+def _write(path: pathlib.Path, text: str) -> None:
+    path.write_text(textwrap.dedent(text), encoding='utf-8')
+
+
+def test_import_graph_reloads_changed_modules_and_dependents(temp_module_path: pathlib.Path):
+    package_path = temp_module_path.joinpath('reload_pkg')
+    package_path.mkdir()
+    _write(package_path.joinpath('__init__.py'), '')
+    _write(package_path.joinpath('a.py'), '''
+        from qmonus_plugin_builder.class_libs import component
+
+        VALUE = 1
+
+
+        class A(object):
+            @component.instance_method()
+            def run(self):
+                pass
+    ''')
+    _write(package_path.joinpath('b.py'), '''
+        from . import a
+
+        VALUE = a.VALUE + 1
+    ''')
+    _write(package_path.joinpath('c.py'), '''
+        VALUE = 3
+    ''')
+
+    graph = reload_utils.ImportGraph('reload_pkg')
+    try:
+        with graph:
+            import reload_pkg.b
+            import reload_pkg.c
+            c_module = sys.modules['reload_pkg.c']
+            assert 'reload_pkg.a' in graph.dependencies['reload_pkg.b']
+            assert graph.get_dependents(['reload_pkg.a']) == {'reload_pkg.a', 'reload_pkg.b'}
+            assert reload_pkg.b.VALUE == 2
+            assert 'A.run' in class_component.instance_method_per_qualname
+
+            _write(package_path.joinpath('a.py'), '''
+                VALUE = 10
+            ''')
+            reloaded_names = graph.reload_changed([package_path.joinpath('a.py')])
+            assert reloaded_names == ['reload_pkg.a', 'reload_pkg.b']
+            assert sys.modules['reload_pkg.b'].VALUE == 11
+            assert sys.modules['reload_pkg.c'] is c_module
+            assert 'A.run' not in class_component.instance_method_per_qualname
+
+            package_path.joinpath('c.py').unlink()
+            assert graph.reload_changed([package_path.joinpath('c.py')]) == []
+            assert 'reload_pkg.c' not in sys.modules
+    finally:
+        for name in [name for name in sys.modules if name.split('.')[0] == 'reload_pkg']:
+            del sys.modules[name]
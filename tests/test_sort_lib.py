@@ -30,3 +30,47 @@ from qmonus_plugin_builder.libs import sort_lib
 def test_topological_sort_works(test_data: dict):
     results = sort_lib.topological_sort(test_data['args'])
     assert results == test_data['expected']
+
+
+def test_strongly_connected_components_works():
+    graph = {
+        "atom": ["User"],
+        "User": ["classes", "globals"],
+        "classes": ["globals"],
+        "globals": ["atom", "context"],
+        "context": ["module"],
+        "module": ["constants"],
+        "constants": [],
+        "Scenario": ["globals", "unknown"],
+    }
+    assert sort_lib.strongly_connected_components(graph) == [
+        ["constants"], ["module"], ["context"], ["atom", "User", "classes", "globals"], ["Scenario"],
+    ]
+    # Same as topological_sort() for DAGs
+    dag = {"A": ["D"], "B": ["A"], "C": ["A"], "D": [], "E": ["B", "C"], "F": ["A"]}
+    components = sort_lib.strongly_connected_components(dag)
+    assert all(len(component) == 1 for component in components)
+    position = {component[0]: i for i, component in enumerate(components)}
+    assert all(position[p] < position[n] for n, predecessors in dag.items() for p in predecessors)
+
+
+def test_topological_levels_works():
+    graph = {"A": ["D"], "B": ["A"], "C": ["A", "A"], "D": [], "E": ["B", "C"], "F": ["A"]}
+    levels = sort_lib.topological_levels(graph)
+    assert levels == [["D"], ["A"], ["B", "C", "F"], ["E"]]
+    assert [node for level in levels for node in level] == sort_lib.topological_sort(graph)
+
+
+def test_topological_sort_reports_cycles():
+    graph = {
+        "A": [],
+        "B": ["A", "D"],
+        "C": ["B"],
+        "D": ["C"],
+        "E": ["D"],
+        "F": ["F"],
+    }
+    with pytest.raises(sort_lib.CycleError) as e:
+        sort_lib.topological_sort(graph)
+    assert e.value.cycles == [["B", "C", "D"], ["F"]]
+    assert str(e.value) == "Cycles detected: B <-> C <-> D; F"
@@ -0,0 +1,23 @@
+import jinja2
+import pytest
+
+from qmonus_plugin_builder.libs import str_utils
+
+
+def test_render_works():
+    template = "{% for name in names %}\n{{ name }}\n{% endfor %}\n"
+    assert str_utils.render(template=template, variables={"names": ['a', 'b']}) == "a\nb\n"
+    assert str_utils.render(template=template, variables={"names": ['c']}) == "c\n"
+
+
+def test_render_compiles_template_once():
+    template = "{{ value }}"
+    first = str_utils._get_env().get_template(str_utils._loader.get_name(template))
+    str_utils.render(template=template, variables={"value": 1})
+    second = str_utils._get_env().get_template(str_utils._loader.get_name(template))
+    assert first is second
+
+
+def test_render_raises_on_undefined_variables():
+    with pytest.raises(jinja2.UndefinedError):
+        str_utils.render(template="{{ undefined }}", variables={})
@@ -0,0 +1,47 @@
+import pathlib
+
+import pytest
+
+from qmonus_plugin_builder.libs import watch_utils
+
+
+def test_diff_snapshots_works(tmp_path: pathlib.Path):
+    a = tmp_path.joinpath('a.py')
+    b = tmp_path.joinpath('sub/b.py')
+    b.parent.mkdir()
+    a.write_text('a = 1')
+    b.write_text('b = 1')
+    tmp_path.joinpath('c.txt').write_text('c')
+
+    old = watch_utils.take_snapshot(tmp_path)
+    assert set(old.keys()) == {a, b}
+
+    a.write_text('a = 10')
+    b.unlink()
+    c = tmp_path.joinpath('sub/c.py')
+    c.write_text('c = 1')
+    new = watch_utils.take_snapshot(tmp_path)
+    assert watch_utils.diff_snapshots(old, new) == {a, b, c}
+
+
+@pytest.mark.parametrize('polling', [True, False])
+def test_file_watcher_detects_changes(tmp_path: pathlib.Path, polling: bool):
+    tmp_path.joinpath('sub').mkdir()
+    a = tmp_path.joinpath('sub/a.py')
+    a.write_text('a = 1')
+
+    watcher = watch_utils.FileWatcher(root_path=tmp_path, interval=0.05, polling=polling)
+    try:
+        assert watcher.wait(timeout=0.1) == set()
+
+        a.write_text('a = 10')
+        assert watcher.wait(timeout=5) == {a}
+
+        # files in new directories are detected as well
+        tmp_path.joinpath('new').mkdir()
+        assert watcher.wait(timeout=0.2) == set()
+        b = tmp_path.joinpath('new/b.py')
+        b.write_text('b = 1')
+        assert watcher.wait(timeout=5) == {b}
+    finally:
+        watcher.close()
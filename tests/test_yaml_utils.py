@@ -0,0 +1,90 @@
+import pathlib
+import random
+import typing
+
+import pytest
+
+import qmonus_plugin_builder
+from qmonus_plugin_builder.libs import yaml_utils
+from . import lib
+
+INIT_YAML_PATH = pathlib.Path(__file__).joinpath('../../src/qmonus_plugin_builder/init_files/yml').resolve()
+
+# Includes characters which libyaml escapes differently (tab, control characters, NEL, LS, BOM, emoji)
+_CHARACTERS = 'abcXYZ019 \n:#-{}[]"\'|>&*!%@`,?~あいう漢字é' + '\t\r\x00\x1b\x7f\x85\xa0 　﻿\U0001F600'
+
+
+def _random_str(rand: random.Random, max_length: int) -> str:
+    return ''.join(rand.choice(_CHARACTERS) for _ in range(rand.randint(0, max_length)))
+
+
+def _random_value(rand: random.Random, depth: int = 0) -> object:
+    r = rand.random()
+    if depth < 4 and r < 0.2:
+        return {
+            _random_str(rand, rand.choice([3, 10, 150])): _random_value(rand, depth + 1)
+            for _ in range(rand.randint(0, 5))
+        }
+    if depth < 4 and r < 0.35:
+        return [_random_value(rand, depth + 1) for _ in range(rand.randint(0, 5))]
+    if r < 0.45:
+        return rand.choice([None, True, False, 0, -1, 1.5, 10 ** 20, 'null', 'yes', '', '0x1', '~'])
+    return _random_str(rand, rand.choice([5, 30, 200]))
+
+
+@pytest.mark.skipif(yaml_utils.CSafeDumper is None, reason='libyaml is not available')
+def test_dump_is_the_same_as_python_emitter_for_init_files(
+    project_path: pathlib.Path,
+    yaml_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    objs = []
+    dump = yaml_utils.dump
+
+    def _dump(obj: typing.Any) -> str:
+        objs.append(obj)
+        return dump(obj)
+
+    monkeypatch.setattr(yaml_utils, 'dump', _dump)
+    qmonus_plugin_builder.init(project_path=str(project_path))
+    # Static mode does not import 'qmonus_sdk_plugins' into this process
+    qmonus_plugin_builder.dump(project_path=str(project_path), yaml_path=str(yaml_path), static=True)
+    assert lib.compare_dir(INIT_YAML_PATH, yaml_path, glob_pattern='**/*.yml')
+
+    assert len(objs) == len(list(INIT_YAML_PATH.glob('**/*.yml')))
+    for obj in objs:
+        assert yaml_utils.is_libyaml_safe(obj)
+        assert dump(obj) == lib.dump_python(obj)
+
+
+@pytest.mark.skipif(yaml_utils.CSafeDumper is None, reason='libyaml is not available')
+def test_dump_is_the_same_as_python_emitter_for_synthetic_corpus():
+    rand = random.Random(0)
+    libyaml_count = 0
+    for _ in range(3000):
+        obj = {'x': _random_value(rand)}
+        if yaml_utils.is_libyaml_safe(obj):
+            libyaml_count += 1
+        assert yaml_utils.dump(obj) == lib.dump_python(obj)
+    # Both paths are exercised
+    assert 0 < libyaml_count < 3000
+
+
+def test_dump_is_the_same_as_python_emitter_for_large_documents():
+    code = '\n'.join(f'    value = call({i})  # 日本語 comment   ' for i in range(2000))
+    obj = {
+        'methods': [
+            {'name': f'method{i}', 'method_body': code, 'spec': {'body': [{'type': 'string', 'index': j} for j in range(50)]}}
+            for i in range(5)
+        ],
+    }
+    assert yaml_utils.dump(obj) == lib.dump_python(obj)
+
+
+def test_is_libyaml_safe():
+    assert yaml_utils.is_libyaml_safe({'a': ['b', 1, None, {'c': 'あ\nい'}]})
+    assert not yaml_utils.is_libyaml_safe({'a': 'tab\t'})
+    assert not yaml_utils.is_libyaml_safe({'a': '\U0001F600'})
+    assert not yaml_utils.is_libyaml_safe({'': 'empty key'})
+    assert not yaml_utils.is_libyaml_safe({'k' * 128: 'long key'})
+    assert not yaml_utils.is_libyaml_safe({'a': ('tuple',)})